@@ -0,0 +1,116 @@
+import argparse
+import json
+import sys
+import time
+
+from playground.games.chess.common.search import Search
+from playground.games.chess.position import Position
+
+# Positions with known perft node counts, by depth from 1.
+PERFT_SUITE = [
+    ('start', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+     [20, 400, 8902, 197281, 4865609]),
+    ('kiwipete',
+     'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+     [48, 2039, 97862, 4085603]),
+    ('endgame', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+     [14, 191, 2812, 43238, 674624]),
+    ('promotions',
+     'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+     [6, 264, 9467, 422333]),
+    ('castling', 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+     [44, 1486, 62379, 2103487]),
+]
+
+SEARCH_SUITE = [
+    ('start', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'),
+    ('kiwipete',
+     'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'),
+    ('middlegame',
+     'r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8'),
+    ('endgame', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1'),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the chess move generator with perft and the '
+        'search at fixed depths.')
+    parser.add_argument('--perft-nodes',
+                        type=int,
+                        default=200000,
+                        help='Run each perft position to the deepest depth '
+                        'with at most this many nodes.')
+    parser.add_argument('--search-depth', type=int, default=4)
+    parser.add_argument('--skip-perft', action='store_true')
+    parser.add_argument('--skip-search', action='store_true')
+    parser.add_argument('--output',
+                        type=str,
+                        default=None,
+                        help='Path to save the results as JSON.')
+    return parser.parse_args()
+
+
+def run_perft(max_nodes):
+    results = []
+    for name, fen, counts in PERFT_SUITE:
+        depth = max(d for d, count in enumerate(counts, 1)
+                    if count <= max_nodes or d == 1)
+        search = Search(Position(fen))
+        start = time.perf_counter()
+        nodes = search.perft(depth)
+        elapsed = time.perf_counter() - start
+        results.append(
+            dict(name=name,
+                 fen=fen,
+                 depth=depth,
+                 nodes=nodes,
+                 expected=counts[depth - 1],
+                 passed=nodes == counts[depth - 1],
+                 time=elapsed,
+                 nps=nodes / elapsed if elapsed else 0))
+        print(f"perft {name:<12}depth {depth} {nodes:>9} nodes "
+              f"{'ok' if nodes == counts[depth - 1] else 'MISMATCH':<9}"
+              f'{elapsed:7.2f} s {nodes / elapsed:9.0f} nodes/s')
+    return results
+
+
+def run_search(depth):
+    results = []
+    for name, fen in SEARCH_SUITE:
+        search = Search(Position(fen))
+        move = search.iter_search(max_depth=depth)
+        stats = search.stats
+        results.append(
+            dict(name=name,
+                 fen=fen,
+                 move=search.position.move_to_san(move),
+                 **stats))
+        print(f"search {name:<11}depth {stats['depth']} "
+              f"{stats['nodes']:>8} nodes {stats['time']:7.2f} s "
+              f"{stats['nps']:8.0f} nodes/s "
+              f"TT hits {stats['tt_hit_rate']:6.1%}")
+        for iteration in stats['iterations']:
+            print(f"  depth {iteration['depth']:>2} {iteration['nodes']:>8} "
+                  f"nodes {iteration['time']:7.2f} s")
+    return results
+
+
+def main():
+    args = parse_args()
+    results = dict(perft=[], search=[])
+    if not args.skip_perft:
+        results['perft'] = run_perft(args.perft_nodes)
+    if not args.skip_search:
+        results['search'] = run_search(args.search_depth)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results saved to '{args.output}'")
+    if not all(result['passed'] for result in results['perft']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
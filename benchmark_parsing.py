@@ -0,0 +1,107 @@
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+
+from playground.evaluator.metric import Metric
+from playground.parsing import parse_choices, parse_matrices, parse_moves
+
+FILLER = [
+    'Let me look at the board carefully.', 'The stone at row {row} is {val}.',
+    'Checking the neighbours of [{row}, {col}] first.',
+    'If I place a piece at {move}, the opponent can block it.',
+    'This means the answer is probably not {choice}.',
+    'Using board[{row}][{col}] == {val} in the code above.',
+    'So far the state looks like [[{val}, {val}], ...].'
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the output parsers on a synthetic corpus of '
+        'long chain-of-thought outputs.')
+    parser.add_argument('--num-outputs', type=int, default=100000)
+    parser.add_argument('--sentences',
+                        type=int,
+                        default=40,
+                        help='Reasoning sentences per output.')
+    parser.add_argument('--game', type=str, default='gomoku')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+def format_matrix(matrix, latex):
+    if latex:
+        rows = ' \\\\ '.join(' & '.join(map(str, row)) for row in matrix)
+        return f'\\begin{{bmatrix}} {rows} \\end{{bmatrix}}'
+    return str(matrix)
+
+
+def build_corpus(args, config):
+    rng = random.Random(args.seed)
+    size, values = config['size'], config['valid_range']
+    letters = 'ABCDEFGHIJKLMNO'[:size]
+    corpus = []
+    for _ in range(args.num_outputs):
+        sentences = [
+            rng.choice(FILLER).format(
+                row=rng.randrange(size),
+                col=rng.randrange(size),
+                val=rng.choice(values),
+                move=rng.choice(letters) + str(rng.randint(1, size)),
+                choice=rng.choice('ABCD')) for _ in range(args.sentences)
+        ]
+        matrix = [[rng.choice(values) for _ in range(size)]
+                  for _ in range(size)]
+        sentences.append('Game State: ' +
+                         format_matrix(matrix,
+                                       rng.random() < 0.3))
+        sentences.append(f'Movement: {rng.choice(letters)}'
+                         f'{rng.randint(1, size)}')
+        sentences.append(f'Final Answer: {rng.choice("ABCD")}')
+        corpus.append(' '.join(sentences))
+    return corpus
+
+
+def main():
+    args = parse_args()
+    config = Metric.MATRIX_CONFIG[args.game]
+    corpus = build_corpus(args, config)
+    size_mb = sum(map(len, corpus)) / 2**20
+    print(f'{len(corpus)} outputs, {size_mb:.1f} MB')
+
+    benchmarks = {
+        'matrix':
+        lambda: parse_matrices(corpus, config['size'], config['count'], config[
+            'valid_range']),
+        'move':
+        lambda: parse_moves(corpus, args.game),
+        'choice':
+        lambda: parse_choices(corpus),
+    }
+    # Every output of the corpus holds a valid answer, so any output left
+    # unparsed is a parser bug.
+    failed = 0
+    for name, run in benchmarks.items():
+        start = time.perf_counter()
+        results = run()
+        elapsed = time.perf_counter() - start
+        reasons = Counter()
+        for result in results:
+            value, reason = result if isinstance(result, tuple) else (result,
+                                                                      None)
+            if value is None:
+                # Drop the parsed string quoted after the first sentence.
+                reasons[(reason or 'No match').split('. ')[0]] += 1
+        parsed = len(results) - sum(reasons.values())
+        print(f'{name:<8}{elapsed:8.2f} s {len(corpus) / elapsed:10.0f} '
+              f'outputs/s, {parsed} parsed')
+        for reason, count in reasons.most_common():
+            print(f'  {count} failed: {reason}')
+        failed += sum(reasons.values())
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
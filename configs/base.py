@@ -3,6 +3,12 @@ save_path = 'experiments/game_history'
 maximum_trials = 3
 device = 'cuda:0'
 make_video = True
+# Backend drawing game screenshots: 'qt' renders the Qt widgets, 'raster'
+# composites them with NumPy from sprites captured once from the Qt renderer
+# and cached in `raster_cache`, by default lvlm-playground/raster in the user
+# cache directory.
+renderer = 'qt'
+raster_cache = None
 
 
 benchmark_setting = dict(
@@ -12,6 +18,11 @@ benchmark_setting = dict(
    e2e_round=100,
    # offline_task=['perceive', 'qa', 'rule'],
    offline_task=['perceive'],
-   benchmark_path='benchmark'
+   benchmark_path='benchmark',
+   # Pack the screenshots of each task into one memory-mapped shard, with
+   # PNG copies pre-resized to each of `packed_image_sizes` (the
+   # `image_size` of the API agents).
+   pack_images=False,
+   packed_image_sizes=[]
 )
 
@@ -84,4 +84,14 @@ game_description = dict(
 
 player_first = True
 user_is_white = True
+# Stockfish binary, shared by the games of a process, and the limits of its
+# moves; with no limit set it searches 12 plies. Without the binary the
+# built-in engine searches `ai_depth` plies, within `engine_time` seconds,
+# with a transposition table of `ai_tt_size` entries.
+engine_path = '/usr/games/stockfish'
+engine_depth = 12
+engine_nodes = None
+engine_time = None
+ai_depth = 3
+ai_tt_size = 2**17
 qa = ChessQuestionAnswering
@@ -80,4 +80,8 @@ game_description = dict(
 
 chessboard_size = 15
 player_first = True
+# Search depth of the AI in plies, and a time budget per move in seconds
+# after which the deepest completed search is used (`None` for no limit).
+ai_depth = 4
+ai_time_limit = 2.0
 qa = GomokuQuestionAnswering
@@ -81,4 +81,8 @@ game_description = dict(
 )
 
 player_first = True
+# Search depth of the AI in plies, and an optional time budget per move in
+# seconds after which the deepest completed search is used.
+ai_depth = 4
+ai_time_limit = None
 qa = ReversiQuestionAnswering
@@ -69,4 +69,12 @@ game_description = dict(
 )
 
 player_first = True
+# Number of given digits and difficulty ('easy', 'medium' or 'hard') of the
+# generated puzzles; with neither set, random cells are removed until five
+# removals have failed to keep the solution unique.
+clues = None
+difficulty = None
+# JSON file of pre-generated puzzles to draw from instead, as written by
+# `sudoku_generator.write_puzzle_pool`.
+puzzle_pool = None
 qa = SudokuQuestionAnswering
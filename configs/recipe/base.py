@@ -3,4 +3,22 @@ save_path = 'experiments'
 # tasks = ['perceive', 'qa', 'rule', 'e2e']
 tasks = ['perceive']
 # games = ['tictactoe', 'reversi', 'gomoku', 'minesweeper', 'sudoku', 'chess']
-games = ['tictactoe']
\ No newline at end of file
+games = ['tictactoe']
+
+# Number of offline (perceive/qa/rule) samples sent to the agent at once.
+# Values above 1 are intended for API-backed agents.
+concurrency = 1
+
+# Number of offline samples grouped into a single agent call. Agents with a
+# native batched backend (e.g. lmdeploy) run the whole group on the GPU at once.
+batch_size = 1
+
+# On-disk cache of agent responses keyed by agent, generation config, prompt
+# and image content. `mode='replay'` serves cached responses only, without
+# loading the model or writing to the cache, and stops the run on a miss;
+# entries beyond `max_entries` / `max_bytes` are evicted
+# least-recently-used first.
+response_cache = None
+# response_cache = dict(path='experiments/response_cache.sqlite',
+#                       mode='readwrite',
+#                       max_entries=1000000)
@@ -1,15 +1,22 @@
 import argparse
 import json
+import multiprocessing
 import os
 
-from playground.evaluator import Metric
+from playground.evaluator import Metric, load_annotations
+from playground.utils import load_record
+
+# Annotations shared by the records scored in a worker process, set up by
+# `init_worker`.
+worker_annotations = None
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description='LVLM-Playground Evaluation')
-    parser.add_argument('record_path',
+    parser.add_argument('record_paths',
                         type=str,
-                        help='Path to the experiment results JSON file.')
+                        nargs='+',
+                        help='Paths to the experiment results JSON files.')
     parser.add_argument('--annotation_dir',
                         type=str,
                         default='./benchmark',
@@ -17,33 +24,75 @@ def parse_args():
     parser.add_argument('--output_path',
                         type=str,
                         default=None,
-                        help='Path to save the evaluation results JSON file')
+                        help='Path to save the evaluation results JSON file '
+                        'of a single record')
+    parser.add_argument('--output_dir',
+                        type=str,
+                        default='./evaluation_results',
+                        help='Directory to save the evaluation results and '
+                        'the leaderboard of several records')
+    parser.add_argument('--workers',
+                        type=int,
+                        default=None,
+                        help='Number of processes scoring records, by '
+                        'default one per record up to the number of CPUs')
     return parser.parse_args()
 
 
-def main():
-    args = parse_args()
+def init_worker(annotation_dir, annotations):
+    global worker_annotations
+    worker_annotations = (annotation_dir, annotations)
 
-    if not os.path.exists(args.record_path):
-        print(f"Error: Record file '{args.record_path}' does not exist.")
-        return
-    if not os.path.exists(args.annotation_dir):
-        print(f"Error: Annotation '{args.annotation_dir}' does not exist.")
-        return
 
+def evaluate_record(record_path, output_path):
+    """Score a record in a worker process and save its results, with the
+    verification logs next to them.
+
+    Returns the weighted summary, or `None` if the file is not a record.
+    """
+    annotation_dir, annotations = worker_annotations
+    try:
+        record = load_record(record_path)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if not is_record(record):
+        return None
+    metric = Metric(record_path,
+                    annotation_dir,
+                    annotations,
+                    log_dir=os.path.dirname(output_path),
+                    record=record)
+    metric.save_evaluation(output_path)
+    return metric.weighted_summary
+
+
+def record_name(record_path):
+    return os.path.splitext(os.path.basename(record_path))[0]
+
+
+def is_record(record):
+    """Whether `record` has the layout of an experiment record,
+    ``{task: {game: [result or None, ...]}}``."""
+    return isinstance(record, dict) and all(
+        isinstance(games, dict) and all(
+            isinstance(results, list) for results in games.values())
+        for games in record.values())
+
+
+def evaluate_single(args):
+    record_path = args.record_paths[0]
     if args.output_path is None:
-        record_filename = os.path.splitext(os.path.basename(
-            args.record_path))[0]
-        output_path = os.path.join('./evaluation_results',
-                                   f'{record_filename}_results.json')
+        output_path = os.path.join(args.output_dir,
+                                   f'{record_name(record_path)}_results.json')
     else:
         output_path = args.output_path
 
     print('Starting evaluation...')
-    metric = Metric(args.record_path, args.annotation_dir)
+    output_dir = os.path.dirname(output_path) or '.'
+    os.makedirs(output_dir, exist_ok=True)
+    metric = Metric(record_path, args.annotation_dir, log_dir=output_dir)
     scores = metric.evaluate_all()
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
     metric.save_evaluation(output_path)
     print(f"Evaluation results saved to '{output_path}'")
 
@@ -56,5 +105,96 @@ def main():
         print(f'{task}: Weighted Average Score = {weighted_avg:.4f}')
 
 
+def evaluate_many(args):
+    """Score several records in parallel against annotations loaded once,
+    and rank them in a leaderboard.
+
+    Files that are not records, such as logs matched by a glob, are
+    skipped by the workers.
+    """
+    record_paths = args.record_paths
+    names = [record_name(path) for path in record_paths]
+    if len(set(names)) != len(names):
+        print('Error: Record files must have distinct names.')
+        return
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_paths = [
+        os.path.join(args.output_dir, f'{name}_results.json') for name in names
+    ]
+
+    print(f'Starting evaluation of {len(names)} files...')
+    annotations = load_annotations(args.annotation_dir)
+    workers = args.workers or min(len(names), os.cpu_count() or 1)
+    with multiprocessing.Pool(workers,
+                              initializer=init_worker,
+                              initargs=(args.annotation_dir,
+                                        annotations)) as pool:
+        summaries = pool.starmap(evaluate_record,
+                                 zip(record_paths, output_paths))
+    scored = []
+    for name, record_path, output_path, summary in zip(names, record_paths,
+                                                       output_paths,
+                                                       summaries):
+        if summary is None:
+            print(f"Skipping '{record_path}': not an experiment record.")
+        else:
+            scored.append((name, record_path, output_path, summary))
+    if not scored:
+        print('Error: No experiment records to evaluate.')
+        return
+
+    tasks = list(
+        dict.fromkeys(task for *_, summary in scored for task in summary))
+    leaderboard = []
+    for name, record_path, output_path, summary in scored:
+        scores = {
+            task: summary.get(task, {}).get('weighted_average', 0)
+            for task in tasks
+        }
+        average = round(sum(scores.values()) / len(scores), 3) if scores else 0
+        leaderboard.append({
+            'model': name,
+            'record_path': record_path,
+            'results_path': output_path,
+            'average': average,
+            'weighted_summary': scores
+        })
+    leaderboard.sort(key=lambda entry: entry['average'], reverse=True)
+
+    leaderboard_path = os.path.join(args.output_dir, 'leaderboard.json')
+    with open(leaderboard_path, 'w') as f:
+        json.dump(leaderboard, f, indent=4)
+    print(f"Leaderboard saved to '{leaderboard_path}'")
+
+    print('\nLeaderboard:')
+    columns = ''.join(f'{task:>10}' for task in tasks)
+    print(f"{'model':<32}{columns}{'average':>10}")
+    for entry in leaderboard:
+        print(f"{entry['model']:<32}" +
+              ''.join(f"{entry['weighted_summary'][task]:>10.4f}"
+                      for task in tasks) + f"{entry['average']:>10.4f}")
+
+
+def main():
+    args = parse_args()
+
+    for record_path in args.record_paths:
+        if not os.path.exists(record_path):
+            print(f"Error: Record file '{record_path}' does not exist.")
+            return
+    if not os.path.exists(args.annotation_dir):
+        print(f"Error: Annotation '{args.annotation_dir}' does not exist.")
+        return
+    if len(args.record_paths) > 1 and args.output_path is not None:
+        print('Error: --output_path only applies to a single record; use '
+              '--output_dir for several.')
+        return
+
+    if len(args.record_paths) == 1:
+        evaluate_single(args)
+    else:
+        evaluate_many(args)
+
+
 if __name__ == '__main__':
     main()
@@ -13,12 +13,29 @@ def parse_args():
                         type=str,
                         help='Path to the benchmark setting config.',
                         default='configs/base.py')
+    parser.add_argument('--workers',
+                        type=int,
+                        help='Number of processes rendering samples.',
+                        default=1)
+    parser.add_argument('--seed',
+                        type=int,
+                        help='Base random seed. The generated benchmark only '
+                        'depends on the seed, not on the number of workers.',
+                        default=None)
+    parser.add_argument('--pack',
+                        action='store_true',
+                        help='Pack the screenshots of each task into an '
+                        'image shard, also for existing benchmark data.')
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
-    generator = Generator(args.benchmark_setting)
+    generator = Generator(args.benchmark_setting,
+                          workers=args.workers,
+                          seed=args.seed)
+    if args.pack:
+        generator.pack_images = True
     generator.generate_benchmark()
 
 
@@ -1,4 +1,5 @@
 from .base import BaseAgent
+from .cache import CachedAgent, CacheMissError, ResponseCache
 from .single_step_agents import (AnthropicAgentSingleStep,
                                  GoogleAIAgentSingleStep,
                                  LMDeployAgentSingleStep,
@@ -10,4 +11,7 @@ __all__ = [
     'LMDeployAgentSingleStep',
     'GoogleAIAgentSingleStep',
     'AnthropicAgentSingleStep',
+    'CachedAgent',
+    'CacheMissError',
+    'ResponseCache',
 ]
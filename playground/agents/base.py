@@ -13,3 +13,12 @@ class BaseAgent(ABC):
         this method should return a decision on the next move or action.
         """
         raise NotImplementedError('The method not implemented')
+
+    def get_decisions(self, batch: list):
+        """
+        Batched version of `get_decision`. Each item of `batch` is the tuple of
+        arguments for a single `get_decision` call, and the decisions are
+        returned in the same order. Agents whose backend can batch requests
+        natively should override this method.
+        """
+        return [self.get_decision(*inputs) for inputs in batch]
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import os.path as osp
+import sqlite3
+import threading
+import time
+
+from playground.agents.base import BaseAgent
+from playground.utils import read_image_bytes
+
+# Keys of `lmm_agent` that only affect transport, not the model output.
+TRANSPORT_KEYS = ('timeout', 'max_retries', 'backoff_base', 'backoff_max',
+                  'requests_per_minute', 'burst')
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when responses are not in the cache, with the
+    missing cache keys in `keys`."""
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        super().__init__(f'No cached response for {len(self.keys)} '
+                         f"queries: {', '.join(self.keys)}")
+
+
+class ResponseCache:
+    """Content-addressed SQLite store of agent responses with LRU eviction.
+
+    Entries are evicted least-recently-used first once the cache holds more
+    than `max_entries` responses or more than `max_bytes` of response text.
+    A `readonly` cache opens an existing database without writing to it, so
+    it can be shared or read-only.
+    """
+
+    def __init__(self, path, max_entries=None, max_bytes=None, readonly=False):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.readonly = readonly
+        self.lock = threading.Lock()
+        if readonly:
+            self.conn = sqlite3.connect(f'file:{osp.abspath(path)}?mode=ro',
+                                        uri=True,
+                                        check_same_thread=False)
+            self.entries, self.total_bytes = self.count()
+            return
+        if osp.dirname(path):
+            os.makedirs(osp.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS responses ('
+                          'key TEXT PRIMARY KEY, '
+                          'response TEXT NOT NULL, '
+                          'size INTEGER NOT NULL, '
+                          'last_access REAL NOT NULL)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS responses_last_access '
+                          'ON responses (last_access)')
+        self.conn.commit()
+        self.entries, self.total_bytes = self.count()
+
+    def count(self):
+        return self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone(
+            )
+
+    @staticmethod
+    def make_key(agent_cfg, inputs):
+        """Hash the agent name, generation config, prompt and image bytes.
+
+        `inputs` follows the `get_decision` convention `(*image_paths,
+        prompt)`.
+        """
+        *image_paths, prompt = inputs
+        cfg = {
+            key: value
+            for key, value in agent_cfg.lmm_agent.to_dict().items()
+            if key not in TRANSPORT_KEYS
+        }
+        digest = hashlib.sha256()
+        digest.update(
+            json.dumps(cfg, sort_keys=True, default=repr).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(prompt.encode('utf-8'))
+        for image in image_paths:
+            digest.update(b'\0')
+            digest.update(hashlib.sha256(read_image_bytes(image)).digest())
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT response FROM responses WHERE key = ?',
+                (key, )).fetchone()
+            if row is None:
+                return None
+            if not self.readonly:
+                self.conn.execute(
+                    'UPDATE responses SET last_access = ? WHERE key = ?',
+                    (time.time(), key))
+                self.conn.commit()
+            return row[0]
+
+    def put(self, key, response):
+        if self.readonly:
+            raise ValueError('Cannot store responses in a read-only cache.')
+        size = len(response.encode('utf-8'))
+        with self.lock:
+            old = self.conn.execute('SELECT size FROM responses WHERE key = ?',
+                                    (key, )).fetchone()
+            if old is not None:
+                self.entries -= 1
+                self.total_bytes -= old[0]
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (key, response, size, time.time()))
+            self.entries += 1
+            self.total_bytes += size
+            self._evict()
+            self.conn.commit()
+
+    def _over_limit(self):
+        if self.max_entries and self.entries > self.max_entries:
+            return True
+        return bool(self.max_bytes and self.total_bytes > self.max_bytes)
+
+    def _evict(self):
+        while self.entries > 1 and self._over_limit():
+            key, size = self.conn.execute(
+                'SELECT key, size FROM responses '
+                'ORDER BY last_access LIMIT 1').fetchone()
+            self.conn.execute('DELETE FROM responses WHERE key = ?', (key, ))
+            self.entries -= 1
+            self.total_bytes -= size
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CachedAgent(BaseAgent):
+    """Serve decisions from a `ResponseCache`, falling back to `agent`.
+
+    In replay mode no agent is needed: only cached responses are returned
+    and any miss raises `CacheMissError`, for a whole batch at once.
+    """
+
+    def __init__(self, agent_cfg, cache, agent=None, replay=False):
+        super().__init__(agent_cfg)
+        if agent is None and not replay:
+            raise ValueError('An agent is required unless replaying.')
+        self.cache = cache
+        self.agent = agent
+        self.replay = replay
+
+    def lookup(self, inputs):
+        key = self.cache.make_key(self.agent_cfg, inputs)
+        return key, self.cache.get(key)
+
+    def get_decision(self, *inputs):
+        key, response = self.lookup(inputs)
+        if response is None and self.replay:
+            raise CacheMissError([key])
+        if response is None:
+            response = self.agent.get_decision(*inputs)
+            if response is not None:
+                self.cache.put(key, response)
+        return response
+
+    def get_decisions(self, batch):
+        keys, responses = zip(*[self.lookup(inputs) for inputs in batch])
+        responses = list(responses)
+        missing = [
+            i for i, response in enumerate(responses) if response is None
+        ]
+        if missing and self.replay:
+            raise CacheMissError(keys[i] for i in missing)
+        if missing:
+            outputs = self.agent.get_decisions([batch[i] for i in missing])
+            for i, output in zip(missing, outputs):
+                responses[i] = output
+                if output is not None:
+                    self.cache.put(keys[i], output)
+        return responses
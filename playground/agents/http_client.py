@@ -0,0 +1,143 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUS = (408, 409, 429, 500, 502, 503, 504, 529)
+
+
+class RetryableHTTPError(requests.HTTPError):
+    """HTTP error whose status code means the request can be retried."""
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting requests per minute."""
+
+    def __init__(self, requests_per_minute, burst=1):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and consume it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RetryPolicy:
+    """Rate limiting, per-request timeout and jittered exponential backoff
+    shared by the API-backed agents."""
+
+    def __init__(self,
+                 timeout=60,
+                 max_retries=5,
+                 backoff_base=1.0,
+                 backoff_max=60.0,
+                 requests_per_minute=None,
+                 burst=1):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = RateLimiter(requests_per_minute,
+                                        burst) if requests_per_minute else None
+
+    @classmethod
+    def from_cfg(cls, agent_cfg):
+        """Build a policy from the optional keys of `lmm_agent`."""
+        cfg = agent_cfg.lmm_agent
+        return cls(
+            timeout=cfg.timeout or 60,
+            max_retries=cfg.max_retries if cfg.max_retries is not None else 5,
+            backoff_base=cfg.backoff_base or 1.0,
+            backoff_max=cfg.backoff_max or 60.0,
+            requests_per_minute=cfg.requests_per_minute,
+            burst=cfg.burst or 1)
+
+    def backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, never shorter than the server's
+        `Retry-After` hint."""
+        delay = random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    @staticmethod
+    def retry_after(exc):
+        response = getattr(exc, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        value = headers.get('retry-after') or headers.get('Retry-After')
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def call(self, func, *args, retry_on=(), **kwargs):
+        """Call `func`, retrying on the exception types in `retry_on`."""
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                return func(*args, **kwargs)
+            except retry_on as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff(attempt, self.retry_after(e))
+                print(f'Request failed ({e}), retrying in {delay:.1f}s '
+                      f'({attempt + 1}/{self.max_retries}).')
+                time.sleep(delay)
+
+
+class HTTPClient:
+    """Pooled keep-alive HTTP client with retries on 429/5xx responses."""
+
+    RETRY_ON = (RetryableHTTPError, requests.ConnectionError, requests.Timeout)
+
+    def __init__(self, policy=None, headers=None, pool_size=32):
+        self.policy = policy or RetryPolicy()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def _request(self, method, url, **kwargs):
+        response = self.session.request(method,
+                                        url,
+                                        timeout=self.policy.timeout,
+                                        **kwargs)
+        if response.status_code in RETRYABLE_STATUS:
+            raise RetryableHTTPError(
+                f'{response.status_code} response from {url}',
+                response=response)
+        response.raise_for_status()
+        return response
+
+    def request(self, method, url, **kwargs):
+        return self.policy.call(self._request,
+                                method,
+                                url,
+                                retry_on=self.RETRY_ON,
+                                **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self.session.close()
@@ -1,15 +1,15 @@
 import os
-import pathlib
 
 import anthropic
 import google.generativeai as genai
-import requests
+from google.api_core import exceptions as google_exceptions
 from lmdeploy import pipeline
 from lmdeploy.vl import load_image
 
 from playground.agents import BaseAgent
+from playground.agents.http_client import HTTPClient, RetryPolicy
 from playground.registry import AGENT_REGISTRY
-from playground.utils import encode_image
+from playground.utils import encode_image, open_image, read_image_bytes
 
 
 @AGENT_REGISTRY.register('openai_single')
@@ -27,6 +27,10 @@ class OpenAIAgentSingleStep(BaseAgent):
             'max_tokens': agent_cfg.lmm_agent.max_tokens
         }
         self.input_sz = agent_cfg.lmm_agent.image_size
+        self.api_base = agent_cfg.lmm_agent.api_base or \
+            'https://api.openai.com/v1'
+        self.client = HTTPClient(RetryPolicy.from_cfg(agent_cfg),
+                                 headers=self.headers)
 
     def get_decision(self, screenshot_path: str, prompt: str):
         base64_image = encode_image(screenshot_path, self.input_sz)
@@ -44,15 +48,18 @@ class OpenAIAgentSingleStep(BaseAgent):
                 }
             }]
         }]
-        outputs = requests.post('https://api.openai.com/v1/chat/completions',
-                                headers=self.headers,
-                                json=payload)
+        outputs = self.client.post(f'{self.api_base}/chat/completions',
+                                   json=payload)
         outputs = outputs.json()
         return outputs['choices'][0]['message']['content']
 
 
 @AGENT_REGISTRY.register('google_single')
 class GoogleAIAgentSingleStep(BaseAgent):
+    RETRY_ON = (google_exceptions.ResourceExhausted,
+                google_exceptions.ServiceUnavailable,
+                google_exceptions.InternalServerError,
+                google_exceptions.DeadlineExceeded)
 
     def __init__(self, agent_cfg):
         super().__init__(agent_cfg)
@@ -60,18 +67,24 @@ class GoogleAIAgentSingleStep(BaseAgent):
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel(
             model_name=agent_cfg.lmm_agent.model)
+        self.policy = RetryPolicy.from_cfg(agent_cfg)
 
     def get_decision(self, screenshot_path: str, prompt: str):
         image = {
             'mime_type': 'image/png',
-            'data': pathlib.Path(screenshot_path).read_bytes()
+            'data': read_image_bytes(screenshot_path)
         }
-        outputs = self.model.generate_content([prompt, image])
+        outputs = self.policy.call(
+            self.model.generate_content, [prompt, image],
+            retry_on=self.RETRY_ON,
+            request_options={'timeout': self.policy.timeout})
         return outputs.text
 
 
 @AGENT_REGISTRY.register('anhthropic_single')
 class AnthropicAgentSingleStep(BaseAgent):
+    RETRY_ON = (anthropic.RateLimitError, anthropic.InternalServerError,
+                anthropic.APIConnectionError)
 
     def __init__(self, agent_cfg):
         super().__init__(agent_cfg)
@@ -80,7 +93,10 @@ class AnthropicAgentSingleStep(BaseAgent):
             'max_tokens': agent_cfg.lmm_agent.max_tokens
         }
         self.input_sz = agent_cfg.lmm_agent.image_size
-        self.model = anthropic.Anthropic()
+        self.policy = RetryPolicy.from_cfg(agent_cfg)
+        # Retries are handled by the shared policy instead of the SDK.
+        self.model = anthropic.Anthropic(max_retries=0,
+                                         timeout=self.policy.timeout)
 
     def get_decision(self, screenshot_path: str, prompt: str):
         base64_image = encode_image(screenshot_path, self.input_sz)
@@ -100,7 +116,9 @@ class AnthropicAgentSingleStep(BaseAgent):
                 'text': prompt
             }]
         }]
-        outputs = self.model.messages.create(**payload)
+        outputs = self.policy.call(self.model.messages.create,
+                                   retry_on=self.RETRY_ON,
+                                   **payload)
         return outputs.content[0].text
 
 
@@ -125,18 +143,36 @@ class LMDeployAgentSingleStep(BaseAgent):
     #     outputs = self.model((prompt, image), gen_config=self.gen_config)
     #     return outputs.text
 
+    def build_input(self, *inputs):
+        """Build a pipeline input from `(*image_paths, prompt)`."""
+        *image_paths, prompt = inputs
+        images = [
+            load_image(path)
+            if isinstance(path, str) else open_image(path).convert('RGB')
+            for path in image_paths
+        ]
+
+        if self.is_deepseek_vl:
+            if len(images) == 2:
+                # You can customize the prompt structure
+                prompt = (f'<IMAGE_TOKEN>Example: \n\n<IMAGE_TOKEN>Test: '
+                          f'\n\n{prompt}')
+            else:
+                prompt = '<IMAGE_TOKEN>' * len(images) + prompt
+
+        if len(images) == 1:
+            return prompt, images[0]
+        return prompt, images
 
     ## in context learning version
     def get_decision(self, example_image_path: str, test_image_path: str, prompt: str):
-        example_image = load_image(example_image_path)
-        test_image = load_image(test_image_path)
-        
-        if self.is_deepseek_vl:
-            # You can customize the prompt structure
-            prompt = f'<IMAGE_TOKEN>Example: \n\n<IMAGE_TOKEN>Test: \n\n{prompt}'
-            images = [example_image, test_image]
-        else:
-            images = [example_image, test_image]
-        
-        outputs = self.model((prompt, images), gen_config=self.gen_config)
-        return outputs.text 
+        outputs = self.model(self.build_input(example_image_path,
+                                              test_image_path, prompt),
+                             gen_config=self.gen_config)
+        return outputs.text
+
+    def get_decisions(self, batch: list):
+        """Send the whole batch to the pipeline in a single call."""
+        inputs = [self.build_input(*item) for item in batch]
+        outputs = self.model(inputs, gen_config=self.gen_config)
+        return [output.text for output in outputs]
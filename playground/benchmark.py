@@ -1,4 +1,6 @@
+import hashlib
 import json
+import multiprocessing
 import os
 import os.path as osp
 import sys
@@ -7,119 +9,190 @@ from pjtools.configurator import AutoConfigurator
 from PyQt5.QtWidgets import QApplication
 
 from playground.registry import GAME_REGISTRY
-from playground.utils import set_random_seed
+from playground.utils import ImageShard, ImageShardWriter, set_random_seed
+
+# Generator living in each worker process, set up by `init_worker`.
+worker_generator = None
+
+
+def init_worker(base_cfg, seed):
+    """Give each worker process its own offscreen `QApplication`, unless all
+    screenshots are rasterised without Qt."""
+    global worker_generator
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    worker_generator = Generator(base_cfg, seed=seed)
+    worker_generator.init_app()
+
+
+def render_sample_in_worker(args):
+    return worker_generator.render_sample(*args)
 
 
 class Generator:
 
-    def __init__(self, base_cfg):
+    def __init__(self, base_cfg, workers=1, seed=None):
         cfg = AutoConfigurator.fromfile(base_cfg)
+        self.base_cfg = base_cfg
         self.benchmark_setting = cfg.benchmark_setting
-        self.seed = set_random_seed()
+        if seed is None:
+            seed = self.benchmark_setting.seed
+        self.seed = set_random_seed(seed)
         self.sample_size = self.benchmark_setting.sample_size
+        self.workers = workers
+        self.pack_images = self.benchmark_setting.pack_images
+        self.packed_image_sizes = (self.benchmark_setting.packed_image_sizes
+                                   or [])
+        self.game_cfgs = {}
+        self.games = {}
 
     def generate_benchmark(self):
-        for task in self.benchmark_setting.offline_task:
-            for game in self.benchmark_setting.games:
-                save_path = osp.join(self.benchmark_setting.benchmark_path,
-                                     task, game)
-                if not osp.exists(save_path):
-                    os.makedirs(save_path)
-                if osp.exists(osp.join(save_path, 'annotation.json')):
-                    print(
-                        f'Benchmark data for {task} in {game} has been found.')
-                else:
-                    self.render(task, game, save_path)
-
-    def render(self, task, game, save_path):
-        game_cfg = AutoConfigurator.fromfile(f'configs/games/{game}.py')
-        app = QApplication(sys.argv)  # noqa
-        if task == 'perceive':
-            self.render_perceive(game_cfg, save_path)
-        elif task == 'rule':
-            self.render_rule(game_cfg, save_path)
-        elif task == 'qa':
-            self.render_qa(game_cfg, save_path)
+        pool = None
+        if self.workers <= 1:
+            self.init_app()
         else:
-            raise ValueError(f'Invalid task: {task}')
+            context = multiprocessing.get_context('spawn')
+            pool = context.Pool(self.workers,
+                                initializer=init_worker,
+                                initargs=(self.base_cfg, self.seed))
+        try:
+            for task in self.benchmark_setting.offline_task:
+                for game in self.benchmark_setting.games:
+                    save_path = osp.join(self.benchmark_setting.benchmark_path,
+                                         task, game)
+                    if not osp.exists(save_path):
+                        os.makedirs(save_path)
+                    if osp.exists(osp.join(save_path, 'annotation.json')):
+                        print(f'Benchmark data for {task} in {game} '
+                              'has been found.')
+                    else:
+                        self.render(task, game, save_path, pool)
+                    if self.pack_images and not ImageShard.exists(
+                            osp.join(save_path, 'images')):
+                        self.pack(save_path)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
-    def render_perceive(self, game_cfg, save_path):
-        game_class = GAME_REGISTRY.get(game_cfg.game_name)
-        annotations = []
-        for i in range(self.sample_size):
-            game = game_class(game_cfg)
-            gt = game.get_random_state()
-            screenshot = game.get_screenshot()
-            screenshot.save(osp.join(save_path, f'{i:07d}.jpg'))
-            annotation = {
-                'file': f'{i:07d}.jpg',
-                'gt': gt,
-            }
-            annotations.append(annotation)
-        with open(osp.join(save_path, 'annotation.json'),
-                  'w',
-                  encoding='utf-8') as json_file:
-            json.dump(
-                {
-                    'task': 'perceive',
-                    'game': game_cfg.game_name,
-                    'annotations': annotations,
-                }, json_file)
+    def init_app(self):
+        """Create the application the Qt renderers draw in, unless every
+        selected game config rasterises its screenshots. Games and their
+        renderers are reused across tasks, so it lives for the whole run."""
+        if any(
+                self.load_game_cfg(game).renderer != 'raster'
+                for game in self.benchmark_setting.games):
+            self.app = QApplication.instance() or QApplication(sys.argv)
+
+    def load_game_cfg(self, game):
+        if game not in self.game_cfgs:
+            self.game_cfgs[game] = AutoConfigurator.fromfile(
+                f'configs/games/{game}.py')
+        return self.game_cfgs[game]
 
-    def render_qa(self, game_cfg, save_path):
-        game_class = GAME_REGISTRY.get(game_cfg.game_name)
-        annotations = []
-        for i in range(self.sample_size):
-            game = game_class(game_cfg)
-            random_state = game.get_random_state()
-            QA = game_cfg.qa(game_cfg.game_description['qa'])
-            qa_pairs = QA.get_qa_pairs(random_state)
-            example_qa = '\n'.join(f'Question: {q}\nAnswer: {a}'
-                                   for q, a in qa_pairs[:QA.shot])
-            question, answer = qa_pairs[QA.shot]
-            screenshot = game.get_screenshot()
-            screenshot.save(osp.join(save_path, f'{i:07d}.jpg'))
-            annotation = {
-                'file': f'{i:07d}.jpg',
-                'gt': {
-                    'question': question,
-                    'answer': answer,
-                    'example_qa': example_qa
-                },
-            }
-            annotations.append(annotation)
+    def get_game(self, game_cfg):
+        """Return the game of this process, reset to a fresh state.
+
+        One game and its renderer are kept per game name and reused for
+        every sample instead of being rebuilt each time.
+        """
+        game = self.games.get(game_cfg.game_name)
+        if game is None:
+            game = GAME_REGISTRY.get(game_cfg.game_name)(game_cfg)
+            self.games[game_cfg.game_name] = game
+        else:
+            game.reset_state()
+        return game
+
+    def sample_seed(self, task, game, index):
+        """Seed of a single sample, independent of how samples are split
+        across workers."""
+        key = f'{self.seed}-{task}-{game}-{index}'.encode('utf-8')
+        return int.from_bytes(hashlib.sha256(key).digest()[:4], 'little')
+
+    def render(self, task, game, save_path, pool=None):
+        """Render all samples of a task, in `pool` if given, and write the
+        annotations in sample order."""
+        if task not in ('perceive', 'qa', 'rule'):
+            raise ValueError(f'Invalid task: {task}')
+        jobs = [(task, game, i, save_path) for i in range(self.sample_size)]
+        if pool is not None:
+            chunksize = max(1, len(jobs) // (self.workers * 8))
+            annotations = pool.map(render_sample_in_worker, jobs, chunksize)
+        else:
+            annotations = [self.render_sample(*job) for job in jobs]
         with open(osp.join(save_path, 'annotation.json'),
                   'w',
                   encoding='utf-8') as json_file:
             json.dump(
                 {
-                    'task': 'qa',
-                    'game': game_cfg.game_name,
+                    'task': task,
+                    'game': self.load_game_cfg(game).game_name,
                     'annotations': annotations,
                 }, json_file)
 
-    def render_rule(self, game_cfg, save_path):
-        game_class = GAME_REGISTRY.get(game_cfg.game_name)
-        annotations = []
-        for i in range(self.sample_size):
-            game = game_class(game_cfg)
-            rule_state, valid_movements = game.get_rule_state()
-            screenshot = game.get_screenshot()
-            screenshot.save(osp.join(save_path, f'{i:07d}.jpg'))
-            annotation = {
-                'file': f'{i:07d}.jpg',
-                'gt': {
-                    'rule_state': rule_state,
-                    'valid_movements': valid_movements
-                },
-            }
-            annotations.append(annotation)
+    def pack(self, save_path):
+        """Pack the screenshots of a task into a single image shard, with a
+        pre-resized copy for each of `packed_image_sizes`."""
         with open(osp.join(save_path, 'annotation.json'),
-                  'w',
+                  'r',
                   encoding='utf-8') as json_file:
-            json.dump(
-                {
-                    'task': 'rule',
-                    'game': game_cfg.game_name,
-                    'annotations': annotations,
-                }, json_file)
+            annotations = json.load(json_file)['annotations']
+        writer = ImageShardWriter(osp.join(save_path, 'images'),
+                                  self.packed_image_sizes)
+        for annotation in annotations:
+            with open(osp.join(save_path, annotation['file']), 'rb') as f:
+                writer.add(annotation['file'], f.read())
+        writer.close()
+
+    def render_sample(self, task, game, index, save_path):
+        """Render sample `index` of a task and return its annotation."""
+        set_random_seed(self.sample_seed(task, game, index))
+        game_cfg = self.load_game_cfg(game)
+        if task == 'perceive':
+            return self.render_perceive(game_cfg, index, save_path)
+        elif task == 'rule':
+            return self.render_rule(game_cfg, index, save_path)
+        elif task == 'qa':
+            return self.render_qa(game_cfg, index, save_path)
+        else:
+            raise ValueError(f'Invalid task: {task}')
+
+    def render_perceive(self, game_cfg, i, save_path):
+        game = self.get_game(game_cfg)
+        gt = game.get_random_state()
+        screenshot = game.get_screenshot()
+        screenshot.save(osp.join(save_path, f'{i:07d}.jpg'))
+        return {
+            'file': f'{i:07d}.jpg',
+            'gt': gt,
+        }
+
+    def render_qa(self, game_cfg, i, save_path):
+        game = self.get_game(game_cfg)
+        random_state = game.get_random_state()
+        QA = game_cfg.qa(game_cfg.game_description['qa'])
+        qa_pairs = QA.get_qa_pairs(random_state)
+        example_qa = '\n'.join(f'Question: {q}\nAnswer: {a}'
+                               for q, a in qa_pairs[:QA.shot])
+        question, answer = qa_pairs[QA.shot]
+        screenshot = game.get_screenshot()
+        screenshot.save(osp.join(save_path, f'{i:07d}.jpg'))
+        return {
+            'file': f'{i:07d}.jpg',
+            'gt': {
+                'question': question,
+                'answer': answer,
+                'example_qa': example_qa
+            },
+        }
+
+    def render_rule(self, game_cfg, i, save_path):
+        game = self.get_game(game_cfg)
+        rule_state, valid_movements = game.get_rule_state()
+        gt = {'rule_state': rule_state, 'valid_movements': valid_movements}
+        optimal_movements = game.get_optimal_movements()
+        if optimal_movements is not None:
+            gt['optimal_movements'] = optimal_movements
+        screenshot = game.get_screenshot()
+        screenshot.save(osp.join(save_path, f'{i:07d}.jpg'))
+        return {'file': f'{i:07d}.jpg', 'gt': gt}
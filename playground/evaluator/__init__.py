@@ -1,5 +1,5 @@
 from .base_qa import BaseQuestionAnswering
 from .evaluator import Evaluator
-from .metric import Metric
+from .metric import Metric, load_annotations
 
-__all__ = ['Evaluator', 'BaseQuestionAnswering', 'Metric']
+__all__ = ['Evaluator', 'BaseQuestionAnswering', 'Metric', 'load_annotations']
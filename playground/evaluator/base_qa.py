@@ -10,12 +10,14 @@ class BaseQuestionAnswering:
         raise NotImplementedError('Subclasses should implement this method.')
 
     def get_qa_pairs(self, game_state):
-        qa_pairs = set()
+        # A dict keeps the pairs unique in insertion order, so the result only
+        # depends on the random seed and not on string hashing.
+        qa_pairs = {}
         while len(qa_pairs) < self.shot + 1:
             question, answer = self.get_qa_pair(game_state)
             qa_pair = (question, answer)
             if qa_pair not in qa_pairs:
-                qa_pairs.add(qa_pair)
+                qa_pairs[qa_pair] = None
 
         return list(qa_pairs)
 
@@ -80,5 +80,20 @@ class Evaluator:
 
         return result, simulator
 
+    def run_batch(self, batches):
+        """Run several offline samples of this task in one batched call."""
+        if self.task == 'e2e':
+            raise ValueError('Batched evaluation is not supported for e2e.')
+        crt_save_path = osp.join(self.save_path)
+        simulator = GameSimulator(self.game_cfg,
+                                  self.agent,
+                                  self.seed,
+                                  crt_save_path,
+                                  self.task,
+                                  log_file=self.log_file)
+        results = simulator.offline_batch(batches)
+
+        return results, simulator
+
     def cleanup(self):
         torch.cuda.empty_cache()
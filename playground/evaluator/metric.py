@@ -1,9 +1,33 @@
+import glob
 import json
 import os.path as osp
-import re
 
 import numpy as np
 
+from playground.parsing import (MOVE_FORMATS, extract_matrix, parse_choice,
+                                parse_matrix, parse_move)
+from playground.utils import load_record
+
+
+def load_annotation(annotation_dir, task, game):
+    """Load the annotation of a task and game, or `None` if missing."""
+    annotation_path = osp.join(annotation_dir, task, game, 'annotation.json')
+    if not osp.exists(annotation_path):
+        return None
+    with open(annotation_path, 'r') as f:
+        return json.load(f)
+
+
+def load_annotations(annotation_dir):
+    """Load all annotations of a benchmark, by `(task, game)`."""
+    annotations = {}
+    for path in sorted(
+            glob.glob(osp.join(annotation_dir, '*', '*', 'annotation.json'))):
+        task, game = osp.relpath(path, annotation_dir).split(osp.sep)[:2]
+        with open(path, 'r') as f:
+            annotations[(task, game)] = json.load(f)
+    return annotations
+
 
 class Metric:
     MATRIX_CONFIG = {
@@ -40,14 +64,8 @@ class Metric:
     }
 
     RULE_FORMATS = {
-        'tictactoe': r'(?:Movement:\s*)?([A-Ca-c][1-3]|[1-3][A-Ca-c])',
-        'sudoku': r'(?:Movement:\s*)?([A-Ia-i][1-9]\s[1-9])',
-        'chess':
-        r'(?:Movement:\s*)?([a-hA-H][1-8][a-hA-H][1-8]|[a-hA-H][1-8]|O-O|O-O-O|(?:N|B|R|Q|K)?[a-hA-H]?[1-8]?x?[a-hA-H][1-8](?:=[QRNB])?|(?:N|B|R|Q|K)[a-hA-H][1-8])',  # noqa
-        'gomoku':
-        r'(?:Movement:\s*)?([A-Oa-o](?:[1-9]|1[0-5])|(?:[1-9]|1[0-5])[A-Oa-o])',  # noqa
-        'minesweeper': r'(?:Movement:\s*)?([A-Ha-h][1-8]|[1-8][A-Ha-h])',
-        'reversi': r'(?:Movement:\s*)?([A-Ha-h][1-8]|[1-8][A-Ha-h])'
+        game: r'(?:Movement:\s*)?' + pattern
+        for game, pattern in MOVE_FORMATS.items()
     }
 
     TASK_ABILITIES = {
@@ -96,119 +114,68 @@ class Metric:
         }
     }
 
-    def __init__(self, record_path, annotation_dir):
+    def __init__(self,
+                 record_path,
+                 annotation_dir,
+                 annotations=None,
+                 log_dir=None,
+                 record=None):
         self.record_path = record_path
         self.annotation_dir = annotation_dir
-        with open(self.record_path, 'r') as f:
-            self.record = json.load(f)
+        # Verification logs go next to the record unless a directory is set.
+        self.log_dir = log_dir or osp.dirname(record_path) or '.'
+        # Annotations by `(task, game)`, shared when several records are
+        # evaluated against the same benchmark.
+        self.annotations = annotations if annotations is not None else {}
+        # A record already loaded by the caller is not read again.
+        self.record = record if record is not None else load_record(
+            self.record_path)
         self.debug_results = {}
         self.scores = {}
         self.weighted_summary = {}
 
     def parse_perceive(self, lmm_output, game_name):
         if not lmm_output:
-            return None, "No output provided"
-
-        target_content = lmm_output
-        if "Game State:" in lmm_output:
-            target_content = lmm_output.split("Game State:")[-1]
-
-        python_pattern = r'(\[\s*\[.*?\]\s*\])'
-        latex_pattern = r'(\\begin\{bmatrix\}.*?\\end\{bmatrix\})'
-        
-        combined_pattern = f"{python_pattern}|{latex_pattern}"
-        
-        iterator = re.finditer(combined_pattern, target_content, re.DOTALL)
-        matches = [m.group(0) for m in iterator]
-
-        if not matches and target_content != lmm_output:
-            iterator = re.finditer(combined_pattern, lmm_output, re.DOTALL)
-            matches = [m.group(0) for m in iterator]
-        
-        if not matches:
-            return None, "No matrix pattern found"
-        valid_matches = [m for m in matches if "int(" not in m and "board[" not in m]
-        
-        if not valid_matches:
-            return None, "Only code logic found, no concrete data matrix"
-        final_matrix_str = valid_matches[-1]
-
-
-        clean_str = final_matrix_str.replace("'", "").replace('"', "")
-        clean_str = clean_str.replace("X", "1").replace("x", "1")
-        clean_str = clean_str.replace("O", "0").replace("o", "0")
-
-        numbers = re.findall(r'-?\d+', clean_str)
-        
+            return None, 'No output provided'
+        matrix_str, reason = extract_matrix(lmm_output)
+        if reason:
+            return None, reason
         config = self.MATRIX_CONFIG.get(game_name)
         if not config:
-            return None, f"Unknown game config: {game_name}"
-            
-        if len(numbers) != config['count']:
-            return None, f"Number count mismatch: expected {config['count']}, got {len(numbers)}. Parsed string: {final_matrix_str}"
-
-        try:
-            matrix_flat = [int(num) for num in numbers]
-            if not all(num in config['valid_range'] for num in matrix_flat):
-                 return None, f"Numbers out of range {config['valid_range']}"
-
-            matrix = [
-                matrix_flat[i:i + config['size']]
-                for i in range(0, config['count'], config['size'])
-            ]
-            return matrix, None
-        except ValueError as e:
-            return None, f'Conversion error: {e}'
+            return None, f'Unknown game config: {game_name}'
+        return parse_matrix(matrix_str, config['size'], config['count'],
+                            config['valid_range'])
 
     def parse_rule(self, lmm_output, game_name):
         if lmm_output is None:
             return None, 'No valid output found.'
-        pattern = self.RULE_FORMATS.get(game_name)
-        if not pattern:
+        if game_name not in MOVE_FORMATS:
             return None, 'No pattern defined for this game'
-        match = re.search(pattern, lmm_output, re.IGNORECASE)
-        if match:
-            move = match.group(1)
-            if game_name in ['tictactoe', 'gomoku', 'minesweeper', 'reversi'
-                             ] and move[0].isdigit():
-                move = move[1:] + move[0]
-            return move.upper(), None
+        move = parse_move(lmm_output, game_name)
+        if move:
+            return move, None
         return None, 'Move format not matched'
 
     def parse_qa(self, lmm_output, _):
         if lmm_output is None:
             return None, 'No valid output found.'
-        patterns = [
-            r'(?:Final\s+Answer[:\s]*(?:\\boxed{)?\s*)([A-Da-d])(?:\s*})?',
-            r'Answer[:\s]+([A-Da-d])(?:\s*\d)?', r'\[([A-Da-d])\]'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, lmm_output, re.IGNORECASE)
-            if match:
-                return match.group(1).upper(), None
-
-        match = re.search(r'([A-Da-d])(?:\s*\]|\.|$|\s)', lmm_output,
-                          re.IGNORECASE)
-        if match:
-            return match.group(1).upper(), None
-
+        answer = parse_choice(lmm_output)
+        if answer:
+            return answer, None
         return None, 'Answer format not matched (expected [A-D])'
 
     def evaluate_perceive(self, game_name, annotation):
         results = self.record['perceive'][game_name]
-        accuracies = []
+        config = self.MATRIX_CONFIG[game_name]
+        size = config['size']
         debug_data = []
-
         verification_data = []
 
-        # Evaluate each result
-        error_states = {
-            'empty_as_piece': 0, # empty cell(-1) interpreted as O/X(0/1)
-            'piece_as_empty': 0, # O/X(0/1) interpreted as empty cell(-1)
-            'wrong_piece': 0,     # O interpreted as X or vice versa
-            'correct':0,
-            'total_cells':0
-        }
+        # Boards of all samples stacked into (N, size, size) arrays; samples
+        # whose output could not be parsed are masked out and score 0.
+        gt_boards = np.zeros((len(results), size, size), dtype=np.int64)
+        parsed_boards = np.zeros_like(gt_boards)
+        valid = np.zeros(len(results), dtype=bool)
         for i, result in enumerate(results):
             if result is None or 'raw' not in result:
                 debug_data.append({
@@ -217,7 +184,6 @@ class Metric:
                     'parsed': None,
                     'reason': 'No raw output provided'
                 })
-                accuracies.append(0)
                 continue
 
             lmm_output = result['raw']
@@ -227,82 +193,113 @@ class Metric:
             if reason:
                 entry['reason'] = reason
             debug_data.append(entry)
+            verification_data.append({
+                'index': i,
+                'parsed': parsed_matrix,
+                'gt': gt,
+                'score': 0,
+                'raw': lmm_output
+            })
             if parsed_matrix is None:
-                accuracies.append(0)
-                verification_data.append({
-                    'index': i, 'parsed': f"Parse Error: {reason}", 'gt': gt, 'score': 0, 'raw': lmm_output
-                })
+                verification_data[-1]['parsed'] = f'Parse Error: {reason}'
             else:
-                gt_np = np.array(gt)
-                matrix_np = np.array(parsed_matrix)
-                accuracy = np.sum(gt_np == matrix_np) / gt_np.size
-                accuracies.append(accuracy)
-
-                error_detail = self._analyze_perceive_errors(gt_np, matrix_np)
-                entry['error_analysis'] = error_detail
+                gt_boards[i] = gt
+                parsed_boards[i] = parsed_matrix
+                valid[i] = True
+
+        errors = self._analyze_perceive_errors(gt_boards, parsed_boards)
+        accuracies = np.where(valid, errors['correct'] / config['count'], 0)
+        for entry in debug_data:
+            if entry['parsed'] is not None:
+                entry['error_analysis'] = {
+                    key: int(counts[entry['index']])
+                    for key, counts in errors.items()
+                }
+        for entry in verification_data:
+            entry['score'] = float(accuracies[entry['index']])
 
-                for key in error_states:
-                    error_states[key] += error_detail.get(key, 0)
-
-                debug_data.append(entry)
-
-                verification_data.append({
-                    'index': i, 'parsed': parsed_matrix, 'gt': gt, 'score': accuracy, 'raw': lmm_output
-                })
-        
         self.log_verification('perceive', game_name, verification_data)
 
-        # Calculate error percentages
+        error_states = {
+            key: int(counts[valid].sum())
+            for key, counts in errors.items()
+        }
         total_cells = error_states['total_cells']
-        if total_cells > 0:
-            error_percentages = {
-                'empty_as_piece':round(error_states['empty_as_piece']/total_cells * 100, 2),
-                'piece_as_empty':round(error_states['piece_as_empty']/total_cells * 100, 2),
-                'wrong_piece':round(error_states['wrong_piece']/total_cells * 100, 2),
-                'correct':round(error_states['correct']/total_cells * 100, 2)
-            }
-        else:
-            error_percentages = {k: 0 for k in ['empty_as_piece', 'piece_as_empty', 'wrong_piece', 'correct']}
-       
+        error_percentages = {
+            key: round(error_states[key] / total_cells *
+                       100, 2) if total_cells > 0 else 0
+            for key in
+            ['empty_as_piece', 'piece_as_empty', 'wrong_piece', 'correct']
+        }
+
         if 'perceive' not in self.debug_results:
             self.debug_results['perceive'] = {}
         self.debug_results['perceive'][game_name] = debug_data
-        avg_score = round(sum(accuracies) /
-                          len(accuracies), 3) if accuracies else 0
+        avg_score = round(float(accuracies.mean()), 3) if len(results) else 0
         if 'perceive' not in self.scores:
             self.scores['perceive'] = {}
 
         # Store both average score and error analysis
         self.scores['perceive'][game_name] = {
-            'average_accuracy': avg_score,
-            'error_percentages': error_percentages,
-            'error_states': error_states
+            'average_accuracy':
+            avg_score,
+            'error_percentages':
+            error_percentages,
+            'error_states':
+            error_states,
+            'confusion_matrix':
+            self._perceive_confusion_matrix(gt_boards[valid],
+                                            parsed_boards[valid],
+                                            config['valid_range'])
         }
         return avg_score
-    
-    def _analyze_perceive_errors(self, gt_np, matrix_np):
-        error_details = {
-            'empty_as_piece': 0,
-            'piece_as_empty': 0,
-            'wrong_piece': 0,
-            'correct': 0,
-            'total_cells': gt_np.size
-        }
 
-        empty_value = -1
-        piece_values = [0,1]
+    def _analyze_perceive_errors(self, gt_boards, parsed_boards):
+        """Count the error categories of each of the stacked boards.
 
-        for gt_val, pred_val in zip(gt_np.flat, matrix_np.flat):
-            if gt_val == pred_val:
-                error_details['correct'] += 1
-            elif gt_val == empty_value and pred_val in piece_values:
-                error_details['empty_as_piece'] += 1
-            elif gt_val in piece_values and pred_val == empty_value:
-                error_details['piece_as_empty'] += 1
-            elif gt_val in piece_values and pred_val in piece_values and gt_val != pred_val:
-                error_details['wrong_piece'] += 1
+        An empty cell is `-1` and pieces are `0` and `1`, as in Tic Tac Toe.
+        """
+        empty_value = -1
+        piece_values = [0, 1]
+
+        axes = tuple(range(1, gt_boards.ndim))
+        cells = gt_boards[0].size if len(gt_boards) else 0
+        correct = gt_boards == parsed_boards
+        gt_empty = gt_boards == empty_value
+        gt_piece = np.isin(gt_boards, piece_values)
+        parsed_empty = parsed_boards == empty_value
+        parsed_piece = np.isin(parsed_boards, piece_values)
+        return {
+            'empty_as_piece': (gt_empty & parsed_piece).sum(axes),
+            'piece_as_empty': (gt_piece & parsed_empty).sum(axes),
+            'wrong_piece': (gt_piece & parsed_piece & ~correct).sum(axes),
+            'correct': correct.sum(axes),
+            'total_cells': np.full(len(gt_boards), cells)
+        }
 
-        return error_details
+    def _perceive_confusion_matrix(self, gt_boards, parsed_boards,
+                                   valid_range):
+        """Confusion matrix of the cell values, with ground truth values as
+        rows and parsed values as columns in `valid_range` order."""
+        labels = np.array(valid_range)
+        order = np.argsort(labels)
+
+        def label_index(boards):
+            values = boards.ravel()
+            position = np.searchsorted(labels[order], values)
+            index = order[position.clip(0, len(labels) - 1)]
+            return index, labels[index] == values
+
+        gt_index, gt_known = label_index(gt_boards)
+        parsed_index, parsed_known = label_index(parsed_boards)
+        known = gt_known & parsed_known
+        matrix = np.bincount(gt_index[known] * len(labels) +
+                             parsed_index[known],
+                             minlength=len(labels)**2)
+        return {
+            'labels': list(valid_range),
+            'matrix': matrix.reshape(len(labels), len(labels)).tolist()
+        }
 
     def evaluate_qa(self, game_name, annotation):
         results = self.record['qa'][game_name]
@@ -358,6 +355,14 @@ class Metric:
             entry = {'index': i, 'raw': lmm_output, 'parsed': parsed_move}
             if reason:
                 entry['reason'] = reason
+            # Games that solve their positions also annotate the best moves,
+            # reported in the result details without changing the score.
+            optimal_movements = annotation['annotations'][i]['gt'].get(
+                'optimal_movements')
+            if parsed_move and optimal_movements is not None:
+                entry['optimal'] = parsed_move.lower() in [
+                    move.lower() for move in optimal_movements
+                ]
             debug_data.append(entry)
             if parsed_move:
                 normalized_move = parsed_move.lower()
@@ -412,6 +417,15 @@ class Metric:
         self.scores['e2e'][game_name] = avg_score
         return avg_score
 
+    def load_annotation(self, task, game):
+        if task == 'e2e':
+            return None
+        key = (task, game)
+        if key not in self.annotations:
+            self.annotations[key] = load_annotation(self.annotation_dir, task,
+                                                    game)
+        return self.annotations[key]
+
     def evaluate_all(self):
         if self.scores and self.weighted_summary:
             return self.scores
@@ -423,13 +437,7 @@ class Metric:
             total_weight = 0
 
             for game in self.record[task]:
-                annotation_path = osp.join(self.annotation_dir, task, game,
-                                           'annotation.json')
-                if task != 'e2e' and osp.exists(annotation_path):
-                    with open(annotation_path, 'r') as f:
-                        annotation = json.load(f)
-                else:
-                    annotation = None
+                annotation = self.load_annotation(task, game)
 
                 if task == 'perceive':
                     avg_score = self.evaluate_perceive(game, annotation)
@@ -467,9 +475,10 @@ class Metric:
             json.dump(result, f, indent=4)
     
     def log_verification(self, task, game_name, log_data):
-        # 将日志保存在 record_path 同级目录下
-        base_dir = osp.dirname(self.record_path)
-        log_file = osp.join(base_dir, f"{game_name}_{task}_verification.json")
+        # One log per record, so records scored in parallel never share one
+        record_name = osp.splitext(osp.basename(self.record_path))[0]
+        log_file = osp.join(
+            self.log_dir, f'{record_name}_{game_name}_{task}_verification.txt')
         
         with open(log_file, 'w', encoding='utf-8') as f:
             f.write(f"Verification Log for {game_name} - {task}\n")
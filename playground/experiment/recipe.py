@@ -2,13 +2,15 @@ import gc
 import json
 import os
 import os.path as osp
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import torch
 from pjtools.configurator import AutoConfigurator
 
+from playground.agents.cache import CachedAgent, CacheMissError, ResponseCache
 from playground.evaluator import Evaluator
 from playground.registry import AGENT_REGISTRY
-from playground.state_code import GameStatusEncoder
+from playground.utils import ImageShard, RecordStore
 
 
 class Recipe:
@@ -23,21 +25,46 @@ class Recipe:
         self.save_path = osp.join(self.recipe.save_path, self.recipe.name)
         os.makedirs(self.save_path, exist_ok=True)
         self.log_file = osp.join(self.save_path, 'evaluation.log')
+        self.concurrency = getattr(args, 'concurrency',
+                                   None) or self.recipe.concurrency or 1
+        self.batch_size = getattr(args, 'batch_size',
+                                  None) or self.recipe.batch_size or 1
 
-        self.agent = AGENT_REGISTRY.get(self.agent_cfg.lmm_agent.agent)(
-            self.agent_cfg)
+        self.agent = self.build_agent()
 
         self.init_experiment_record()
 
+    def build_agent(self):
+        """Build the agent, wrapped in the response cache if configured.
+
+        In `replay` mode the model is never loaded and only cached responses
+        are served.
+        """
+        cache_cfg = self.recipe.response_cache
+        mode = cache_cfg.mode or 'readwrite' if cache_cfg else None
+        if mode not in (None, 'readwrite', 'replay'):
+            raise ValueError(f'Unknown response cache mode: {mode}')
+        agent = None
+        if mode != 'replay':
+            agent = AGENT_REGISTRY.get(self.agent_cfg.lmm_agent.agent)(
+                self.agent_cfg)
+        if mode is None:
+            return agent
+        cache = ResponseCache(cache_cfg.path,
+                              max_entries=cache_cfg.max_entries,
+                              max_bytes=cache_cfg.max_bytes,
+                              readonly=mode == 'replay')
+        return CachedAgent(self.agent_cfg,
+                           cache,
+                           agent,
+                           replay=mode == 'replay')
+
     def init_experiment_record(self):
         self.record_path = osp.join(
             self.save_path,
             self.agent_cfg.lmm_agent.name + self.recipe.name + '.json')
-        if osp.exists(self.record_path):
-            with open(self.record_path, 'r') as f:
-                self.record = json.load(f)
-        else:
-            self.record = {}
+        self.record_store = RecordStore(self.record_path)
+        self.record = RecordStore.load(self.record_path)
 
         self.update_record_with_new_tasks_and_games()
         self.save_record()
@@ -57,8 +84,14 @@ class Recipe:
                     self.record[task][game] = [None] * repetition_round
 
     def save_record(self):
-        with open(self.record_path, 'w') as f:
-            json.dump(self.record, f, indent=4, cls=GameStatusEncoder)
+        """Write the whole record to disk, folding in the journal."""
+        self.record_store.compact(self.record)
+
+    def save_results(self, task, game, chunk, results):
+        """Store the results of a finished chunk and journal each round."""
+        for round_idx, result in zip(chunk, results):
+            self.record[task][game][round_idx] = result
+            self.record_store.append(task, game, round_idx, result)
 
     def run_experiments(self):
         tasks = self.recipe.tasks
@@ -73,6 +106,7 @@ class Recipe:
                                                ] * self.recipe.repetition_round
                     self.save_record()
 
+                annotation = None
                 if task != 'e2e':
                     with open(osp.join(self.benchmark_setting.benchmark_path,
                                        task, game, 'annotation.json'),
@@ -84,46 +118,20 @@ class Recipe:
                     assert len(annotation['annotations']
                                ) == self.benchmark_setting.sample_size
 
-                completed_rounds = self.record[task][game]
-
                 game_cfg = AutoConfigurator.fromfile(
                     f'configs/games/{game}.py')
 
                 evaluator = Evaluator(game_cfg, self.agent, task,
                                       self.log_file, self.save_path)
 
-                while None in completed_rounds:
-                    next_round = completed_rounds.index(None)
-
-                    print(f'Running experiment for task: {task}, '
-                          f'game: {game}, round: {next_round + 1}')
-
-                    try:
-                        if task != 'e2e':
-                            batch = {
-                                'task':
-                                task,
-                                'screenshot_path':
-                                osp.join(self.benchmark_setting.benchmark_path,
-                                         task, game, f'{next_round:07d}.jpg'),
-                                'gt':
-                                annotation['annotations'][next_round]['gt'],
-                                'game_cfg':
-                                game_cfg
-                            }
-                        else:
-                            batch = {'task': task, 'game_cfg': game_cfg}
-                        result, simulator = evaluator.run(batch)
-                        simulator.cleanup()
-                        self.record[task][game][next_round] = result
-                        self.save_record()
-                        completed_rounds = self.record[task][game]
-                    except Exception as e:
-                        print(
-                            f'Error occurred during task {task}, game {game}, '
-                            f'round {next_round + 1}: {e}')
-                        continue
+                if task != 'e2e' and self.concurrency > 1:
+                    self.run_rounds_concurrently(task, game, annotation,
+                                                 game_cfg, evaluator)
+                else:
+                    self.run_rounds(task, game, annotation, game_cfg,
+                                    evaluator)
 
+                self.save_record()
                 print(f'Task: {task}, game: {game} has been completed.')
 
                 torch.cuda.synchronize()
@@ -132,10 +140,133 @@ class Recipe:
                 torch.cuda.empty_cache()
                 gc.collect()
 
+    def build_batch(self, task, game, round_idx, annotation, game_cfg):
+        """Build the evaluator input for a single round."""
+        if task == 'e2e':
+            return {'task': task, 'game_cfg': game_cfg}
+        return {
+            'task':
+            task,
+            'screenshot_path':
+            self.load_screenshot(task, game, f'{round_idx:07d}.jpg'),
+            'gt':
+            annotation['annotations'][round_idx]['gt'],
+            'game_cfg':
+            game_cfg
+        }
+
+    def load_screenshot(self, task, game, file):
+        """Return the screenshot from the packed image shard of the game if
+        there is one, resized to the agent input size when the shard holds
+        that variant, and its path otherwise."""
+        path = osp.join(self.benchmark_setting.benchmark_path, task, game)
+        shard_path = osp.join(path, 'images')
+        if ImageShard.exists(shard_path):
+            return ImageShard.open(shard_path).get(
+                file, self.agent_cfg.lmm_agent.image_size)
+        return osp.join(path, file)
+
+    def run_round(self, evaluator, batch):
+        result, simulator = evaluator.run(batch)
+        simulator.cleanup()
+        return result
+
+    def run_chunk(self, evaluator, task, game, chunk, annotation, game_cfg):
+        """Run a group of rounds, batching the agent calls when possible."""
+        batches = [
+            self.build_batch(task, game, round_idx, annotation, game_cfg)
+            for round_idx in chunk
+        ]
+        if len(batches) == 1:
+            return [self.run_round(evaluator, batches[0])]
+        results, simulator = evaluator.run_batch(batches)
+        simulator.cleanup()
+        return results
+
+    def pending_chunks(self, task, game):
+        """Group the unfinished rounds of a game into agent batches."""
+        pending = [
+            round_idx
+            for round_idx, result in enumerate(self.record[task][game])
+            if result is None
+        ]
+        size = self.batch_size if task != 'e2e' else 1
+        return [pending[i:i + size] for i in range(0, len(pending), size)]
+
+    @staticmethod
+    def describe_chunk(chunk):
+        if len(chunk) == 1:
+            return f'round: {chunk[0] + 1}'
+        return f'rounds: {chunk[0] + 1}-{chunk[-1] + 1}'
+
+    def run_rounds(self, task, game, annotation, game_cfg, evaluator):
+        """Run the remaining rounds of a game one chunk after another."""
+        completed_rounds = self.record[task][game]
+        while None in completed_rounds:
+            chunk = self.pending_chunks(task, game)[0]
+
+            print(f'Running experiment for task: {task}, '
+                  f'game: {game}, {self.describe_chunk(chunk)}')
+
+            try:
+                results = self.run_chunk(evaluator, task, game, chunk,
+                                         annotation, game_cfg)
+                self.save_results(task, game, chunk, results)
+                completed_rounds = self.record[task][game]
+            except CacheMissError:
+                raise
+            except Exception as e:
+                print(f'Error occurred during task {task}, game {game}, '
+                      f'{self.describe_chunk(chunk)}: {e}')
+                continue
+
+    def run_rounds_concurrently(self, task, game, annotation, game_cfg,
+                                evaluator):
+        """Run the remaining offline rounds with ``self.concurrency`` chunks
+        in flight at once.
+
+        Every chunk is written to its own slots in ``self.record`` as soon as
+        it finishes, so an interrupted run resumes from the slots that are
+        still ``None``, exactly like the sequential scheduler.
+        """
+        completed_rounds = self.record[task][game]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while None in completed_rounds:
+                futures = {
+                    executor.submit(self.run_chunk, evaluator, task, game,
+                                    chunk, annotation, game_cfg): chunk
+                    for chunk in self.pending_chunks(task, game)
+                }
+
+                try:
+                    for future in as_completed(futures):
+                        chunk = futures[future]
+                        try:
+                            results = future.result()
+                        except CacheMissError:
+                            raise
+                        except Exception as e:
+                            print(f'Error occurred during task {task}, '
+                                  f'game {game}, '
+                                  f'{self.describe_chunk(chunk)}: {e}')
+                            continue
+                        print(f'Finished experiment for task: {task}, '
+                              f'game: {game}, {self.describe_chunk(chunk)}')
+                        self.save_results(task, game, chunk, results)
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+                completed_rounds = self.record[task][game]
+
     def cleanup(self):
         """Clean up resources at the end of the experiment."""
-        if hasattr(self.agent, 'model'):
-            del self.agent.model
-        del self.agent
+        agent = self.agent
+        if isinstance(agent, CachedAgent):
+            agent.cache.close()
+            agent = agent.agent
+        if hasattr(agent, 'model'):
+            del agent.model
+        del agent, self.agent
         torch.cuda.empty_cache()
         gc.collect()
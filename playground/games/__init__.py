@@ -2,13 +2,14 @@ from .base import BaseGame, BaseGameLogic
 from .chess import Chess, ChessQuestionAnswering
 from .gomoku import Gomoku, GomokuQuestionAnswering
 from .minesweeper import MineSweeper, MinesweeperQuestionAnswering
+from .raster import RasterRenderer
 from .reversi import Reversi, ReversiQuestionAnswering
 from .sudoku import Sudoku, SudokuQuestionAnswering
 from .tictactoe import TicTacToe, TicTacToeQuestionAnswering
 
 __all__ = [
-    'BaseGame', 'BaseGameLogic', 'Gomoku', 'TicTacToe', 'MineSweeper',
-    'Sudoku', 'Reversi', 'Chess', 'TicTacToeQuestionAnswering',
+    'BaseGame', 'BaseGameLogic', 'RasterRenderer', 'Gomoku', 'TicTacToe',
+    'MineSweeper', 'Sudoku', 'Reversi', 'Chess', 'TicTacToeQuestionAnswering',
     'SudokuQuestionAnswering', 'ReversiQuestionAnswering',
     'MinesweeperQuestionAnswering', 'GomokuQuestionAnswering',
     'ChessQuestionAnswering'
@@ -3,11 +3,33 @@ from playground.state_code import GameStatus
 
 class BaseGame:
     AI_component = False
+    renderer_class = None
+    raster_renderer_class = None
 
     def __init__(self, game_cfg) -> None:
         self.status = GameStatus.IN_PROGRESS
         self.game_cfg = game_cfg
 
+    def reset_state(self, state=None):
+        """Start over from a fresh logic state, keeping the renderer.
+
+        The logic is rebuilt exactly as in `__init__`, so it draws the same
+        random numbers as constructing a new game would. If `state` is given
+        it is then loaded with `BaseGameLogic.load_state`.
+        """
+        self.status = GameStatus.IN_PROGRESS
+        self.logic = type(self.logic)(self.game_cfg)
+        if state is not None:
+            self.logic.load_state(state)
+        if getattr(self, 'renderer', None) is not None:
+            self.renderer.logic = self.logic
+
+    def create_renderer(self):
+        """Build the renderer selected by `renderer` in the game config."""
+        if self.game_cfg.renderer == 'raster':
+            return self.raster_renderer_class(self.logic, self.game_cfg)
+        return self.renderer_class(self.logic)
+
     def get_screenshot(self):
         raise NotImplementedError
 
@@ -23,6 +45,11 @@ class BaseGame:
     def get_rule_state(self):
         raise NotImplementedError
 
+    def get_optimal_movements(self):
+        """Best moves of the side to move, or `None` if the game does not
+        solve its positions."""
+        return None
+
     def calculate_score(self):
         """Calculate score based on current game state."""
         raise NotImplementedError
@@ -30,6 +57,10 @@ class BaseGame:
 
 class BaseGameLogic:
 
+    def load_state(self, state):
+        """Replace the current position with `state`."""
+        raise NotImplementedError('Subclasses must implement load_state')
+
     def parse_e2e(self, lmm_output):
         """Parse e2e output to a move."""
         raise NotImplementedError('Subclasses must implement parse_e2e')
@@ -1,12 +1,14 @@
 import random
-import re
 
 import chess
-import chess.engine
 from PyQt5.QtWidgets import QMainWindow
 
+import playground.games.chess.common.common as common
 from playground.games import BaseGame, BaseGameLogic
-from playground.games.chess.chess_ui import ChessUI
+from playground.games.chess.chess_ui import ChessBoardView
+from playground.games.chess.engine import engine_move
+from playground.games.raster import RasterRenderer, widget_box
+from playground.parsing import parse_move
 from playground.registry import GAME_REGISTRY
 from playground.state_code import GameStatus
 
@@ -75,6 +77,14 @@ class ChessLogic(BaseGameLogic):
         self.turn = 'white' if self.user_is_white else 'black'
         self.moves_history = []
 
+    def load_state(self, state):
+        """Load a position given as a FEN string or a `chess.Board`."""
+        self.board = state.copy() if isinstance(
+            state, chess.Board) else chess.Board(state)
+        self.turn = 'white' if self.board.turn == chess.WHITE else 'black'
+        self.moves_history = []
+        self._update_game_status()
+
     def get_random_state(self):
         """Generate a random game state."""
         self.reset_board()
@@ -175,13 +185,8 @@ class ChessLogic(BaseGameLogic):
 
     def parse_e2e(self, lmm_output):
         """Parse e2e output to a move in SAN format."""
-        match = re.search(
-            r'Movement:\s*([a-hA-H][1-8][a-hA-H][1-8]|[a-hA-H][1-8]|O-O|O-O-O|(?:N|B|R|Q|K)?[a-hA-H]?[1-8]?x?[a-hA-H][1-8](?:=[QRNB])?|(?:N|B|R|Q|K)[a-hA-H][1-8])',  # noqa
-            lmm_output,
-            re.IGNORECASE)
-        if match:
-            return match.group(1)
-        return GameStatus.INVALID_MOVE
+        return parse_move(lmm_output, 'chess',
+                          e2e=True) or GameStatus.INVALID_MOVE
 
 
 class ChessRenderer(QMainWindow):
@@ -190,38 +195,62 @@ class ChessRenderer(QMainWindow):
     def __init__(self, logic):
         super().__init__()
         self.logic = logic
-        self.ui = ChessUI(self, user_is_white=self.logic.user_is_white)
+        self.ui = ChessBoardView(self, user_is_white=self.logic.user_is_white)
         self.setCentralWidget(self.ui)
-        self.ui.position = self.logic.board
-        self.ui.reset_board()
 
     def get_screenshot(self):
         """Generate screenshot of the current board."""
-        self.ui.position = self.logic.board
-        self.ui.refresh_from_state()
+        self.ui.set_board(self.logic.board)
         screenshot = self.ui.grab()
         return screenshot
 
 
+class ChessRaster(RasterRenderer):
+    """Raster renderer for Chess."""
+
+    qt_renderer = ChessRenderer
+    states = tuple('PNBRQKpnbrqk')
+
+    def cells(self, logic):
+        cells = [[None] * 8 for _ in range(8)]
+        for sqr_index in range(64):
+            piece = logic.board.piece_at(sqr_index)
+            if piece:
+                col, row = common.square_to_coords[
+                    common.squares_san[sqr_index]]
+                cells[row][col] = piece.symbol()
+        return cells
+
+    def set_probe(self, logic, key, state):
+        logic.board = chess.Board(None)
+        if state is not None:
+            piece = chess.Piece.from_symbol(state)
+            for sqr_index in range(64):
+                logic.board.set_piece_at(sqr_index, piece)
+
+    def boxes(self, renderer):
+        layout = renderer.ui.layout
+        return [[
+            widget_box(renderer.ui,
+                       layout.itemAtPosition(row + 1, col + 1).widget())
+            for col in range(8)
+        ] for row in range(8)]
+
+
 @GAME_REGISTRY.register('chess')
 class Chess(BaseGame):
     AI_component = True
+    renderer_class = ChessRenderer
+    raster_renderer_class = ChessRaster
 
     def __init__(self, game_cfg):
         super().__init__(game_cfg)
         self.logic = ChessLogic(game_cfg)
         self.renderer = None
-        self.engine = chess.engine.SimpleEngine.popen_uci(
-            '/usr/games/stockfish')
-
-    def __del__(self):
-        """Cleanup engine resources."""
-        if hasattr(self, 'engine'):
-            self.engine.quit()
 
     def get_screenshot(self):
         if self.renderer is None:
-            self.renderer = ChessRenderer(self.logic)
+            self.renderer = self.create_renderer()
         return self.renderer.get_screenshot()
 
     def input_move(self, move):
@@ -241,9 +270,11 @@ class Chess(BaseGame):
         if not self.AI_component or self.logic.status != GameStatus.IN_PROGRESS:  # noqa
             return None
 
-        result = self.engine.play(self.logic.board,
-                                  chess.engine.Limit(time=1.0))
-        chess_move = result.move
+        # The logic is rebuilt for every game, so it identifies the game to
+        # the pooled engines.
+        chess_move = engine_move(self.logic.board,
+                                 self.game_cfg,
+                                 game=self.logic)
         if chess_move in self.logic.board.legal_moves:
             san_move = self.logic.board.san(chess_move)
             if self.logic.make_move(san_move, is_ai=True):
@@ -1,5 +1,6 @@
 import os
 
+import chess
 from PyQt5.QtCore import (QEventLoop, QPropertyAnimation, Qt, QThread,
                           pyqtSignal)
 from PyQt5.QtGui import QFont, QPixmap, QResizeEvent
@@ -10,9 +11,27 @@ from playground.games.chess.common.consts import PIECE_CONVERSION, PIECE_MAP
 from playground.games.chess.position import Position
 
 SQR_SIZE = 100
+PIECE_DIR = os.path.join(os.path.dirname(__file__), 'assets', 'pieces')
 
+# Decoded piece images, shared by every board of the process.
+_sprites = {}
 
-class ChessUI(QWidget):
+
+def piece_sprite(piece_image):
+    """Return the pixmap of `piece_image`, loading it on first use, or
+    `None` if the image is missing."""
+    if piece_image not in _sprites:
+        pixmap_path = os.path.join(PIECE_DIR, f'{piece_image}.png')
+        if not os.path.exists(pixmap_path):
+            print(f'Image not found: {pixmap_path}')
+            _sprites[piece_image] = None
+        else:
+            _sprites[piece_image] = QPixmap(pixmap_path)
+    return _sprites[piece_image]
+
+
+class ChessBoardView(QWidget):
+    """Render-only chess board drawing a python-chess `Board`."""
 
     def __init__(self, parent=None, user_is_white=True):
         super().__init__(parent)
@@ -25,13 +44,11 @@ class ChessUI(QWidget):
         self.setLayout(self.layout)
         self.sqr_size = SQR_SIZE
         self.user_is_white = user_is_white
-        self.position = Position(common.starting_fen)
-        self.search_thread = SearchThread(self)
+        self.position = None
+        # Label of each square that has been drawn, and those showing a piece
+        self.labels = {}
         self.pieces = {}
-        self.selected_piece = None
-        self.selected_square = None
         self.draw_board_with_labels()
-        self.reset_board()
 
     def resizeEvent(self, event: QResizeEvent):
         side = min(self.width(), self.height())
@@ -100,17 +117,65 @@ class ChessUI(QWidget):
             print(f'Unknown piece: {piece_symbol}')
             return
 
-        piece_label = PieceLabel(self, piece_image)
-        pixmap_path = f'./playground/games/chess/assets/pieces/{piece_image}.png'  # noqa
-        if not os.path.exists(pixmap_path):
-            print(f'Image not found: {pixmap_path}')
-        else:
-            piece_label.setPixmap(QPixmap(pixmap_path))
-
-        col, row = common.square_to_coords[sqr_name]
-        self.layout.addWidget(piece_label, row + 1, col + 1)
+        self.place_sprite(sqr_name, piece_image)
+
+    def place_sprite(self, sqr_name, piece_image):
+        """Show `piece_image` on a square, reusing the label of the square
+        and leaving it untouched if it already shows the piece."""
+        piece_label = self.labels.get(sqr_name)
+        if piece_label is None:
+            piece_label = PieceLabel(self, piece_image)
+            col, row = common.square_to_coords[sqr_name]
+            self.layout.addWidget(piece_label, row + 1, col + 1)
+            self.labels[sqr_name] = piece_label
+        elif piece_label.piece == piece_image and sqr_name in self.pieces:
+            return
+        piece_label.piece = piece_image
+        sprite = piece_sprite(piece_image)
+        if sprite is not None:
+            piece_label.setPixmap(sprite)
+        piece_label.show()
         self.pieces[sqr_name] = piece_label
 
+    def remove_piece(self, sqr_name):
+        piece_label = self.pieces.pop(sqr_name, None)
+        if piece_label is not None:
+            piece_label.hide()
+
+    def set_board(self, board):
+        """Draw `board`, a `chess.Board` or a FEN string."""
+        if not isinstance(board, chess.Board):
+            board = chess.Board(board)
+        self.position = board
+        self.refresh_from_state()
+
+    def refresh_from_state(self):
+        """Draw `position`, updating only the squares that changed since
+        the last drawing."""
+        for sqr_index in range(64):
+            piece = self.position.piece_at(sqr_index)
+            sqr_name = common.squares_san[sqr_index]
+            if piece:
+                self.place_piece(sqr_name, piece.symbol())
+            else:
+                self.remove_piece(sqr_name)
+
+    def clear(self):
+        for sqr_name in list(self.pieces):
+            self.remove_piece(sqr_name)
+
+
+class ChessUI(ChessBoardView):
+    """Interactive board playing against the built-in engine."""
+
+    def __init__(self, parent=None, user_is_white=True):
+        super().__init__(parent, user_is_white=user_is_white)
+        self.position = Position(common.starting_fen)
+        self.search_thread = SearchThread(self)
+        self.selected_piece = None
+        self.selected_square = None
+        self.reset_board()
+
     def move_piece(self, src_sqr, dst_sqr):
         piece = self.pieces.get(src_sqr)
         if piece:
@@ -127,9 +192,8 @@ class ChessUI(QWidget):
             animation.finished.connect(loop.quit)
             loop.exec_()
 
-            self.pieces[dst_sqr] = self.pieces.pop(src_sqr)
-            piece.setParent(None)
-            self.layout.removeWidget(piece)
+            self.remove_piece(src_sqr)
+            self.place_sprite(dst_sqr, piece.piece)
 
     def reset_board(self):
         initial_positions = {
@@ -171,20 +235,6 @@ class ChessUI(QWidget):
         for sqr, piece in initial_positions.items():
             self.place_piece(sqr, piece)
 
-    def refresh_from_state(self):
-        self.clear()
-        for sqr_index in range(64):
-            piece = self.position.piece_at(sqr_index)
-            sqr_name = common.squares_san[sqr_index]
-            if piece:
-                self.place_piece(sqr_name, piece.symbol())
-
-    def clear(self):
-        all_pieces = self.findChildren(QLabel)
-        for piece in all_pieces:
-            if isinstance(piece, PieceLabel):
-                piece.setParent(None)
-
 
 class PieceLabel(QLabel):
 
@@ -1,6 +1,12 @@
+import hashlib
+import mmap
+import os
+import os.path as osp
+from array import array
+
 import playground.games.chess.common.flood_fill as ff
 from playground.games.chess.common.consts import (_64BITS, BISHOP, BLACK, KING,
-                                              KNIGHT, QUEEN, ROOK, WHITE)
+                                                  KNIGHT, QUEEN, ROOK, WHITE)
 
 # The set of squares for possible rook attack blocker pieces
 rook_masks = [
@@ -43,27 +49,137 @@ bishop_masks = [
     0x20100804020000, 0x40201008040200
 ]
 
-# Initialise table for rook attacks, indexed by square
-ratk_table = [{} for _ in range(64)]
-for sq in range(64):
-    occ = 0
-    # Produce attacks with occupancies of all subsets of rook mask
-    while True:
-        ratk_table[sq][occ] = ff.rook_attacks(sq, occ)
-        occ = (occ - rook_masks[sq]) & rook_masks[sq]  # Carry-Rippler
-        if not occ:
-            break
-
-# Initialise table for bishop attacks, indexed by square
-batk_table = [{} for _ in range(64)]
-for sq in range(64):
-    occ = 0
-    # Produce attacks with occupancies of all subsets of bishop mask
-    while True:
-        batk_table[sq][occ] = ff.bishop_attacks(sq, occ)
-        occ = (occ - bishop_masks[sq]) & bishop_masks[sq]  # Carry-Rippler
-        if not occ:
-            break
+# Multipliers mapping each subset of a rook mask to a unique table slot
+rook_magics = [
+    0x80006681124000, 0x240002000100040, 0x8880082002801000, 0x80080080100004,
+    0x4a00100200c80420, 0x200080104020010, 0x400090684021058,
+    0x20000804c050022, 0x20080008040002c, 0x800400040201002, 0x322001200408020,
+    0x8801000080080, 0x8000800400080081, 0x2000510020008, 0x404004410819188,
+    0xa000200810044, 0x208000804000, 0x8020404010002000, 0xca0008010008020,
+    0x8002020008402010, 0xa814010100080010, 0x4080808004000200,
+    0x4104840001022810, 0x2500820000cc0087, 0x9040096580008050,
+    0x8105008300204000, 0x20a0010100102041, 0x8040220200401008,
+    0x8021011100080104, 0x2000200081004, 0x1001000101040200, 0x400440600008143,
+    0x400400080800024, 0x20200040401000, 0x2100088802000, 0x1428008208801004,
+    0x1001085000800, 0x2001004040020, 0x11104184000802, 0xc4041042000089,
+    0x2000400020908000, 0x800500020004000, 0x1100100020008080,
+    0xa402000820420011, 0x101050801010010, 0x1402040002008080,
+    0x60700148040042, 0x806102000c, 0x800021104100, 0x4000802000400180,
+    0x860802001100280, 0x820080080100080, 0x6080004008080, 0x400020004008080,
+    0x4102000408394200, 0x88040100408200, 0x401002200408012,
+    0x8002010080402012, 0x2800100845002001, 0x20a2004010080422,
+    0x21004800021045, 0x2001000208040001, 0x20408810208101c, 0x40908288042
+]
+
+# Multipliers mapping each subset of a bishop mask to a unique table slot
+bishop_magics = [
+    0x10080d1308220480, 0x30044884004001, 0x4082800408000c1, 0x80a0220004690,
+    0x101104010020084, 0x89004a0000000, 0x6008260100000, 0x4202a02202009,
+    0x80e0c00534108200, 0xc000050800810204, 0x2041509400404020,
+    0x8000842410880440, 0x828420210040484, 0xa108210401204, 0x801a58210501526,
+    0x8010002404148410, 0x8844010010a41, 0x10a04106080b4304, 0x220004440c0280,
+    0x14260802002082, 0x2008100101400000, 0x812a000b49101800,
+    0x80102e201016005, 0x408400022021080, 0x802205890041001, 0x22600008088080,
+    0x8002010382040400, 0x8141080001004101, 0x11001081004000,
+    0x9004090008090100, 0x301410006080100, 0x4081010100288802,
+    0x5801201000081001, 0x900982420489000, 0x2040180400480840,
+    0x210110800040040, 0x5030020201c02008, 0xc10008200022218,
+    0x2004440409445100, 0x2012210800a0040, 0x8084210240802, 0x1502080202200889,
+    0x40840041010800, 0x900082019000802, 0x800802020a080400,
+    0x10c2200401008024, 0x442280810a80102, 0x801623401400300, 0xd0088200ab0ca,
+    0x104212104240a0, 0x6000020211042c81, 0x280200020881444, 0x140042020411000,
+    0x400004a024810080, 0x12100101140800, 0x80305000d0898200,
+    0x4000a40104192001, 0x9030082402280401, 0x78a4010a4d1002, 0x42240840404,
+    0x10000090020224, 0x4020211005080820, 0x1092210242104, 0x4040080200802900
+]
+
+rook_shifts = [64 - bin(mask).count('1') for mask in rook_masks]
+bishop_shifts = [64 - bin(mask).count('1') for mask in bishop_masks]
+
+# Start of the attacks of each square in the flat table, the rook attacks of
+# all squares followed by the bishop attacks.
+rook_offsets, bishop_offsets = [], []
+SLIDER_TABLE_SIZE = 0
+for shift in rook_shifts:
+    rook_offsets.append(SLIDER_TABLE_SIZE)
+    SLIDER_TABLE_SIZE += 1 << (64 - shift)
+for shift in bishop_shifts:
+    bishop_offsets.append(SLIDER_TABLE_SIZE)
+    SLIDER_TABLE_SIZE += 1 << (64 - shift)
+
+# Directory caching the slider table between processes, in the user cache
+# directory so every working directory shares it.
+SLIDER_CACHE_DIR = os.environ.get(
+    'PLAYGROUND_CHESS_CACHE',
+    osp.join(
+        os.environ.get('XDG_CACHE_HOME') or osp.expanduser('~/.cache'),
+        'lvlm-playground', 'chess'))
+
+
+def fill_slider_table(table, masks, magics, shifts, offsets, attacks):
+    for sq in range(64):
+        mask, magic, shift = masks[sq], magics[sq], shifts[sq]
+        occ = 0
+        # Produce attacks with occupancies of all subsets of the mask
+        while True:
+            index = offsets[sq] + ((occ * magic & _64BITS) >> shift)
+            table[index] = attacks(sq, occ)
+            occ = (occ - mask) & mask  # Carry-Rippler
+            if not occ:
+                break
+
+
+def generate_slider_table():
+    """Compute the attacks of every blocker subset with flood fills."""
+    table = array('Q', bytes(8 * SLIDER_TABLE_SIZE))
+    fill_slider_table(table, rook_masks, rook_magics, rook_shifts,
+                      rook_offsets, ff.rook_attacks)
+    fill_slider_table(table, bishop_masks, bishop_magics, bishop_shifts,
+                      bishop_offsets, ff.bishop_attacks)
+    return table
+
+
+def load_slider_table():
+    """Memory-map the slider table from the cache, generating it on first
+    use. The file name hashes the masks and magics, so a change to either
+    never reads a stale table."""
+    digest = hashlib.sha1(
+        repr((rook_masks, rook_magics, bishop_masks,
+              bishop_magics)).encode()).hexdigest()[:12]
+    path = osp.join(SLIDER_CACHE_DIR, f'slider_attacks_{digest}.bin')
+    if not osp.exists(path):
+        table = generate_slider_table()
+        try:
+            os.makedirs(SLIDER_CACHE_DIR, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                table.tofile(f)
+            os.replace(tmp_path, path)
+        except OSError:
+            return table
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size != 8 * SLIDER_TABLE_SIZE:
+            return generate_slider_table()
+        blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(blob).cast('Q')
+
+
+slider_table = load_slider_table()
+
+
+def rook_attacks(sq, occ):
+    """Squares attacked by a rook on `sq` with the pieces of `occ`."""
+    return slider_table[rook_offsets[sq] +
+                        (((occ & rook_masks[sq]) * rook_magics[sq]
+                          & _64BITS) >> rook_shifts[sq])]
+
+
+def bishop_attacks(sq, occ):
+    """Squares attacked by a bishop on `sq` with the pieces of `occ`."""
+    return slider_table[bishop_offsets[sq] +
+                        (((occ & bishop_masks[sq]) * bishop_magics[sq]
+                          & _64BITS) >> bishop_shifts[sq])]
+
 
 # Initialise table for non-pawn attacks, indexed by piece type and square
 pseudo_attacks = [[0 for _ in range(64)] for _ in range(7)]
@@ -84,9 +200,9 @@ for sq in range(64):
     pseudo_attacks[KNIGHT][sq] |= clip_a_file >> 17
     pseudo_attacks[KNIGHT][sq] &= _64BITS
 
-    pseudo_attacks[BISHOP][sq] |= batk_table[sq][0]
-    pseudo_attacks[ROOK][sq] |= ratk_table[sq][0]
-    pseudo_attacks[QUEEN][sq] |= batk_table[sq][0] | ratk_table[sq][0]
+    pseudo_attacks[BISHOP][sq] |= bishop_attacks(sq, 0)
+    pseudo_attacks[ROOK][sq] |= rook_attacks(sq, 0)
+    pseudo_attacks[QUEEN][sq] |= bishop_attacks(sq, 0) | rook_attacks(sq, 0)
 
     pseudo_attacks[KING][sq] |= clip_h_file << 1
     pseudo_attacks[KING][sq] |= clip_a_file << 7
@@ -1,8 +1,8 @@
 from gmpy2 import bit_scan1, popcount
 
-from playground.games.chess.common.attack_tables import (batk_table, bishop_masks,
-                                                     pseudo_attacks,
-                                                     ratk_table, rook_masks)
+from playground.games.chess.common.attack_tables import (bishop_attacks,
+                                                         pseudo_attacks,
+                                                         rook_attacks)
 from playground.games.chess.common.common import (adjacent_files, distance_ring,
                                               forward_fill, forward_ranks,
                                               gen_bitboard_indices, pawn_shift,
@@ -133,17 +133,17 @@ class Evaluate:
             if piece_type == KNIGHT:
                 moves = pseudo_attacks[KNIGHT][sq]
             elif piece_type == BISHOP:
-                moves = batk_table[sq][(position.occupancy ^ position.piece_bb[
-                    (piece_colour << 3) | QUEEN]) & bishop_masks[sq]]
+                moves = bishop_attacks(
+                    sq, position.occupancy
+                    ^ position.piece_bb[(piece_colour << 3) | QUEEN])
             elif piece_type == ROOK:
-                moves = ratk_table[sq][(position.occupancy ^ position.piece_bb[
-                    (piece_colour << 3) | ROOK] ^ position.piece_bb[
-                        (piece_colour << 3) | QUEEN]) & rook_masks[sq]]
+                moves = rook_attacks(
+                    sq, position.occupancy
+                    ^ position.piece_bb[(piece_colour << 3) | ROOK]
+                    ^ position.piece_bb[(piece_colour << 3) | QUEEN])
             elif piece_type == QUEEN:
-                moves = ratk_table[sq][position.occupancy
-                                       & rook_masks[sq]] | batk_table[sq][
-                                           position.occupancy
-                                           & bishop_masks[sq]]
+                moves = rook_attacks(sq, position.occupancy) | bishop_attacks(
+                    sq, position.occupancy)
 
             moves &= mobility_area[piece_colour]
 
@@ -1,8 +1,8 @@
 from gmpy2 import bit_scan1
 
-from playground.games.chess.common.attack_tables import (batk_table, bishop_masks,
-                                                     pseudo_attacks,
-                                                     ratk_table, rook_masks)
+from playground.games.chess.common.attack_tables import (bishop_attacks,
+                                                         pseudo_attacks,
+                                                         rook_attacks)
 from playground.games.chess.common.common import pawn_shift
 from playground.games.chess.common.consts import (
     A_FILE_BB, ALL, BISHOP_PROMOTION, CAPTURES, H_FILE_BB, KING, KNIGHT,
@@ -147,7 +147,7 @@ def get_pawn_moves(bitboard, colour, move_type, occ, player_occ, move_list):
 
 
 def get_rook_moves(sq, colour, move_type, occ, player_occ, move_list):
-    moves = ratk_table[sq][occ & rook_masks[sq]]
+    moves = rook_attacks(sq, occ)
 
     if move_type == QUIETS:
         moves &= ~occ
@@ -163,7 +163,7 @@ def get_rook_moves(sq, colour, move_type, occ, player_occ, move_list):
 
 
 def get_bishop_moves(sq, colour, move_type, occ, player_occ, move_list):
-    moves = batk_table[sq][occ & bishop_masks[sq]]
+    moves = bishop_attacks(sq, occ)
 
     if move_type == QUIETS:
         moves &= ~occ
@@ -179,8 +179,7 @@ def get_bishop_moves(sq, colour, move_type, occ, player_occ, move_list):
 
 
 def get_queen_moves(sq, colour, move_type, occ, player_occ, move_list):
-    moves = batk_table[sq][occ & bishop_masks[sq]] | ratk_table[sq][
-        occ & rook_masks[sq]]
+    moves = bishop_attacks(sq, occ) | rook_attacks(sq, occ)
 
     if move_type == QUIETS:
         moves &= ~occ
@@ -1,13 +1,12 @@
-import copy
 import math
 import time
 
 from playground.games.chess.common.consts import (ALL, CAPTURES, CASTLING, DRAW,
                                               EVASIONS, EXACT, INFINITY, KING,
                                               LOWER, MATE, MATERIAL, MIDGAME,
-                                              PAWN, PROMOTION, QUIETS, UPPER,
-                                              TTEntry)
+                                              PAWN, PROMOTION, QUIETS, UPPER)
 from playground.games.chess.common.evaluate import Evaluate
+from playground.games.chess.common.transposition import TranspositionTable
 
 
 class SearchStoppedException(Exception):
@@ -16,12 +15,11 @@ class SearchStoppedException(Exception):
 
 class Search:
 
-    def __init__(self, position):
+    def __init__(self, position, tt_size=2**17):
         self.position = position
 
         # Initialise transposition table
-        self.TT_SIZE = 2**16
-        self.tt = [None] * self.TT_SIZE
+        self.tt = TranspositionTable(tt_size)
 
         # Used for move ordering with the killer heuristic
         # Indexed by ply and colour
@@ -35,6 +33,9 @@ class Search:
         # Keeps track of node count during the search
         self.node_count = 0
 
+        # Statistics of the last iterative deepening search
+        self.stats = None
+
         # Keeps track of time during the search
         self.start_time = None
         self.time_limit = None
@@ -99,12 +100,17 @@ class Search:
                 if self.position.is_legal(move):
                     yield move
 
-    def tt_store(self, index, zobrist, move, depth, score, type_):
-        self.tt[index] = TTEntry(zobrist, move, depth, score, type_)
+    def check_time(self):
+        """Stop the search once the time limit is exceeded, checking the
+        clock every 2048 nodes."""
+        if (self.node_count & 2047) == 0:
+            if time.time() - self.start_time > self.time_limit:
+                raise SearchStoppedException
 
     # Main search algorithm (Principal Variation Search)
     def pvs(self, alpha, beta, depth, ply=0):
         self.node_count += 1
+        self.check_time()
 
         is_pv_node = True if alpha != beta - 1 else False
 
@@ -127,10 +133,9 @@ class Search:
 
         hash_move = None
 
-        tt_index = self.position.zobrist & 0xFFFF
-        tt_entry = self.tt[tt_index]
+        tt_entry = self.tt.probe(self.position.zobrist)
 
-        if tt_entry and tt_entry.zobrist == self.position.zobrist:
+        if tt_entry:
             hash_move = tt_entry.move
             if tt_entry.depth >= depth:
                 entry_type = tt_entry.type
@@ -145,11 +150,6 @@ class Search:
         if depth <= 0:
             return self.quiescence(alpha, beta, depth, ply)
 
-        # Check if the time limit is exceeded every 1024 nodes
-        if self.node_count & 1024:
-            if time.time() - self.start_time > self.time_limit:
-                raise SearchStoppedException
-
         if (self.position.player_occ[self.position.colour]
                 & ~self.position.piece_bb[(self.position.colour << 3) | KING]
                 & ~self.position.piece_bb[(self.position.colour << 3) | PAWN]):
@@ -228,8 +228,8 @@ class Search:
                             self.history[self.position.colour][
                                 (move >> 6) & 0x3F][move
                                                     & 0x3F] += depth * depth
-                        self.tt_store(tt_index, self.position.zobrist, move,
-                                      depth, score, LOWER)
+                        self.tt.store(self.position.zobrist, move, depth,
+                                      score, LOWER)
                         return score
                     alpha = score
                     best_move = move
@@ -242,16 +242,17 @@ class Search:
                 return DRAW  # Stalemate
 
         if best_score <= old_alpha:
-            self.tt_store(tt_index, self.position.zobrist, None, depth,
-                          best_score, UPPER)
+            self.tt.store(self.position.zobrist, None, depth, best_score,
+                          UPPER)
         else:
-            self.tt_store(tt_index, self.position.zobrist, best_move, depth,
-                          best_score, EXACT)
+            self.tt.store(self.position.zobrist, best_move, depth, best_score,
+                          EXACT)
 
         return best_score
 
     def quiescence(self, alpha, beta, depth, ply):
         self.node_count += 1
+        self.check_time()
 
         # Fifty-move rule
         if self.position.halfmove_clock >= 100:
@@ -306,11 +307,23 @@ class Search:
         return best_score
 
     # Wrap search algorithm in iterative deepening structure
-    def iter_search(self, max_depth=math.inf, time_limit=math.inf):
+    def iter_search(self,
+                    max_depth=math.inf,
+                    time_limit=math.inf,
+                    verbose=False):
+        """Search to `max_depth` or until `time_limit` seconds pass and
+        return the best move.
+
+        Node counts, transposition table hits and the time of each
+        completed depth are kept in `stats`.
+        """
         self.node_count = 0
+        self.tt.new_search()
         self.start_time = time.time()
         self.time_limit = time_limit
         depth = 0
+        iterations = []
+        tt_move, tt_depth, tt_score = None, 0, None
 
         # Clear killer moves
         for ply in self.killers:
@@ -321,33 +334,50 @@ class Search:
         ) - self.start_time < self.time_limit:
             depth += 1
 
-            current_pos = copy.deepcopy(self.position)
+            iteration_start = time.time()
+            nodes = self.node_count
+            root_ply = self.position.ply
             try:
                 self.pvs(-INFINITY, INFINITY, depth)
             except SearchStoppedException:  # Time expired
-                self.position = current_pos
+                # Take back the moves of the interrupted search
+                self.position.unwind(root_ply)
                 break
 
-            # Retrieve best move from transposition table
-            tt_entry = self.tt[self.position.zobrist & 0xFFFF]
-            if tt_entry:
-                if tt_entry.zobrist == self.position.zobrist:
-                    tt_move = tt_entry.move
-                    tt_depth = tt_entry.depth
-                    tt_score = tt_entry.score
-                else:
-                    raise Exception(
-                        'Transposition table entry does not match current')
-            else:
-                raise Exception(
-                    'No transposition table entry for current position')
-
-        print('{} found move {} with depth {}, score of {}'.format(
-            'Black' if self.position.colour else 'White',
-            self.position.move_to_san(tt_move), tt_depth, tt_score))
-        print('Searched {} nodes'.format(self.node_count))
-        print('Time taken: {:0.2f}s'.format(time.time() - self.start_time))
-        print()
+            # Retrieve best move from transposition table, keeping the one of
+            # the previous depth if the root entry has no move
+            tt_entry = self.tt.get(self.position.zobrist)
+            if tt_entry and tt_entry.move:
+                tt_move = tt_entry.move
+                tt_depth = tt_entry.depth
+                tt_score = tt_entry.score
+            iterations.append(
+                dict(depth=depth,
+                     nodes=self.node_count - nodes,
+                     time=time.time() - iteration_start,
+                     score=tt_score))
+
+        if tt_move is None:
+            # No depth completed, play the first legal move if any
+            gen_type = EVASIONS if self.position.is_in_check() else ALL
+            tt_move = next(self.search_moves(gen_type), None)
+
+        elapsed = time.time() - self.start_time
+        self.stats = dict(depth=tt_depth,
+                          score=tt_score,
+                          nodes=self.node_count,
+                          time=elapsed,
+                          nps=self.node_count / elapsed if elapsed else 0,
+                          iterations=iterations,
+                          **self.tt.stats)
+
+        if verbose and tt_move is not None:
+            print('{} found move {} with depth {}, score of {}'.format(
+                'Black' if self.position.colour else 'White',
+                self.position.move_to_san(tt_move), tt_depth, tt_score))
+            print('Searched {} nodes'.format(self.node_count))
+            print('Time taken: {:0.2f}s'.format(elapsed))
+            print()
 
         return tt_move
 
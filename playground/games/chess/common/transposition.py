@@ -0,0 +1,103 @@
+from array import array
+
+from playground.games.chess.common.consts import TTEntry
+
+# Bound of an empty slot; the stored bounds are LOWER, UPPER and EXACT.
+EMPTY = -1
+
+
+class TranspositionTable:
+    """Transposition table kept in flat typed arrays.
+
+    The table has `size` slots, rounded down to a power of two, in buckets
+    of two. The first slot of a bucket keeps the deepest entry of the
+    current search and the second one always takes the newest entry, so
+    deep results survive while recent ones are still found. Entries from
+    earlier searches are replaced first whatever their depth.
+
+    `probes`, `hits` and `collisions` count the lookups since the last
+    `new_search`, a collision being a miss on a bucket holding other
+    positions.
+    """
+
+    def __init__(self, size=2**17):
+        buckets = 1
+        while buckets * 4 <= size:
+            buckets *= 2
+        self.mask = buckets - 1
+        self.keys = array('Q', bytes(8 * 2 * buckets))
+        self.moves = array('H', bytes(2 * 2 * buckets))
+        self.depths = array('h', bytes(2 * 2 * buckets))
+        self.scores = array('i', bytes(4 * 2 * buckets))
+        self.bounds = array('b', [EMPTY]) * (2 * buckets)
+        self.ages = array('B', bytes(2 * buckets))
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def new_search(self):
+        """Age the stored entries and reset the counters."""
+        self.generation = (self.generation + 1) & 0xFF
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+
+    def clear(self):
+        self.bounds = array('b', [EMPTY]) * len(self.keys)
+
+    def slot(self, zobrist):
+        """Slot holding `zobrist`, or -1."""
+        index = (zobrist & self.mask) << 1
+        if self.bounds[index] != EMPTY and self.keys[index] == zobrist:
+            return index
+        index += 1
+        if self.bounds[index] != EMPTY and self.keys[index] == zobrist:
+            return index
+        return -1
+
+    def get(self, zobrist):
+        """Return the `TTEntry` of `zobrist`, or `None`."""
+        index = self.slot(zobrist)
+        if index < 0:
+            return None
+        return TTEntry(zobrist, self.moves[index] or None, self.depths[index],
+                       self.scores[index], self.bounds[index])
+
+    def probe(self, zobrist):
+        """`get` counting the lookup in the statistics."""
+        self.probes += 1
+        entry = self.get(zobrist)
+        if entry is not None:
+            self.hits += 1
+        elif (self.bounds[(zobrist & self.mask) << 1] != EMPTY
+              or self.bounds[((zobrist & self.mask) << 1) + 1] != EMPTY):
+            self.collisions += 1
+        return entry
+
+    def store(self, zobrist, move, depth, score, type_):
+        index = (zobrist & self.mask) << 1
+        if not (self.bounds[index] == EMPTY or self.keys[index] == zobrist
+                or self.ages[index] != self.generation
+                or depth >= self.depths[index]):
+            index += 1
+        if move is None and self.keys[index] == zobrist:
+            # Keep the best move found by an earlier search of the position
+            move = self.moves[index]
+        self.keys[index] = zobrist
+        self.moves[index] = move or 0
+        self.depths[index] = depth
+        self.scores[index] = score
+        self.bounds[index] = type_
+        self.ages[index] = self.generation
+
+    @property
+    def stats(self):
+        return dict(tt_size=len(self),
+                    tt_probes=self.probes,
+                    tt_hits=self.hits,
+                    tt_collisions=self.collisions,
+                    tt_hit_rate=self.hits / self.probes if self.probes else 0)
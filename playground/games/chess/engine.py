@@ -0,0 +1,142 @@
+import atexit
+import math
+import shutil
+import threading
+
+import chess
+import chess.engine
+
+from playground.games.chess.common.consts import PROMOTION
+from playground.games.chess.common.search import Search
+from playground.games.chess.position import Position
+
+DEFAULT_ENGINE = '/usr/games/stockfish'
+# Search limit of the engine when the config sets none.
+DEFAULT_DEPTH = 12
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class EnginePool:
+    """Long-lived UCI engine processes shared by the games of a process.
+
+    Engines are started on first use and lent to one caller at a time, so
+    concurrent games each get their own process and sequential games reuse
+    them. The `game` key passed to `play` makes python-chess send
+    ``ucinewgame`` whenever an engine moves on to another game. An engine
+    that no longer answers a ping is replaced by a fresh process.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.idle = []
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def available(path):
+        return shutil.which(path) is not None
+
+    @classmethod
+    def get(cls, path):
+        """Return the pool of engine `path`, shared by every caller in the
+        process."""
+        with _pools_lock:
+            if path not in _pools:
+                _pools[path] = cls(path)
+            return _pools[path]
+
+    def acquire(self):
+        with self.lock:
+            engine = self.idle.pop() if self.idle else None
+        if engine is not None:
+            try:
+                engine.ping()
+            except (chess.engine.EngineError, TimeoutError):
+                self.discard(engine)
+                engine = None
+        if engine is None:
+            engine = chess.engine.SimpleEngine.popen_uci(self.path)
+        return engine
+
+    def release(self, engine):
+        with self.lock:
+            self.idle.append(engine)
+
+    def discard(self, engine):
+        try:
+            engine.close()
+        except Exception:
+            pass
+
+    def play(self, board, limit, game=None):
+        """Return the move of an engine on `board`, retrying once on a fresh
+        process if the engine dies during the search."""
+        for attempt in range(2):
+            engine = self.acquire()
+            try:
+                result = engine.play(board, limit, game=game)
+            except chess.engine.EngineTerminatedError:
+                self.discard(engine)
+                if attempt:
+                    raise
+                continue
+            except BaseException:
+                # The engine may still be searching, so it cannot be lent
+                # out again.
+                self.discard(engine)
+                raise
+            self.release(engine)
+            return result.move
+
+    def close(self):
+        with self.lock:
+            engines, self.idle = self.idle, []
+        for engine in engines:
+            try:
+                engine.quit()
+            except (chess.engine.EngineError, TimeoutError):
+                self.discard(engine)
+
+
+@atexit.register
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+def build_limit(depth=None, nodes=None, time=None):
+    """Engine limit from the config, searching `DEFAULT_DEPTH` plies if no
+    limit is set."""
+    if depth is None and nodes is None and time is None:
+        depth = DEFAULT_DEPTH
+    return chess.engine.Limit(depth=depth, nodes=nodes, time=time)
+
+
+def fallback_move(board, depth, time_limit=None, tt_size=2**17):
+    """Search `board` with the built-in engine, for when no UCI engine is
+    installed."""
+    position = Position(board.fen())
+    search = Search(position, tt_size)
+    move = search.iter_search(max_depth=depth,
+                              time_limit=time_limit or math.inf)
+    if move is None:
+        return None
+    promotion = None
+    if move & (0x3 << 14) == PROMOTION:
+        promotion = ((move >> 12) & 0x3) + chess.KNIGHT
+    return chess.Move((move >> 6) & 0x3F, move & 0x3F, promotion=promotion)
+
+
+def engine_move(board, game_cfg, game=None):
+    """Move of the AI on `board`: Stockfish from the shared pool if it is
+    installed, otherwise the built-in engine."""
+    path = game_cfg.engine_path or DEFAULT_ENGINE
+    if EnginePool.available(path):
+        limit = build_limit(game_cfg.engine_depth, game_cfg.engine_nodes,
+                            game_cfg.engine_time)
+        return EnginePool.get(path).play(board, limit, game=game)
+    return fallback_move(board, game_cfg.ai_depth or 3, game_cfg.engine_time,
+                         game_cfg.ai_tt_size or 2**17)
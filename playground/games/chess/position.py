@@ -2,10 +2,10 @@ from collections import deque
 
 from gmpy2 import bit_scan1, popcount
 
-from playground.games.chess.common.attack_tables import (batk_table, bishop_masks,
-                                                     pawn_attacks,
-                                                     pseudo_attacks,
-                                                     ratk_table, rook_masks)
+from playground.games.chess.common.attack_tables import (bishop_attacks,
+                                                         pawn_attacks,
+                                                         pseudo_attacks,
+                                                         rook_attacks)
 from playground.games.chess.common.common import (
     bb_between, flip_vertical, gen_bitboard_indices, index_to_san, pawn_push,
     pawn_shift, piece_int_to_string, piece_string_to_int, san_to_index)
@@ -501,6 +501,19 @@ class Position:
 
         self.repetition_stack.pop()
 
+    @property
+    def ply(self):
+        """Number of moves, null moves included, that can be undone."""
+        return len(self.undo_info)
+
+    def unwind(self, ply):
+        """Undo moves until the position is back at `ply`."""
+        while len(self.undo_info) > ply:
+            if self.undo_info[-1]['move']:
+                self.undo_move()
+            else:
+                self.undo_null_move()
+
     def generate_castling(self, colour, move_list):
         if colour == WHITE:
             if self.castling_rights & W_KINGSIDE:
@@ -579,10 +592,8 @@ class Position:
         # Try capturing attacker piece
         defenders = pawn_attacks[colour ^ 1][attacker_sqr] & pawns
         defenders |= pseudo_attacks[KNIGHT][attacker_sqr] & knights
-        defenders |= ratk_table[attacker_sqr][
-            occ & rook_masks[attacker_sqr]] & (rooks | queens)
-        defenders |= batk_table[attacker_sqr][
-            occ & bishop_masks[attacker_sqr]] & (bishops | queens)
+        defenders |= rook_attacks(attacker_sqr, occ) & (rooks | queens)
+        defenders |= bishop_attacks(attacker_sqr, occ) & (bishops | queens)
         defenders &= ~pinned
 
         for defender_sq in gen_bitboard_indices(defenders):
@@ -603,10 +614,8 @@ class Position:
                              & pawn_shift[colour ^ 1](one_step & ~occ, NORTH)
                              & pawns)
                 blockers |= pseudo_attacks[KNIGHT][sq] & knights
-                blockers |= ratk_table[sq][occ & rook_masks[sq]] & (rooks
-                                                                    | queens)
-                blockers |= batk_table[sq][occ & bishop_masks[sq]] & (bishops
-                                                                      | queens)
+                blockers |= rook_attacks(sq, occ) & (rooks | queens)
+                blockers |= bishop_attacks(sq, occ) & (bishops | queens)
                 blockers &= ~pinned
 
                 for blocker_sq in gen_bitboard_indices(blockers):
@@ -693,14 +702,14 @@ class Position:
                   (pawn_shift[colour](src_bb, NORTH) & ~occ)):  # Double push
                 return True
         elif piece_type == BISHOP:
-            if dst_bb & batk_table[src_index][occ & bishop_masks[src_index]]:
+            if dst_bb & bishop_attacks(src_index, occ):
                 return True
         elif piece_type == ROOK:
-            if dst_bb & ratk_table[src_index][occ & rook_masks[src_index]]:
+            if dst_bb & rook_attacks(src_index, occ):
                 return True
         elif piece_type == QUEEN:
-            if dst_bb & (batk_table[src_index][occ & bishop_masks[src_index]]
-                         | ratk_table[src_index][occ & rook_masks[src_index]]):
+            if dst_bb & (bishop_attacks(src_index, occ)
+                         | rook_attacks(src_index, occ)):
                 return True
         elif dst_bb & pseudo_attacks[piece_type][src_index]:
             return True
@@ -818,11 +827,11 @@ class Position:
         queens = self.piece_bb[colour_mask | QUEEN]
 
         bishops = self.piece_bb[colour_mask | BISHOP]
-        if batk_table[sq][occ & bishop_masks[sq]] & (bishops | queens):
+        if bishop_attacks(sq, occ) & (bishops | queens):
             return True
 
         rooks = self.piece_bb[colour_mask | ROOK]
-        if ratk_table[sq][occ & rook_masks[sq]] & (rooks | queens):
+        if rook_attacks(sq, occ) & (rooks | queens):
             return True
 
         kings = self.piece_bb[colour_mask | KING]
@@ -835,12 +844,11 @@ class Position:
         if piece_type == PAWN:
             return pawn_attacks[colour][sq]
         if piece_type == BISHOP:
-            return batk_table[sq][occ & bishop_masks[sq]]
+            return bishop_attacks(sq, occ)
         elif piece_type == ROOK:
-            return ratk_table[sq][occ & rook_masks[sq]]
+            return rook_attacks(sq, occ)
         elif piece_type == QUEEN:
-            return batk_table[sq][occ & bishop_masks[sq]] | ratk_table[sq][
-                occ & rook_masks[sq]]
+            return bishop_attacks(sq, occ) | rook_attacks(sq, occ)
         else:
             return pseudo_attacks[piece_type][sq]
 
@@ -861,9 +869,8 @@ class Position:
         attacked_by |= pawn_attacks[colour ^ 1][sq] & pawns
         attacked_by |= pseudo_attacks[KNIGHT][sq] & knights
         attacked_by |= pseudo_attacks[KING][sq] & kings
-        attacked_by |= ratk_table[sq][occ & rook_masks[sq]] & (rooks | queens)
-        attacked_by |= batk_table[sq][occ & bishop_masks[sq]] & (bishops
-                                                                 | queens)
+        attacked_by |= rook_attacks(sq, occ) & (rooks | queens)
+        attacked_by |= bishop_attacks(sq, occ) & (bishops | queens)
 
         return attacked_by
 
@@ -933,18 +940,16 @@ class Position:
             attackers ^= from_bb
             occ ^= from_bb
             if from_bb & slider_blockers:
-                attackers |= ratk_table[target_sq][
-                    occ
-                    & rook_masks[target_sq]] & (self.piece_bb[W_ROOK]
-                                                | self.piece_bb[B_ROOK]
-                                                | self.piece_bb[W_QUEEN]
-                                                | self.piece_bb[B_QUEEN]) & occ
-                attackers |= batk_table[target_sq][
-                    occ & bishop_masks[target_sq]] & (
-                        self.piece_bb[W_BISHOP]
-                        | self.piece_bb[B_BISHOP]
-                        | self.piece_bb[W_QUEEN]
-                        | self.piece_bb[B_QUEEN]) & occ
+                attackers |= rook_attacks(target_sq, occ) & (
+                    self.piece_bb[W_ROOK]
+                    | self.piece_bb[B_ROOK]
+                    | self.piece_bb[W_QUEEN]
+                    | self.piece_bb[B_QUEEN]) & occ
+                attackers |= bishop_attacks(target_sq, occ) & (
+                    self.piece_bb[W_BISHOP]
+                    | self.piece_bb[B_BISHOP]
+                    | self.piece_bb[W_QUEEN]
+                    | self.piece_bb[B_QUEEN]) & occ
             from_bb = self.get_least_valuable_piece(attackers, colour)
             if from_bb:
                 piece = self.squares[bit_scan1(from_bb)]
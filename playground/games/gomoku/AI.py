@@ -1,177 +1,234 @@
-class AI:
-
-    def __init__(self, chessboard):
-        self.chessboard = chessboard
-        self.size = len(chessboard)
-        self.count = 0
-
-    def ai(self, color, deep, pre_evaluate):
-        if deep >= 2:
-            temp = self.evaluateBoard(2, self.chessboard) - self.evaluateBoard(
-                1, self.chessboard)
-            return temp
-        if color == 2:
-            values = -100000000
+import random
+import time
+
+# Score of a five-cell window holding stones of a single player, by the
+# number of stones.
+WINDOW_SCORES = (0, 1, 10, 100, 1000)
+WIN = 10**9
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget is exhausted."""
+
+
+def build_pattern_table():
+    """Tables over five-cell windows packed as base-3 digits, one per cell
+    with 0 empty, 1 black and 2 white.
+
+    `scores[code]` is the value of a window for black, negative if it favours
+    white, and `fives[code]` the player owning all five cells, or 0.
+    """
+    scores, fives = [], []
+    for code in range(3**5):
+        digits = [code // 3**i % 3 for i in range(5)]
+        black, white = digits.count(1), digits.count(2)
+        if black and white:
+            scores.append(0)
+        elif black:
+            scores.append(WINDOW_SCORES[black] if black < 5 else 0)
         else:
-            values = 100000000
-        for i in range(15):
-            for j in range(15):
-                if self.chessboard[i][j][2] == 0:
-                    if self.judge_empty(i, j):
+            scores.append(-WINDOW_SCORES[white] if white < 5 else 0)
+        fives.append(1 if black == 5 else 2 if white == 5 else 0)
+    return scores, fives
+
+
+PATTERN_SCORES, PATTERN_FIVES = build_pattern_table()
+
+
+class GomokuAI:
+    """Alpha-beta Gomoku engine over packed lines.
+
+    Every row, column and diagonal of at least five cells is kept as a base-3
+    number, and the position is scored as the sum of `PATTERN_SCORES` over
+    all five-cell windows. Placing or removing a stone only rescores the
+    windows through its cell, so the score and a Zobrist hash are updated
+    incrementally. The search is an iterative deepening negamax with a
+    transposition table over the empty cells near existing stones, keeping
+    the `width` most promising ones at each node.
+    """
+
+    def __init__(self, size=15, depth=4, time_limit=None, width=12):
+        self.size = size
+        self.depth = depth
+        self.time_limit = time_limit
+        self.width = width
+
+        # Lines as lists of cells, and the (line, position) pairs of a cell.
+        self.lines = []
+        self.cell_lines = [[] for _ in range(size * size)]
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for row in range(size):
+                for col in range(size):
+                    if 0 <= row - dr < size and 0 <= col - dc < size:
                         continue
-                    self.chessboard[i][j][2] = color
-                    evaluate = self.ai(3 - color, deep + 1, values)
-                    if color == 2:
-                        if evaluate > pre_evaluate:
-                            self.chessboard[i][j][2] = 0
-                            self.count += 1
-                            return 100000000
-                    else:
-                        if evaluate < pre_evaluate:
-                            self.chessboard[i][j][2] = 0
-                            self.count += 1
-                            return -100000000
-                    if color == 2:
-                        if evaluate >= values:
-                            values = evaluate
-                    else:
-                        if evaluate <= values:
-                            values = evaluate
-                    self.chessboard[i][j][2] = 0
-        return values
-
-    def judge_empty(self, m, n):
-        directions = [(-1, 0), (1, 0), (-1, 1), (1, -1), (0, 1), (0, -1),
-                      (1, 1), (-1, -1)]
-        j = 0
-        count = 1
-        while j < len(directions):
-            a = 0
-            while a <= 1:
-                x, y = m, n
-                a += 1
-                for i in range(2):
-                    if x + directions[j][0] < 0 or x + directions[j][
-                            0] > self.size - 1 or y + directions[j][
-                                1] < 0 or y + directions[j][1] > self.size - 1:
-                        break
-                    x += directions[j][0]
-                    y += directions[j][1]
-                    if self.chessboard[x][y][2] == 0:
-                        count += 1
-                    else:
-                        break
-                j += 1
-        if count == 17:
-            return 1
-        return 0
-
-    def judge(self, m, n):
-        directions = [(-1, 0), (1, 0), (-1, 1), (1, -1), (0, 1), (0, -1),
-                      (1, 1), (-1, -1)]
-        j = 0
-        while j < len(directions):
-            count = 1
-            a = 0
-            while a <= 1:
-                x, y = m, n
-                a += 1
-                for i in range(4):
-                    if x + directions[j][0] < 0 or x + directions[j][
-                            0] > self.size - 1 or y + directions[j][
-                                1] < 0 or y + directions[j][1] > self.size - 1:
-                        break
-                    x += directions[j][0]
-                    y += directions[j][1]
-                    if self.chessboard[x][y][2] == self.chessboard[m][n][2]:
-                        count += 1
-                    else:
-                        break
-                j += 1
-            if count >= 5:
-                if self.chessboard[m][n][2] == 2:
-                    return 1
-        return 0
-
-    def evaluateBoard(self, color, chessboard):
-        values = 0
-        directions = [(-1, 0), (1, 0), (-1, 1), (1, -1), (0, 1), (0, -1),
-                      (1, 1), (-1, -1)]
-        directions_2 = [(1, 0), (1, -1), (0, 1), (1, 1)]
-        for row in range(self.size):
-            for col in range(self.size):
-                if chessboard[row][col][2] != color:
-                    continue
-                j = 0
-                while j < len(directions):
-                    count = 1
-                    a = 0
-                    record = []
-                    while a <= 1:
-                        x, y = row, col
-                        a += 1
-                        for i in range(4):
-                            if x + directions[j][0] < 0 or x + directions[j][
-                                    0] > self.size - 1 or y + directions[j][
-                                        1] < 0 or y + directions[j][
-                                            1] > self.size - 1:
-                                record.append(3 - color)
-                                break
-                            x += directions[j][0]
-                            y += directions[j][1]
-                            if chessboard[x][y][2] == chessboard[row][col][2]:
-                                count += 1
-                            else:
-                                record.append(chessboard[x][y][2])
-                                break
-                        j += 1
-                    if count >= 5:
-                        values += 200000
-                    elif count == 4:
-                        if record[0] == record[1] == 0:
-                            values += 70000
-                        elif (record[0] == 0 and record[1] == (3 - color)) or (
-                                record[0] == (3 - color) and record[1] == 0):
-                            values += 1000
-                    elif count == 3:
-                        if record[0] == record[1] == 0:
-                            values += 1000
-                        elif (record[0] == 0 and record[1] == (3 - color)) or (
-                                record[0] == (3 - color) and record[1] == 0):
-                            values += 150
-                    elif count == 2:
-                        if record[0] == record[1] == 0:
-                            values += 1000
-                        elif (record[0] == 0 and record[1] == (3 - color)) or (
-                                record[0] == (3 - color) and record[1] == 0):
-                            values += 150
-                    k = 0
-                    while k < len(directions_2):
-                        x, y = row, col
-                        record = []
-                        record.append(chessboard[x][y][2])
-                        for i in range(4):
-                            if i == 1 and len(record) == 2:
-                                if record[0] != record[1] and record[
-                                        0] and record[1]:
-                                    values += 10
-                            if x + directions_2[k][0] < 0 or x + directions_2[
-                                    k][0] > self.size - 1 or y + directions_2[
-                                        k][1] < 0 or y + directions_2[k][
-                                            1] > self.size - 1:
-                                break
-                            x += directions_2[k][0]
-                            y += directions_2[k][1]
-                            record.append(chessboard[x][y][2])
-                        if len(record) == 5:
-                            count = record.count(0)
-                            if (count == 1 and record[1] == 0
-                                    and record.count(color)
-                                    == 4) or (count == 1 and record[3] == 0
-                                              and record.count(color) == 4):
-                                values += 3000
-                            if count == 1 and record[2] == 0 and record.count(
-                                    color) == 4:
-                                values += 2600
-                        k += 1
-        return values
+                    line = []
+                    r, c = row, col
+                    while 0 <= r < size and 0 <= c < size:
+                        line.append(r * size + c)
+                        r, c = r + dr, c + dc
+                    if len(line) >= 5:
+                        index = len(self.lines)
+                        for pos, cell in enumerate(line):
+                            self.cell_lines[cell].append((index, pos))
+                        self.lines.append(line)
+        self.powers = [3**i for i in range(size + 1)]
+        # Cells within two steps of each cell, where replies are searched.
+        self.neighbours = [[
+            r * size + c for r in range(max(0, row - 2), min(size, row + 3))
+            for c in range(max(0, col - 2), min(size, col + 3))
+            if (r, c) != (row, col)
+        ] for row in range(size) for col in range(size)]
+        rng = random.Random(0)
+        # Random keys of the stones of each player, indexed by player.
+        self.zobrist = [[0] * (size * size)]
+        for _ in range(2):
+            self.zobrist.append(
+                [rng.getrandbits(64) for _ in range(size * size)])
+        self.table = {}
+        self.load([[0] * size for _ in range(size)])
+
+    def load(self, state):
+        """Set the position from rows of cell owners."""
+        size = self.size
+        self.cells = [0] * (size * size)
+        self.codes = [0] * len(self.lines)
+        self.near = [0] * (size * size)
+        self.score = 0
+        self.hash = 0
+        self.stones = 0
+        self.history = []
+        for row in range(size):
+            for col in range(size):
+                if state[row][col]:
+                    self.make(row * size + col, state[row][col])
+        self.history = []
+
+    def gain(self, cell, player):
+        """Change of score from placing a stone of `player` on `cell`, and
+        whether it makes five."""
+        delta, five = 0, False
+        for index, pos in self.cell_lines[cell]:
+            code = self.codes[index]
+            last = len(self.lines[index]) - 5
+            for start in range(max(0, pos - 4), min(pos, last) + 1):
+                window = code // self.powers[start] % 243
+                placed = window + player * self.powers[pos - start]
+                delta += PATTERN_SCORES[placed] - PATTERN_SCORES[window]
+                five = five or PATTERN_FIVES[placed] == player
+        return delta, five
+
+    def make(self, cell, player):
+        """Place a stone and return whether it makes five."""
+        delta, five = self.gain(cell, player)
+        for index, pos in self.cell_lines[cell]:
+            self.codes[index] += player * self.powers[pos]
+        for neighbour in self.neighbours[cell]:
+            self.near[neighbour] += 1
+        self.cells[cell] = player
+        self.score += delta
+        self.hash ^= self.zobrist[player][cell]
+        self.stones += 1
+        self.history.append((cell, player, delta))
+        return five
+
+    def unmake(self):
+        cell, player, delta = self.history.pop()
+        for index, pos in self.cell_lines[cell]:
+            self.codes[index] -= player * self.powers[pos]
+        for neighbour in self.neighbours[cell]:
+            self.near[neighbour] -= 1
+        self.cells[cell] = 0
+        self.score -= delta
+        self.hash ^= self.zobrist[player][cell]
+        self.stones -= 1
+
+    def candidates(self, player, first=None):
+        """Empty cells near stones, best first by the gain for `player` plus
+        the gain denied to the opponent."""
+        ranked = []
+        for cell, owner in enumerate(self.cells):
+            if owner or not self.near[cell]:
+                continue
+            attack, five = self.gain(cell, player)
+            defence, blocks = self.gain(cell, 3 - player)
+            if player == 2:
+                attack, defence = -attack, -defence
+            priority = WIN if five else WIN // 2 if blocks else 0
+            ranked.append((priority + attack - defence, -cell))
+        ranked.sort(reverse=True)
+        moves = [-cell for _, cell in ranked[:self.width]]
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def negamax(self, player, depth, alpha, beta):
+        self.nodes += 1
+        if self.deadline and self.nodes % 256 == 0:
+            if time.monotonic() > self.deadline:
+                raise SearchTimeout
+        if depth == 0:
+            return self.score if player == 1 else -self.score
+
+        key = self.hash ^ player
+        entry = self.table.get(key)
+        if entry is not None and entry[0] >= depth:
+            _, flag, value, _ = entry
+            if flag == 0:
+                return value
+            if (flag < 0 and value <= alpha) or (flag > 0 and value >= beta):
+                return value
+        moves = self.candidates(player, entry[3] if entry else None)
+        if not moves:
+            return 0
+
+        original_alpha = alpha
+        best_value, best_move = -WIN * 2, moves[0]
+        for cell in moves:
+            if self.make(cell, player):
+                # Prefer quicker wins.
+                value = WIN + depth
+            else:
+                value = -self.negamax(3 - player, depth - 1, -beta, -alpha)
+            self.unmake()
+            if value > best_value:
+                best_value, best_move = value, cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        # -1: upper bound, 1: lower bound, 0: exact value.
+        flag = 0
+        if best_value <= original_alpha:
+            flag = -1
+        elif best_value >= beta:
+            flag = 1
+        if len(self.table) > 1000000:
+            self.table.clear()
+        self.table[key] = (depth, flag, best_value, best_move)
+        return best_value
+
+    def best_move(self, state, player=2):
+        """Return the ``(row, col)`` of the move of `player` in `state`, or
+        `None` if the board is full."""
+        self.load(state)
+        if self.stones == 0:
+            return self.size // 2, self.size // 2
+        if self.stones == self.size * self.size:
+            return None
+        self.nodes = 0
+        self.deadline = None
+        if self.time_limit:
+            self.deadline = time.monotonic() + self.time_limit
+        move = self.candidates(player)[0]
+        for depth in range(1, self.depth + 1):
+            try:
+                value = self.negamax(player, depth, -WIN * 2, WIN * 2)
+            except SearchTimeout:
+                while self.history:
+                    self.unmake()
+                break
+            move = self.table[self.hash ^ player][3]
+            if abs(value) >= WIN:
+                break
+        return divmod(move, self.size)
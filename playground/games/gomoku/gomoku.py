@@ -1,60 +1,108 @@
 import random
 import re
-from copy import deepcopy
 
 from PyQt5.QtGui import QPainter, QPixmap
 from PyQt5.QtWidgets import QLabel, QMainWindow
 
 from playground.games import BaseGame, BaseGameLogic
-from playground.games.gomoku.AI import AI
+from playground.games.gomoku.AI import GomokuAI
 from playground.games.gomoku.gomoku_ui import Ui_MainWindow
+from playground.games.raster import RasterRenderer
+from playground.parsing import parse_move
 from playground.registry import GAME_REGISTRY
 from playground.state_code import GameStatus
 
 
 class GomokuLogic(BaseGameLogic):
-    """Pure logic for Gomoku game."""
+    """Pure logic for Gomoku game.
+
+    The stones of each player are kept in a bitboard, `stones[player]`, with
+    one bit per cell at `row * (size + 1) + col`. The extra column is always
+    empty, so lines never wrap from one row to the next.
+    """
 
     def __init__(self, game_cfg):
         self.game_cfg = game_cfg
         self.size = game_cfg.chessboard_size
-        self.board = [[[40 + j * 64, 40 + i * 64, 0] for j in range(self.size)]
-                      for i in range(self.size)]
-        self.status = GameStatus.IN_PROGRESS
+        self.width = self.size + 1
+        # Bit shifts of the horizontal, vertical and two diagonal lines.
+        self.shifts = (1, self.width, self.width + 1, self.width - 1)
+        self.reset_board()
+
+    def bit(self, row, col):
+        return 1 << (row * self.width + col)
+
+    def get_cell(self, row, col):
+        """Player owning a cell, or 0 if it is empty."""
+        bit = self.bit(row, col)
+        if self.stones[1] & bit:
+            return 1
+        if self.stones[2] & bit:
+            return 2
+        return 0
+
+    def set_cell(self, row, col, player):
+        """Put a stone of `player`, or nothing if 0, on a cell without
+        judging the position."""
+        bit = self.bit(row, col)
+        previous = self.get_cell(row, col)
+        if previous:
+            self.stones[previous] &= ~bit
+            self.count -= 1
+        if player:
+            self.stones[player] |= bit
+            self.count += 1
+
+    def get_state(self):
+        """Rows of cell owners, with 0 for empty cells."""
+        return [[self.get_cell(i, j) for j in range(self.size)]
+                for i in range(self.size)]
+
+    def load_state(self, state):
+        self.reset_board()
+        for i, row in enumerate(state):
+            for j, player in enumerate(row):
+                if player:
+                    self.set_cell(i, j, player)
 
     def make_move(self, row, col, player):
         """Make a move on the board and check game status."""
-        if not (0 <= row < self.size and 0 <= col < self.size) or self.board[
-                row][col][2] != 0 or self.status != GameStatus.IN_PROGRESS:
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            return False
+        if self.get_cell(row, col) or self.status != GameStatus.IN_PROGRESS:
             return False
-        self.board[row][col][2] = player
+        self.set_cell(row, col, player)
         self._judge(row, col)
         return True
 
+    def line_length(self, stones, bit, shift):
+        """Length, capped at 5, of the run of `stones` through `bit` along
+        the line of `shift`."""
+        length = 1
+        probe = bit << shift
+        while length < 5 and stones & probe:
+            length += 1
+            probe <<= shift
+        probe = bit >> shift
+        while length < 5 and stones & probe:
+            length += 1
+            probe >>= shift
+        return length
+
     def _judge(self, row, col):
-        """Check if the move leads to a win or tie."""
-        directions = [(-1, 0), (1, 0), (-1, 1), (1, -1), (0, 1), (0, -1),
-                      (1, 1), (-1, -1)]
-        player = self.board[row][col][2]
-        for dx, dy in directions:
-            count = 1
-            for step in range(1, 5):
-                x, y = row + step * dx, col + step * dy
-                if not (0 <= x < self.size and
-                        0 <= y < self.size) or self.board[x][y][2] != player:
-                    break
-                count += 1
-            for step in range(1, 5):
-                x, y = row - step * dx, col - step * dy
-                if not (0 <= x < self.size and
-                        0 <= y < self.size) or self.board[x][y][2] != player:
-                    break
-                count += 1
-            if count >= 5:
+        """Check if the move leads to a win or tie.
+
+        Only the four lines through the new stone are probed, so this takes
+        constant time.
+        """
+        player = self.get_cell(row, col)
+        stones = self.stones[player]
+        bit = self.bit(row, col)
+        for shift in self.shifts:
+            if self.line_length(stones, bit, shift) >= 5:
                 self.status = GameStatus.WIN if player == 1 else GameStatus.LOSE  # noqa
                 return
-        if all(self.board[i][j][2] != 0 for i in range(self.size)
-               for j in range(self.size)):
+        if self.count == self.size * self.size:
             self.status = GameStatus.TIE
 
     def input_move(self, move):
@@ -71,7 +119,7 @@ class GomokuLogic(BaseGameLogic):
         else:
             col, row = int(match.group(3)), row_dict[match.group(4)]
         if not (0 <= row < self.size
-                and 0 <= col < self.size) or self.board[row][col][2] != 0:
+                and 0 <= col < self.size) or self.get_cell(row, col) != 0:
             return GameStatus.INVALID_MOVE
         self.make_move(row, col, 1)  # Player is black (1)
         return self.status
@@ -81,8 +129,8 @@ class GomokuLogic(BaseGameLogic):
 
     def reset_board(self):
         """Reset the game board."""
-        self.board = [[[40 + j * 64, 40 + i * 64, 0] for j in range(self.size)]
-                      for i in range(self.size)]
+        self.stones = [0, 0, 0]
+        self.count = 0
         self.status = GameStatus.IN_PROGRESS
 
     def get_random_state(self):
@@ -97,11 +145,11 @@ class GomokuLogic(BaseGameLogic):
         pieces = [1] * black_stones + [2] * white_stones + [0] * (total_cells -
                                                                   total_stones)
         random.shuffle(pieces)
-        for i in range(self.size):
-            for j in range(self.size):
-                self.board[i][j][2] = pieces[i * self.size + j]
-        return [[self.board[i][j][2] for j in range(self.size)]
-                for i in range(self.size)]
+        state = [
+            pieces[i * self.size:(i + 1) * self.size] for i in range(self.size)
+        ]
+        self.load_state(state)
+        return state
 
     def get_rule_state(self):
         """Generate a rule state with valid movements."""
@@ -111,39 +159,37 @@ class GomokuLogic(BaseGameLogic):
 
         def count_consecutive(x, y, dx, dy):
             count = 1
-            stone = self.board[x][y][2]
+            stone = self.get_cell(x, y)
             for step in range(1, 5):
                 nx, ny = x + step * dx, y + step * dy
                 if not (0 <= nx < self.size and
-                        0 <= ny < self.size) or self.board[nx][ny][2] != stone:
+                        0 <= ny < self.size) or self.get_cell(nx, ny) != stone:
                     break
                 count += 1
             return count
 
         for i in range(self.size):
             for j in range(self.size):
-                if self.board[i][j][2] != 0:
+                if self.get_cell(i, j) != 0:
                     for dx, dy in directions:
                         count = count_consecutive(i, j, dx, dy)
                         if count >= 5:
                             rand_idx = random.randint(0, count - 1)
                             x, y = i + rand_idx * dx, j + rand_idx * dy
-                            self.board[x][y][2] = 0
+                            self.set_cell(x, y, 0)
                             game_state[x][y] = 0
 
         valid_movement = []
         letters = 'ABCDEFGHIJKLMNO'
         for row in range(self.size):
             for col in range(self.size):
-                if self.board[row][col][2] == 0:
+                if self.get_cell(row, col) == 0:
                     valid_movement.append(f'{letters[row]}{col + 1}')
         return game_state, valid_movement
 
     def calculate_score(self):
         """Calculate score based on player's steps and game outcome."""
-        player_steps = sum(1 for i in range(self.size)
-                           for j in range(self.size)
-                           if self.board[i][j][2] == 1)
+        player_steps = self.stones[1].bit_count()
         base_score = player_steps * 10
         bonus_score = 0
         if self.status == GameStatus.WIN:
@@ -154,15 +200,8 @@ class GomokuLogic(BaseGameLogic):
 
     def parse_e2e(self, lmm_output):
         """Parse e2e output to a move."""
-        match = re.search(
-            r'Movement:\s*([A-Oa-o](?:[1-9]|1[0-5])|(?:[1-9]|1[0-5])[A-Oa-o])',
-            lmm_output, re.IGNORECASE)
-        if match:
-            move = match.group(1).upper()
-            if move[0].isdigit():
-                move = move[1:] + move[0]  # Convert "8H" to "H8"
-            return move
-        return GameStatus.INVALID_MOVE
+        return parse_move(lmm_output, 'gomoku',
+                          e2e=True) or GameStatus.INVALID_MOVE
 
 
 class GomokuRenderer(QMainWindow):
@@ -185,27 +224,28 @@ class GomokuRenderer(QMainWindow):
             piece.setScaledContents(True)
         self._update_ui()
 
+    @staticmethod
+    def cell_box(row, col):
+        """``(x, y, w, h)`` of the stone label of a cell."""
+        return 24 + col * 64, 24 + row * 64, 64, 64
+
     def _update_ui(self):
         """Update UI based on current game state."""
         step = 0
-        for i in range(self.logic.size):
-            for j in range(self.logic.size):
-                state = self.logic.board[i][j][2]
-                if state == 1:
-                    self.pieces[step].setPixmap(self.black)
-                    self.pieces[step].setGeometry(
-                        self.logic.board[i][j][0] - 16,
-                        self.logic.board[i][j][1] - 16, 64, 64)
-                    step += 1
-                elif state == 2:
-                    self.pieces[step].setPixmap(self.white)
-                    self.pieces[step].setGeometry(
-                        self.logic.board[i][j][0] - 16,
-                        self.logic.board[i][j][1] - 16, 64, 64)
+        for i, row in enumerate(self.logic.get_state()):
+            for j, state in enumerate(row):
+                if state:
+                    pixmap = self.black if state == 1 else self.white
+                    self.pieces[step].setPixmap(pixmap)
+                    self.pieces[step].setGeometry(*self.cell_box(i, j))
                     step += 1
+        # Clear stones left over from a previous state of a reused renderer.
+        for piece in self.pieces[step:]:
+            piece.clear()
 
     def get_screenshot(self):
         """Generate screenshot of the current board."""
+        self._update_ui()
         board_width = 1000
         board_height = 1000
         screenshot = QPixmap(board_width, board_height)
@@ -215,19 +255,42 @@ class GomokuRenderer(QMainWindow):
         return screenshot
 
 
+class GomokuRaster(RasterRenderer):
+    """Raster renderer for Gomoku."""
+
+    qt_renderer = GomokuRenderer
+    states = (1, 2)
+
+    def atlas_name(self):
+        return f'gomoku_{self.game_cfg.chessboard_size}'
+
+    def cells(self, logic):
+        return [[cell or None for cell in row] for row in logic.get_state()]
+
+    def set_probe(self, logic, key, state):
+        logic.load_state([[state or 0] * logic.size] * logic.size)
+
+    def boxes(self, renderer):
+        size = renderer.logic.size
+        return [[renderer.cell_box(i, j) for j in range(size)]
+                for i in range(size)]
+
+
 @GAME_REGISTRY.register('gomoku')
 class Gomoku(BaseGame):
     AI_component = True
+    renderer_class = GomokuRenderer
+    raster_renderer_class = GomokuRaster
 
     def __init__(self, game_cfg):
         super().__init__(game_cfg)
         self.logic = GomokuLogic(game_cfg)
         self.renderer = None
+        self.ai = None
 
     def get_screenshot(self):
         if self.renderer is None:
-            self.renderer = GomokuRenderer(self.logic)
-        self.renderer._update_ui()
+            self.renderer = self.create_renderer()
         return self.renderer.get_screenshot()
 
     def input_move(self, move):
@@ -247,26 +310,15 @@ class Gomoku(BaseGame):
         if not self.AI_component or self.logic.status != GameStatus.IN_PROGRESS:  # noqa
             return None
 
-        board_copy = deepcopy(self.logic.board)
-        ai = AI(board_copy)
-        values = -100000000
-        best_move = [-1, -1, 2]  # [row, col, player]
-
-        for i in range(self.logic.size):
-            for j in range(self.logic.size):
-                if board_copy[i][j][2] == 0:
-                    if ai.judge_empty(i, j):
-                        continue
-                    board_copy[i][j][2] = 2
-                    evaluate = ai.ai(1, 1, values)
-                    if evaluate >= values:
-                        values = evaluate
-                        best_move = [i, j, 2]
-                    board_copy[i][j][2] = 0
-
-        if best_move[0] != -1 and best_move[1] != -1:
-            row, col, player = best_move
-            if self.logic.make_move(row, col, player):
+        # Built on first use, as benchmark generation never moves the AI.
+        if self.ai is None:
+            self.ai = GomokuAI(self.logic.size,
+                               depth=self.game_cfg.ai_depth or 4,
+                               time_limit=self.game_cfg.ai_time_limit)
+        move = self.ai.best_move(self.logic.get_state(), player=2)
+        if move is not None:
+            row, col = move
+            if self.logic.make_move(row, col, 2):
                 letters = 'ABCDEFGHIJKLMNO'
                 return f'{letters[row]}{col + 1}'
         return None
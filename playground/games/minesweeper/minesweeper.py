@@ -8,6 +8,8 @@ from PyQt5.QtWidgets import QMainWindow
 from playground.games import BaseGame, BaseGameLogic
 from playground.games.minesweeper.game_cfg import LEVELS, STATUS_ICONS
 from playground.games.minesweeper.minesweeper_ui import MinesweeperUI
+from playground.games.raster import RasterRenderer, widget_box
+from playground.parsing import parse_move
 from playground.registry import GAME_REGISTRY
 from playground.state_code import GameStatus
 
@@ -164,14 +166,8 @@ class MinesweeperLogic(BaseGameLogic):
 
     def parse_e2e(self, lmm_output):
         """Parse e2e output to a move."""
-        match = re.search(r'Movement:\s*([A-Ha-h][1-8]|[1-8][A-Ha-h])',
-                          lmm_output, re.IGNORECASE)
-        if match:
-            move = match.group(1).upper()
-            if move[0].isdigit():
-                move = move[1] + move[0]
-            return move
-        return GameStatus.INVALID_MOVE
+        return parse_move(lmm_output, 'minesweeper',
+                          e2e=True) or GameStatus.INVALID_MOVE
 
 
 class MinesweeperRenderer(QMainWindow):
@@ -223,9 +219,46 @@ class MinesweeperRenderer(QMainWindow):
         return screenshot
 
 
+class MinesweeperRaster(RasterRenderer):
+    """Raster renderer for Minesweeper, keyed by the game status icon.
+
+    The clock is always drawn as it reads when a game starts.
+    """
+
+    qt_renderer = MinesweeperRenderer
+    keys = tuple(STATUS_ICONS)
+    states = tuple(range(11))
+
+    def atlas_name(self):
+        return f'minesweeper_{self.game_cfg.level}'
+
+    def key(self, logic):
+        return logic.status
+
+    def cells(self, logic):
+        return [[None if cell == -1 else cell for cell in row]
+                for row in logic.board]
+
+    def set_probe(self, logic, key, state):
+        logic.status = key
+        logic.board = [[-1 if state is None else state] * logic.b_size
+                       for _ in range(logic.b_size)]
+        logic.timer_start = int(time.time())
+
+    def boxes(self, renderer):
+        grid = renderer.ui.gameGrid
+        return [[
+            widget_box(renderer,
+                       grid.itemAtPosition(y + 1, x + 1).widget())
+            for x in range(renderer.logic.b_size)
+        ] for y in range(renderer.logic.b_size)]
+
+
 @GAME_REGISTRY.register('minesweeper')
 class MineSweeper(BaseGame):
     AI_component = False
+    renderer_class = MinesweeperRenderer
+    raster_renderer_class = MinesweeperRaster
 
     def __init__(self, game_cfg):
         super().__init__(game_cfg)
@@ -234,7 +267,7 @@ class MineSweeper(BaseGame):
 
     def get_screenshot(self):
         if self.renderer is None:
-            self.renderer = MinesweeperRenderer(self.logic)
+            self.renderer = self.create_renderer()
         return self.renderer.get_screenshot()
 
     def input_move(self, move):
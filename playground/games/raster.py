@@ -0,0 +1,222 @@
+import copy
+import hashlib
+import json
+import os
+import os.path as osp
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+# Bump when the atlas layout changes so stale caches are rebuilt.
+ATLAS_VERSION = 1
+# Atlas directory used when `raster_cache` is not set, in the user cache
+# directory so every working directory shares it.
+RASTER_CACHE_DIR = osp.join(
+    os.environ.get('XDG_CACHE_HOME') or osp.expanduser('~/.cache'),
+    'lvlm-playground', 'raster')
+
+_atlases = {}
+_digests = {}
+
+
+def qimage_to_array(pixmap):
+    """Convert a `QPixmap` or `QImage` to an RGB `uint8` array."""
+    from PyQt5.QtGui import QImage
+
+    image = pixmap.toImage() if hasattr(pixmap, 'toImage') else pixmap
+    image = image.convertToFormat(QImage.Format_RGB888)
+    width, height = image.width(), image.height()
+    buffer = image.constBits()
+    buffer.setsize(image.bytesPerLine() * height)
+    rows = np.frombuffer(buffer, np.uint8).reshape(height,
+                                                   image.bytesPerLine())
+    return rows[:, :width * 3].reshape(height, width, 3).copy()
+
+
+def source_digest(directory):
+    """SHA-1 of the files under `directory` other than bytecode, read once
+    per process."""
+    if directory not in _digests:
+        sha = hashlib.sha1()
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = sorted(name for name in dirs if name != '__pycache__')
+            for name in sorted(files):
+                if name.endswith('.pyc'):
+                    continue
+                path = osp.join(root, name)
+                sha.update(osp.relpath(path, directory).encode('utf-8'))
+                with open(path, 'rb') as f:
+                    sha.update(f.read())
+        _digests[directory] = sha.hexdigest()
+    return _digests[directory]
+
+
+def widget_box(window, widget):
+    """``(x, y, w, h)`` of a Qt `widget` in the coordinates of `window`."""
+    from PyQt5.QtCore import QPoint
+
+    pos = widget.mapTo(window, QPoint(0, 0))
+    return pos.x(), pos.y(), widget.width(), widget.height()
+
+
+class RasterAtlas:
+    """Board backgrounds and sprite frames captured from a Qt renderer.
+
+    ``backgrounds[k]`` is the empty board drawn with background key ``k`` and
+    ``sprites[s]`` the board with every cell in state ``s``; ``boxes[r][c]``
+    is the ``(x, y, w, h)`` region of cell ``(r, c)`` in both. The arrays are
+    stored as ``.npy`` files and memory-mapped on load.
+    """
+
+    def __init__(self, backgrounds, sprites, boxes, meta):
+        self.backgrounds = backgrounds
+        self.sprites = sprites
+        self.boxes = boxes
+        self.meta = meta
+
+    @classmethod
+    def load(cls, path):
+        with open(osp.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        backgrounds = np.load(osp.join(path, 'backgrounds.npy'), mmap_mode='r')
+        sprites = np.load(osp.join(path, 'sprites.npy'), mmap_mode='r')
+        return cls(backgrounds, sprites, meta['boxes'], meta)
+
+    def save(self, path):
+        """Write the atlas to a temporary directory and move it into place,
+        so concurrent workers never see a partial atlas."""
+        parent = osp.dirname(osp.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=parent)
+        np.save(osp.join(tmp_path, 'backgrounds.npy'), self.backgrounds)
+        np.save(osp.join(tmp_path, 'sprites.npy'), self.sprites)
+        with open(osp.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump(dict(self.meta, boxes=self.boxes), f)
+        if osp.exists(path):
+            shutil.rmtree(path)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            # Another worker moved its atlas into place first.
+            shutil.rmtree(tmp_path)
+
+
+class RasterRenderer:
+    """Qt-free renderer compositing screenshots from a `RasterAtlas`.
+
+    Each cell of the board is copied from the sprite frame of its state onto
+    the background of the current key, which reproduces the Qt screenshot
+    pixel for pixel as long as cells do not overlap. The atlas is captured
+    once from `qt_renderer` and cached under ``game_cfg.raster_cache``, so
+    only that first run needs Qt.
+
+    Subclasses describe the game with `keys`, `states`, `key`, `cells`,
+    `set_probe` and `boxes`.
+    """
+
+    qt_renderer = None
+    # Values of `key` that change parts of the board outside the cells.
+    keys = (None, )
+    # Cell states other than the empty one, which is part of the background.
+    states = ()
+
+    def __init__(self, logic, game_cfg):
+        self.logic = logic
+        self.game_cfg = game_cfg
+        self.key_index = {key: i for i, key in enumerate(self.keys)}
+        self.state_index = {state: i for i, state in enumerate(self.states)}
+        self.atlas = self.load_atlas()
+
+    def atlas_name(self):
+        return self.game_cfg.game_name
+
+    def key(self, logic):
+        """Background key of the current logic state."""
+        return None
+
+    def cells(self, logic):
+        """Rows of cell states, with `None` for empty cells."""
+        raise NotImplementedError
+
+    def set_probe(self, logic, key, state):
+        """Put `logic` in background `key` with every cell in `state`, or
+        empty if `state` is `None`. Boards must be replaced, not mutated."""
+        raise NotImplementedError
+
+    def boxes(self, renderer):
+        """Rows of ``(x, y, w, h)`` cell regions of a Qt `renderer`."""
+        raise NotImplementedError
+
+    def qt_screenshot(self, renderer):
+        return renderer.get_screenshot()
+
+    def describe(self):
+        """Metadata an atlas must match to be reused. Besides the layout it
+        covers the Qt version and every file of the package of
+        `qt_renderer`, so changes to its UI code, stylesheets or images
+        rebuild the atlas."""
+        from PyQt5.QtCore import QT_VERSION_STR
+
+        module = sys.modules[self.qt_renderer.__module__]
+        return dict(version=ATLAS_VERSION,
+                    qt=QT_VERSION_STR,
+                    sources=source_digest(osp.dirname(module.__file__)),
+                    keys=[repr(key) for key in self.keys],
+                    states=[repr(state) for state in self.states])
+
+    def load_atlas(self):
+        root = osp.expanduser(self.game_cfg.raster_cache or RASTER_CACHE_DIR)
+        path = osp.join(osp.abspath(root), self.atlas_name())
+        atlas = _atlases.get(path)
+        if atlas is None:
+            meta = self.describe()
+            if osp.exists(osp.join(path, 'meta.json')):
+                atlas = RasterAtlas.load(path)
+                if {k: atlas.meta.get(k) for k in meta} != meta:
+                    print(f'Raster atlas {path} is out of date, rebuilding.')
+                    atlas = None
+            if atlas is None:
+                self.build_atlas(meta).save(path)
+                atlas = RasterAtlas.load(path)
+            _atlases[path] = atlas
+        return atlas
+
+    def build_atlas(self, meta):
+        """Capture the atlas from the Qt renderer, with metadata `meta`."""
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication(sys.argv)  # noqa
+
+        # `set_probe` replaces the board containers instead of mutating them,
+        # so a shallow copy leaves the game's own logic untouched.
+        probe = copy.copy(self.logic)
+        renderer = self.qt_renderer(probe)
+        backgrounds = []
+        for key in self.keys:
+            self.set_probe(probe, key, None)
+            backgrounds.append(qimage_to_array(self.qt_screenshot(renderer)))
+        sprites = []
+        for state in self.states:
+            self.set_probe(probe, self.keys[0], state)
+            sprites.append(qimage_to_array(self.qt_screenshot(renderer)))
+        boxes = [[list(box) for box in row] for row in self.boxes(renderer)]
+        renderer.close()
+        return RasterAtlas(np.stack(backgrounds), np.stack(sprites), boxes,
+                           meta)
+
+    def render(self):
+        atlas = self.atlas
+        frame = np.array(atlas.backgrounds[self.key_index[self.key(
+            self.logic)]])
+        for row, boxes in zip(self.cells(self.logic), atlas.boxes):
+            for state, (x, y, w, h) in zip(row, boxes):
+                if state is not None:
+                    sprite = atlas.sprites[self.state_index[state]]
+                    frame[y:y + h, x:x + w] = sprite[y:y + h, x:x + w]
+        return frame
+
+    def get_screenshot(self):
+        return Image.fromarray(self.render())
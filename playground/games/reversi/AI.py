@@ -1,126 +1,225 @@
-import copy
+import time
+
+# Bit `y * 8 + x` of a bitboard is the cell `board[y][x]`.
+FULL = (1 << 64) - 1
+NOT_A = 0xfefefefefefefefe  # Without column x == 0.
+NOT_H = 0x7f7f7f7f7f7f7f7f  # Without column x == 7.
+# Shifts of the eight directions with the mask of cells they can land on;
+# positive shifts move towards higher bits.
+DIRECTIONS = ((1, NOT_A), (-1, NOT_H), (8, FULL), (-8, FULL), (9, NOT_A),
+              (7, NOT_H), (-7, NOT_A), (-9, NOT_H))
+
+CORNERS = 0x8100000000000081
+# Cells diagonally and orthogonally next to each corner.
+CORNER_NEIGHBOURS = {
+    1 << 0: (1 << 9) | (1 << 1) | (1 << 8),
+    1 << 7: (1 << 14) | (1 << 6) | (1 << 15),
+    1 << 56: (1 << 49) | (1 << 57) | (1 << 48),
+    1 << 63: (1 << 54) | (1 << 62) | (1 << 55)
+}
+# Search order of the cells: corners first, cells next to corners last.
+CELL_ORDER = [
+    0, 7, 56, 63, 2, 5, 16, 23, 40, 47, 58, 61, 18, 21, 42, 45, 3, 4, 24, 31,
+    32, 39, 59, 60, 19, 20, 26, 29, 34, 37, 43, 44, 11, 12, 25, 30, 33, 38, 51,
+    52, 10, 13, 17, 22, 41, 46, 50, 53, 1, 6, 8, 15, 48, 55, 57, 62, 9, 14, 49,
+    54, 27, 28, 35, 36
+]
+# Value of a finished game per disc of difference, beyond any heuristic.
+WIN = 10000
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget is exhausted."""
+
+
+def shift(bitboard, offset, mask):
+    if offset > 0:
+        return (bitboard << offset) & mask
+    return (bitboard >> -offset) & mask
+
+
+def legal_moves(own, opp):
+    """Bitboard of the moves of `own` against `opp`.
+
+    Runs of `opp` discs next to `own` are filled in each direction with a
+    Kogge-Stone parallel prefix, and a move is the empty cell past a run.
+    """
+    empty = ~(own | opp) & FULL
+    moves = 0
+    for offset, mask in DIRECTIONS:
+        gen, pro = own, opp & mask
+        gen |= pro & shift(gen, offset, FULL)
+        pro &= shift(pro, offset, FULL)
+        gen |= pro & shift(gen, 2 * offset, FULL)
+        pro &= shift(pro, 2 * offset, FULL)
+        gen |= pro & shift(gen, 4 * offset, FULL)
+        moves |= shift(gen & opp, offset, mask) & empty
+    return moves
+
+
+def flips(own, opp, move):
+    """Bitboard of the `opp` discs flipped by playing the cell bit `move`."""
+    flipped = 0
+    for offset, mask in DIRECTIONS:
+        gen, pro = move, opp & mask
+        gen |= pro & shift(gen, offset, FULL)
+        pro &= shift(pro, offset, FULL)
+        gen |= pro & shift(gen, 2 * offset, FULL)
+        pro &= shift(pro, 2 * offset, FULL)
+        gen |= pro & shift(gen, 4 * offset, FULL)
+        if shift(gen, offset, mask) & own:
+            flipped |= gen & opp
+    return flipped
+
+
+def to_bitboards(board, player):
+    """Bitboards of the discs of `player` and of the opponent."""
+    own = opp = 0
+    bit = 1
+    for row in board:
+        for cell in row:
+            if cell == player:
+                own |= bit
+            elif cell:
+                opp |= bit
+            bit <<= 1
+    return own, opp
+
+
+def evaluate(own, opp):
+    """Heuristic value of a position for the side to move."""
+    value = 5 * (legal_moves(own, opp).bit_count() -
+                 legal_moves(opp, own).bit_count())
+    value += 25 * ((own & CORNERS).bit_count() - (opp & CORNERS).bit_count())
+    empty = ~(own | opp)
+    for corner, neighbours in CORNER_NEIGHBOURS.items():
+        if corner & empty:
+            value -= 8 * ((own & neighbours).bit_count() -
+                          (opp & neighbours).bit_count())
+    return value + own.bit_count() - opp.bit_count()
 
 
 class ReversiAI:
+    """Reversi engine over 64-bit bitboards.
+
+    Moves are generated and played with shifts of whole bitboards, so a move
+    is two new integers and nothing is copied or undone. The search is an
+    iterative deepening negamax with alpha-beta pruning and a transposition
+    table, stopping at `depth` plies or once `time_limit` seconds have
+    passed.
+    """
+
+    def __init__(self, depth=4, time_limit=None):
+        self.depth = depth
+        self.time_limit = time_limit
+        self.table = {}
+        self.nodes = 0
+        self.deadline = None
+
+    def legal_moves(self, board, player):
+        """Bitboard of the moves of `player`, with bit `y * 8 + x` for
+        `board[y][x]`."""
+        return legal_moves(*to_bitboards(board, player))
 
     def valid_move(self, board, x, y, player):
-        if board[y][x] != 0:
-            return False
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
-                    continue
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < 8 and 0 <= ny < 8 and board[ny][
-                        nx] == self.opponent(player):
-                    while 0 <= nx < 8 and 0 <= ny < 8:
-                        if board[ny][nx] == player:
-                            return True
-                        if board[ny][nx] == 0:
-                            break
-                        nx += dx
-                        ny += dy
-        return False
+        return bool(self.legal_moves(board, player) >> (y * 8 + x) & 1)
 
     def make_move(self, board, x, y, player):
+        own, opp = to_bitboards(board, player)
+        flipped = flips(own, opp, 1 << (y * 8 + x))
         board[y][x] = player
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
-                    continue
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < 8 and 0 <= ny < 8 and board[ny][
-                        nx] == self.opponent(player):
-                    nx += dx
-                    ny += dy
-                    while 0 <= nx < 8 and 0 <= ny < 8:
-                        if board[ny][nx] == player:
-                            while True:
-                                nx -= dx
-                                ny -= dy
-                                if nx == x and ny == y:
-                                    break
-                                board[ny][nx] = player
-                            break
-                        if board[ny][nx] == 0:
-                            break
-                        nx += dx
-                        ny += dy
+        while flipped:
+            bit = flipped & -flipped
+            index = bit.bit_length() - 1
+            board[index // 8][index % 8] = player
+            flipped ^= bit
 
     def opponent(self, player):
         return 1 if player == 2 else 2
 
     def score(self, board):
-        w, b = 0, 0
-        for row in board:
-            for cell in row:
-                if cell == 2:
-                    w += 1
-                elif cell == 1:
-                    b += 1
-        return w, b
-
-    def best_move(self, board, depth, player):
-        moves = [(x, y) for x in range(8) for y in range(8)
-                 if self.valid_move(board, x, y, player)]
-        if not moves:
-            return None
+        white, black = to_bitboards(board, 2)
+        return white.bit_count(), black.bit_count()
+
+    def ordered_moves(self, moves, first=None):
+        ordered = [cell for cell in CELL_ORDER if moves >> cell & 1]
+        if first in ordered:
+            ordered.remove(first)
+            ordered.insert(0, first)
+        return ordered
 
-        best = None
-        if player == 2:
-            max_val = -float('inf')
-            for x, y in moves:
-                new_board = copy.deepcopy(board)
-                self.make_move(new_board, x, y, player)
-                val = self.alpha_beta(new_board, depth - 1, -float('inf'),
-                                      float('inf'), self.opponent(player))
-                if val > max_val:
-                    max_val = val
-                    best = (x, y)
-        else:
-            min_val = float('inf')
-            for x, y in moves:
-                new_board = copy.deepcopy(board)
-                self.make_move(new_board, x, y, player)
-                val = self.alpha_beta(new_board, depth - 1, -float('inf'),
-                                      float('inf'), self.opponent(player))
-                if val < min_val:
-                    min_val = val
-                    best = (x, y)
-        return best
-
-    def alpha_beta(self, board, depth, alpha, beta, player):
+    def negamax(self, own, opp, depth, alpha, beta):
+        self.nodes += 1
+        if self.deadline and self.nodes & 255 == 0:
+            if time.monotonic() > self.deadline:
+                raise SearchTimeout
+        moves = legal_moves(own, opp)
+        if not moves:
+            if not legal_moves(opp, own):
+                return WIN * (own.bit_count() - opp.bit_count())
+            return -self.negamax(opp, own, depth, -beta, -alpha)
         if depth == 0:
-            w, b = self.score(board)
-            return w - b if player == 2 else b - w
+            return evaluate(own, opp)
+
+        key = (own, opp)
+        entry = self.table.get(key)
+        if entry is not None and entry[0] >= depth:
+            _, flag, value, _ = entry
+            if flag == 0:
+                return value
+            if (flag < 0 and value <= alpha) or (flag > 0 and value >= beta):
+                return value
+
+        original_alpha = alpha
+        best_value, best_cell = -WIN * 65, None
+        for cell in self.ordered_moves(moves, entry[3] if entry else None):
+            bit = 1 << cell
+            flipped = flips(own, opp, bit)
+            value = -self.negamax(opp & ~flipped, own | bit | flipped,
+                                  depth - 1, -beta, -alpha)
+            if value > best_value:
+                best_value, best_cell = value, cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
 
-        moves = [(x, y) for x in range(8) for y in range(8)
-                 if self.valid_move(board, x, y, player)]
+        # -1: upper bound, 1: lower bound, 0: exact value.
+        flag = 0
+        if best_value <= original_alpha:
+            flag = -1
+        elif best_value >= beta:
+            flag = 1
+        if len(self.table) > 1000000:
+            self.table.clear()
+        self.table[key] = (depth, flag, best_value, best_cell)
+        return best_value
+
+    def best_move(self, board, depth=None, player=2):
+        """Return the ``(x, y)`` of the best move of `player` on `board`, or
+        `None` if it has no move."""
+        own, opp = to_bitboards(board, player)
+        moves = legal_moves(own, opp)
         if not moves:
-            return self.alpha_beta(board, depth - 1, alpha, beta,
-                                   self.opponent(player))
-
-        if player == 2:
-            max_val = -float('inf')
-            for x, y in moves:
-                new_board = copy.deepcopy(board)
-                self.make_move(new_board, x, y, player)
-                val = self.alpha_beta(new_board, depth - 1, alpha, beta,
-                                      self.opponent(player))
-                max_val = max(max_val, val)
-                alpha = max(alpha, val)
-                if beta <= alpha:
-                    break
-            return max_val
-        else:
-            min_val = float('inf')
-            for x, y in moves:
-                new_board = copy.deepcopy(board)
-                self.make_move(new_board, x, y, player)
-                val = self.alpha_beta(new_board, depth - 1, alpha, beta,
-                                      self.opponent(player))
-                min_val = min(min_val, val)
-                beta = min(beta, val)
-                if beta <= alpha:
-                    break
-            return min_val
+            return None
+        self.nodes = 0
+        self.deadline = None
+        if self.time_limit:
+            self.deadline = time.monotonic() + self.time_limit
+
+        best_cell = None
+        for iteration in range(1, (depth or self.depth) + 1):
+            try:
+                alpha, cell = -WIN * 65, None
+                for move in self.ordered_moves(moves, best_cell):
+                    bit = 1 << move
+                    flipped = flips(own, opp, bit)
+                    value = -self.negamax(opp & ~flipped, own | bit | flipped,
+                                          iteration - 1, -WIN * 65, -alpha)
+                    if value > alpha:
+                        alpha, cell = value, move
+            except SearchTimeout:
+                break
+            best_cell = cell
+        if best_cell is None:
+            best_cell = self.ordered_moves(moves)[0]
+        return best_cell % 8, best_cell // 8
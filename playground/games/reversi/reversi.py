@@ -1,4 +1,3 @@
-import copy
 import random
 import re
 
@@ -6,8 +5,10 @@ from PyQt5.QtGui import QColor, QPainter, QPixmap
 from PyQt5.QtWidgets import QMainWindow
 
 from playground.games import BaseGame, BaseGameLogic
+from playground.games.raster import RasterRenderer
 from playground.games.reversi.AI import ReversiAI
-from playground.games.reversi.reversi_ui import Ui_MainWindow
+from playground.games.reversi.reversi_ui import CELL_SIZE, Ui_MainWindow
+from playground.parsing import parse_move
 from playground.registry import GAME_REGISTRY
 from playground.state_code import GameStatus
 
@@ -25,7 +26,8 @@ class ReversiLogic(BaseGameLogic):
         self.player_steps = 0
         self.status = GameStatus.IN_PROGRESS
         self.no_move_count = 0
-        self.ai = ReversiAI()
+        self.ai = ReversiAI(depth=game_cfg.ai_depth or 4,
+                            time_limit=game_cfg.ai_time_limit)
 
     def make_move(self, x, y):
         """Make a move on the board and flip pieces."""
@@ -48,7 +50,7 @@ class ReversiLogic(BaseGameLogic):
 
     def _check_game_over(self):
         """Check if the game is over (no valid moves for both players)."""
-        if not any(self.valid_move(x, y) for x in range(8) for y in range(8)):
+        if not self.ai.legal_moves(self.board, self.current_player):
             self.no_move_count += 1
             self.switch_player()
         else:
@@ -158,13 +160,11 @@ class ReversiLogic(BaseGameLogic):
 
         while not valid_state_found:
             board_state = self.get_random_state()
-            valid_moves = []
-
-            for x in range(8):
-                for y in range(8):
-                    if self.ai.valid_move(board_state, x, y, 1):
-                        move_str = f'{row_labels[y]}{col_labels[x]}'
-                        valid_moves.append(move_str)
+            moves = self.ai.legal_moves(board_state, 1)
+            valid_moves = [
+                f'{row_labels[y]}{col_labels[x]}' for x in range(8)
+                for y in range(8) if moves >> (y * 8 + x) & 1
+            ]
 
             if valid_moves:
                 valid_state_found = True
@@ -186,14 +186,8 @@ class ReversiLogic(BaseGameLogic):
 
     def parse_e2e(self, lmm_output):
         """Parse e2e output to a move."""
-        match = re.search(r'Movement:\s*([A-Ha-h][1-8]|[1-8][A-Ha-h])',
-                          lmm_output, re.IGNORECASE)
-        if match:
-            move = match.group(1).upper()
-            if move[0].isdigit():
-                move = move[1] + move[0]
-            return move
-        return GameStatus.INVALID_MOVE
+        return parse_move(lmm_output, 'reversi',
+                          e2e=True) or GameStatus.INVALID_MOVE
 
 
 class ReversiRenderer(QMainWindow):
@@ -217,9 +211,28 @@ class ReversiRenderer(QMainWindow):
         return screenshot
 
 
+class ReversiRaster(RasterRenderer):
+    """Raster renderer for Reversi."""
+
+    qt_renderer = ReversiRenderer
+    states = (1, 2)
+
+    def cells(self, logic):
+        return [[cell or None for cell in row] for row in logic.board]
+
+    def set_probe(self, logic, key, state):
+        logic.board = [[state or 0] * 8 for _ in range(8)]
+
+    def boxes(self, renderer):
+        return [[(x * CELL_SIZE + 60, y * CELL_SIZE + 40, CELL_SIZE, CELL_SIZE)
+                 for x in range(8)] for y in range(8)]
+
+
 @GAME_REGISTRY.register('reversi')
 class Reversi(BaseGame):
     AI_component = True
+    renderer_class = ReversiRenderer
+    raster_renderer_class = ReversiRaster
 
     def __init__(self, game_cfg):
         super().__init__(game_cfg)
@@ -228,7 +241,7 @@ class Reversi(BaseGame):
 
     def get_screenshot(self):
         if self.renderer is None:
-            self.renderer = ReversiRenderer(self.logic)
+            self.renderer = self.create_renderer()
         return self.renderer.get_screenshot()
 
     def input_move(self, move):
@@ -247,8 +260,8 @@ class Reversi(BaseGame):
         if not self.AI_component or self.logic.status != GameStatus.IN_PROGRESS:  # noqa
             return None
 
-        best_move = self.logic.ai.best_move(copy.deepcopy(self.logic.board), 3,
-                                            self.logic.current_player)
+        best_move = self.logic.ai.best_move(self.logic.board,
+                                            player=self.logic.current_player)
         if best_move:
             x, y = best_move
             if self.logic.make_move(x, y):
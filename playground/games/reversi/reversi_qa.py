@@ -26,7 +26,8 @@ class ReversiQuestionAnswering(BaseQuestionAnswering):
 
         if question_type == 'symbol':
             base_pool = ['Black', 'White', 'empty']
-            possible_options = list(set(base_pool + [correct_answer]))
+            possible_options = list(dict.fromkeys(base_pool +
+                                                  [correct_answer]))
 
         elif question_type == 'count':
             correct_num = int(correct_answer)
@@ -46,14 +47,14 @@ class ReversiQuestionAnswering(BaseQuestionAnswering):
         elif question_type == 'compare':
             base_pool = ['Black', 'White', 'equal']
             base_pool.append('tie')
-            base_pool = list(set(base_pool))
+            base_pool = list(dict.fromkeys(base_pool))
             if correct_answer not in base_pool:
                 base_pool.append(correct_answer)
             possible_options = base_pool
 
         else:
             possible_options = [correct_answer, '???', '???2', '???3']
-        possible_options = list(set(possible_options))
+        possible_options = list(dict.fromkeys(possible_options))
         if correct_answer in possible_options:
             possible_options.remove(correct_answer)
         random.shuffle(possible_options)
@@ -1,47 +1,106 @@
 import copy
+import random
 import re
 import time
 
 from PyQt5.QtCore import QTimer
-from PyQt5.QtGui import QPainter, QPixmap
+from PyQt5.QtGui import QGuiApplication, QPainter, QPixmap
 from PyQt5.QtWidgets import QMainWindow
 
 from playground.games import BaseGame, BaseGameLogic
+from playground.games.raster import RasterRenderer, widget_box
 from playground.games.sudoku import sudoku_generator
 from playground.games.sudoku.sudoku_ui import SudokuUI
+from playground.parsing import parse_move
 from playground.registry import GAME_REGISTRY
 from playground.state_code import GameStatus
 
 
 class SudokuLogic(BaseGameLogic):
-    """Pure logic for Sudoku game."""
+    """Pure logic for Sudoku game.
+
+    `puzzle`, `solution` and `assigned` are kept together in
+    `_puzzle_state`, which `start_game` creates when one of them is first
+    used, so a logic that is given a state or thrown away never generates
+    one. Assigning one of them replaces it in that state and keeps the
+    others.
+    """
 
     def __init__(self, game_cfg):
         self.game_cfg = game_cfg
         self.b_size = 9
-        self.solution = [[0 for _ in range(self.b_size)]
-                         for _ in range(self.b_size)]
-        self.puzzle = []
-        self.assigned = [[False for _ in range(self.b_size)]
-                         for _ in range(self.b_size)]
         self.status = GameStatus.IN_PROGRESS
         self.moves_history = []
         self.timer_start = int(time.time())
         self.pause_time = 0
-        self.start_game()
+        self._puzzle_state = None
+
+    def _ensure_puzzle(self):
+        if self._puzzle_state is None:
+            self.start_game()
+        return self._puzzle_state
+
+    def _update_puzzle(self, **fields):
+        # A new dict, so shallow copies of the logic keep their own state.
+        self._puzzle_state = dict(self._ensure_puzzle(), **fields)
+
+    @property
+    def puzzle(self):
+        return self._ensure_puzzle()['puzzle']
+
+    @puzzle.setter
+    def puzzle(self, puzzle):
+        self._update_puzzle(puzzle=puzzle)
+
+    @property
+    def solution(self):
+        return self._ensure_puzzle()['solution']
+
+    @solution.setter
+    def solution(self, solution):
+        self._update_puzzle(solution=solution)
+
+    @property
+    def assigned(self):
+        return self._ensure_puzzle()['assigned']
+
+    @assigned.setter
+    def assigned(self, assigned):
+        self._update_puzzle(assigned=assigned)
 
     def start_game(self):
-        """Initialize the Sudoku puzzle."""
+        """Initialize the Sudoku puzzle, drawn from the `puzzle_pool` file
+        of the config if set."""
+        if self.game_cfg.puzzle_pool:
+            puzzle, solution = random.choice(
+                sudoku_generator.load_puzzle_pool(self.game_cfg.puzzle_pool))
+        else:
+            puzzle, solution = sudoku_generator.new_puzzle(
+                self.game_cfg.clues, self.game_cfg.difficulty)
+        self.set_puzzle(puzzle, solution)
+
+    def set_puzzle(self, puzzle, solution):
         self.status = GameStatus.IN_PROGRESS
-        solution = [[0 for _ in range(self.b_size)]
-                    for _ in range(self.b_size)]
-        sudoku_generator.fillGrid(solution)
-        self.solution = copy.deepcopy(solution)
-        self.puzzle = sudoku_generator.generate_puzzle(solution, 5)
-        self.assigned = [[self.puzzle[y][x] != 0 for x in range(self.b_size)]
-                         for y in range(self.b_size)]
+        puzzle = copy.deepcopy(puzzle)
+        assigned = [[puzzle[y][x] != 0 for x in range(self.b_size)]
+                    for y in range(self.b_size)]
+        self._puzzle_state = dict(puzzle=puzzle,
+                                  solution=copy.deepcopy(solution),
+                                  assigned=assigned)
         self.moves_history = []
 
+    def load_state(self, state):
+        """Load a puzzle given as rows of digits, 0 for an empty cell, or as
+        a ``(puzzle, solution)`` pair."""
+        if len(state) == 2:
+            puzzle, solution = state
+        else:
+            solutions = sudoku_generator.solve(state, limit=1)
+            if not solutions:
+                raise ValueError('Sudoku puzzle has no solution')
+            puzzle, solution = state, solutions[0]
+        self.set_puzzle(puzzle, solution)
+
     def input_move(self, move):
         """Process move in format 'A1 5' (row A, col 1, number 5)."""
         if self.status != GameStatus.IN_PROGRESS:
@@ -141,12 +200,8 @@ class SudokuLogic(BaseGameLogic):
 
     def parse_e2e(self, lmm_output):
         """Parse e2e output to a move."""
-        match = re.search(r'Movement:\s*([A-Ia-i][1-9]\s[1-9])', lmm_output,
-                          re.IGNORECASE)
-        if match:
-            move = match.group(1).upper()
-            return move
-        return GameStatus.INVALID_MOVE
+        return parse_move(lmm_output, 'sudoku',
+                          e2e=True) or GameStatus.INVALID_MOVE
 
 
 class SudokuRenderer(QMainWindow):
@@ -159,10 +214,14 @@ class SudokuRenderer(QMainWindow):
         self.setCentralWidget(self.ui.centralwidget)
         self._update_ui_from_logic()
         self.adjust_window_size()
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_time)
-        self.timer.start(1000)
-        self.show()
+        # Offscreen renderers only take screenshots, so they get no clock
+        # and are never shown.
+        self.timer = None
+        if QGuiApplication.platformName() not in ('offscreen', 'minimal'):
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.update_time)
+            self.timer.start(1000)
+            self.show()
 
     def adjust_window_size(self):
         self.setFixedSize(550, 700)
@@ -210,9 +269,35 @@ class SudokuRenderer(QMainWindow):
         return screenshot
 
 
+class SudokuRaster(RasterRenderer):
+    """Raster renderer for Sudoku, with given and filled-in digits as
+    separate states."""
+
+    qt_renderer = SudokuRenderer
+    states = tuple((number, assigned) for number in range(1, 10)
+                   for assigned in (True, False))
+
+    def cells(self, logic):
+        return [[(number, logic.assigned[y][x]) if number else None
+                 for x, number in enumerate(row)]
+                for y, row in enumerate(logic.puzzle)]
+
+    def set_probe(self, logic, key, state):
+        number, assigned = state or (0, False)
+        logic.puzzle = [[number] * logic.b_size for _ in range(logic.b_size)]
+        logic.assigned = [[assigned] * logic.b_size
+                          for _ in range(logic.b_size)]
+
+    def boxes(self, renderer):
+        return [[widget_box(renderer, button) for button in row]
+                for row in renderer.ui.puzzle_buttons]
+
+
 @GAME_REGISTRY.register('sudoku')
 class Sudoku(BaseGame):
     AI_component = False
+    renderer_class = SudokuRenderer
+    raster_renderer_class = SudokuRaster
 
     def __init__(self, game_cfg):
         super().__init__(game_cfg)
@@ -221,7 +306,7 @@ class Sudoku(BaseGame):
 
     def get_screenshot(self):
         if self.renderer is None:
-            self.renderer = SudokuRenderer(self.logic)
+            self.renderer = self.create_renderer()
         return self.renderer.get_screenshot()
 
     def input_move(self, move):
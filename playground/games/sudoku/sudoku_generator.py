@@ -1,85 +1,233 @@
-from random import randint, shuffle
-
-
-def checkGrid(grid):
-    for row in range(9):
-        for col in range(9):
-            if grid[row][col] == 0:
-                return False
-    return True
-
-
-def fillGrid(grid):
-    numberList = [1, 2, 3, 4, 5, 6, 7, 8, 9]
-
-    for i in range(81):
-        row = i // 9
-        col = i % 9
-        if grid[row][col] == 0:
-            shuffle(numberList)
-
-            for value in numberList:
-                if not (value in grid[row]):
-                    if value not in [grid[r][col] for r in range(9)]:
-                        square = [
-                            grid[r][c]
-                            for r in range(row // 3 * 3, row // 3 * 3 + 3)
-                            for c in range(col // 3 * 3, col // 3 * 3 + 3)
-                        ]
-                        if value not in square:
-                            grid[row][col] = value
-                            if checkGrid(grid):
-                                return True
-                            elif fillGrid(grid):
-                                return True
-            break
-    grid[row][col] = 0
-    return False
-
-
-def solveGrid(grid, counter):
-    for i in range(81):
-        row = i // 9
-        col = i % 9
-        if grid[row][col] == 0:
-            for value in range(1, 10):
-                if not (value in grid[row]):
-                    if value not in [grid[r][col] for r in range(9)]:
-                        square = [
-                            grid[r][c]
-                            for r in range(row // 3 * 3, row // 3 * 3 + 3)
-                            for c in range(col // 3 * 3, col // 3 * 3 + 3)
-                        ]
-                        if value not in square:
-                            grid[row][col] = value
-                            if checkGrid(grid):
-                                counter[0] += 1
-                                break
-                            elif solveGrid(grid, counter):
-                                return True
-            break
-    grid[row][col] = 0
-    return False
+import json
+import random
+
+# Cells are indexed `row * 9 + col`; digit `d` of a unit is bit `1 << d`.
+FULL = 0x3FE
+ROW = [i // 9 for i in range(81)]
+COL = [i % 9 for i in range(81)]
+BOX = [i // 27 * 3 + i % 9 // 3 for i in range(81)]
+UNITS = [[r * 9 + c for c in range(9)] for r in range(9)]
+UNITS += [[r * 9 + c for r in range(9)] for c in range(9)]
+UNITS += [[i for i in range(81) if BOX[i] == b] for b in range(9)]
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# Puzzle pools by path, see `load_puzzle_pool`.
+_pools = {}
+
+
+class SudokuState:
+    """Digits of a grid with the digits used by each row, column and box
+    as bitmasks, and the list of empty cells."""
+
+    def __init__(self, grid):
+        self.cells = [grid[i // 9][i % 9] for i in range(81)]
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.empties = []
+        self.valid = True
+        for i, digit in enumerate(self.cells):
+            if digit:
+                bit = 1 << digit
+                if (self.rows[ROW[i]] | self.cols[COL[i]]
+                        | self.boxes[BOX[i]]) & bit:
+                    self.valid = False
+                self.place(i, digit)
+            else:
+                self.empties.append(i)
+
+    def candidates(self, i):
+        return ~(self.rows[ROW[i]] | self.cols[COL[i]]
+                 | self.boxes[BOX[i]]) & FULL
+
+    def place(self, i, digit):
+        bit = 1 << digit
+        self.cells[i] = digit
+        self.rows[ROW[i]] |= bit
+        self.cols[COL[i]] |= bit
+        self.boxes[BOX[i]] |= bit
+
+    def remove(self, i):
+        bit = 1 << self.cells[i]
+        self.cells[i] = 0
+        self.rows[ROW[i]] ^= bit
+        self.cols[COL[i]] ^= bit
+        self.boxes[BOX[i]] ^= bit
+
+    def grid(self):
+        return [self.cells[r * 9:r * 9 + 9] for r in range(9)]
+
+    def search(self, solutions, limit, shuffle=False):
+        """Append the solutions found by backtracking to `solutions`,
+        stopping once there are `limit` of them.
+
+        The empty cell with the fewest candidates is filled first, so
+        forced cells are placed before any guess."""
+        if not self.empties:
+            solutions.append(self.grid())
+            return
+        best, best_mask, best_count = 0, 0, 10
+        for index, i in enumerate(self.empties):
+            mask = self.candidates(i)
+            count = mask.bit_count()
+            if count < best_count:
+                best, best_mask, best_count = index, mask, count
+                if count <= 1:
+                    break
+        if not best_mask:
+            return
+
+        i = self.empties[best]
+        self.empties[best] = self.empties[-1]
+        self.empties.pop()
+        digits = [d for d in range(1, 10) if best_mask >> d & 1]
+        if shuffle:
+            random.shuffle(digits)
+        for digit in digits:
+            self.place(i, digit)
+            self.search(solutions, limit, shuffle)
+            self.remove(i)
+            if len(solutions) >= limit:
+                break
+        self.empties.append(i)
+
+
+def solve(grid, limit=2, shuffle=False):
+    """Return up to `limit` solutions of `grid`, in a random order of the
+    digits if `shuffle` is set."""
+    state = SudokuState(grid)
+    solutions = []
+    if state.valid:
+        state.search(solutions, limit, shuffle)
+    return solutions
+
+
+def count_solutions(grid, limit=2):
+    """Number of solutions of `grid`, counting no further than `limit`."""
+    return len(solve(grid, limit))
+
+
+def fill_grid(grid):
+    """Fill the empty cells of `grid` in place with a random solution and
+    return whether one exists."""
+    solutions = solve(grid, limit=1, shuffle=True)
+    if solutions:
+        for row, solved in zip(grid, solutions[0]):
+            row[:] = solved
+    return bool(solutions)
+
+
+def grade(grid):
+    """Difficulty of a puzzle: 'easy' if naked singles solve it, 'medium'
+    if hidden singles are needed too and 'hard' if it takes guessing."""
+    state = SudokuState(grid)
+    difficulty = 'easy'
+    while state.empties:
+        progress = False
+        for i in list(state.empties):
+            mask = state.candidates(i)
+            if mask and not mask & (mask - 1):
+                state.place(i, mask.bit_length() - 1)
+                state.empties.remove(i)
+                progress = True
+        if progress:
+            continue
+        for unit in UNITS:
+            for digit in range(1, 10):
+                places = [
+                    i for i in unit
+                    if not state.cells[i] and state.candidates(i) >> digit & 1
+                ]
+                if len(places) == 1:
+                    state.place(places[0], digit)
+                    state.empties.remove(places[0])
+                    progress = True
+        if not progress:
+            return 'hard'
+        difficulty = 'medium'
+    return difficulty
 
 
 def generate_puzzle(grid, attempts):
-    counter = [0]
-
-    while attempts > 0:
-        row, col = randint(0, 8), randint(0, 8)
-        while grid[row][col] == 0:
-            row, col = randint(0, 8), randint(0, 8)
-
+    """Empty random cells of the solved `grid` in place while the puzzle
+    keeps a unique solution, giving up after `attempts` failed removals."""
+    filled = [(r, c) for r in range(9) for c in range(9) if grid[r][c]]
+    random.shuffle(filled)
+    while attempts > 0 and filled:
+        row, col = filled.pop()
         backup = grid[row][col]
         grid[row][col] = 0
-
-        copyGrid = [[grid[r][c] for c in range(9)] for r in range(9)]
-        counter[0] = 0
-
-        solveGrid(copyGrid, counter)
-
-        if counter[0] != 1:
+        if count_solutions(grid) != 1:
             grid[row][col] = backup
             attempts -= 1
-
     return grid
+
+
+def new_puzzle(clues=None, difficulty=None):
+    """Return a puzzle and its solution, from `make_puzzle` if `clues` or
+    `difficulty` is set and from `generate_puzzle` otherwise."""
+    if clues or difficulty:
+        return make_puzzle(clues, difficulty)
+    solution = [[0] * 9 for _ in range(9)]
+    fill_grid(solution)
+    puzzle = generate_puzzle([row[:] for row in solution], 5)
+    return puzzle, solution
+
+
+def write_puzzle_pool(path, size, clues=None, difficulty=None):
+    """Generate `size` puzzles with `new_puzzle` and save them, with their
+    solutions, as a JSON pool for `load_puzzle_pool`."""
+    pool = []
+    for _ in range(size):
+        puzzle, solution = new_puzzle(clues, difficulty)
+        pool.append(dict(puzzle=puzzle, solution=solution))
+    with open(path, 'w') as f:
+        json.dump(pool, f)
+
+
+def load_puzzle_pool(path):
+    """Return the ``(puzzle, solution)`` pairs of a pool file, read once
+    per process."""
+    if path not in _pools:
+        with open(path, 'r') as f:
+            _pools[path] = [(entry['puzzle'], entry['solution'])
+                            for entry in json.load(f)]
+    return _pools[path]
+
+
+def make_puzzle(clues=None, difficulty=None, tries=100):
+    """Return a puzzle and its solution.
+
+    Cells are emptied in a random order while the solution stays unique,
+    down to exactly `clues` given digits if set. With `difficulty`,
+    removals that would make the puzzle harder are skipped. New puzzles
+    are drawn until one has `clues` digits and grades `difficulty`, and
+    `RuntimeError` is raised if none does within `tries` draws, which is
+    common below about 23 clues.
+    """
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(f'Unknown sudoku difficulty: {difficulty}')
+    limit = DIFFICULTIES.index(difficulty) if difficulty else None
+    for _ in range(tries):
+        solution = [[0] * 9 for _ in range(9)]
+        fill_grid(solution)
+        puzzle = [row[:] for row in solution]
+        cells = [(r, c) for r in range(9) for c in range(9)]
+        random.shuffle(cells)
+        given = 81
+        for row, col in cells:
+            if clues is not None and given <= clues:
+                break
+            puzzle[row][col] = 0
+            if count_solutions(puzzle) != 1 or (
+                    limit is not None
+                    and DIFFICULTIES.index(grade(puzzle)) > limit):
+                puzzle[row][col] = solution[row][col]
+            else:
+                given -= 1
+        if clues is not None and given != clues:
+            continue
+        if difficulty is None or grade(puzzle) == difficulty:
+            return puzzle, solution
+    target = ' '.join(filter(None, [difficulty, clues and f'{clues}-clue']))
+    raise RuntimeError(f'No {target} sudoku found in {tries} tries')
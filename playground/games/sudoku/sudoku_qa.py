@@ -27,7 +27,8 @@ class SudokuQuestionAnswering(BaseQuestionAnswering):
 
         if question_type == 'symbol':
             base_pool = [str(n) for n in range(1, 10)] + ['empty']
-            possible_options = list(set(base_pool + [correct_answer]))
+            possible_options = list(dict.fromkeys(base_pool +
+                                                  [correct_answer]))
         elif question_type == 'count':
             correct_num = int(correct_answer)
             nearby_range = list(range(max(0, correct_num - 3),
@@ -53,13 +54,13 @@ class SudokuQuestionAnswering(BaseQuestionAnswering):
         elif question_type == 'yes_no':
             possible_options = ['yes', 'no']
             possible_options += ['maybe', 'unknown']
-            possible_options = list(set(possible_options))
+            possible_options = list(dict.fromkeys(possible_options))
             if correct_answer not in possible_options:
                 possible_options.append(correct_answer)
         else:
             possible_options = [correct_answer, '???', '???2', '???3']
 
-        possible_options = list(set(possible_options))
+        possible_options = list(dict.fromkeys(possible_options))
         if correct_answer in possible_options:
             possible_options.remove(correct_answer)
         random.shuffle(possible_options)
@@ -1,4 +1,83 @@
+# Cells of the three-in-a-row lines, with cell `row * 3 + col`.
+LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6))
+# The eight rotations and reflections of the board, as the cell each cell
+# of the transformed board is taken from.
+SYMMETRIES = ((0, 1, 2, 3, 4, 5, 6, 7, 8), (6, 3, 0, 7, 4, 1, 8, 5, 2),
+              (8, 7, 6, 5, 4, 3, 2, 1, 0), (2, 5, 8, 1, 4, 7, 0, 3, 6),
+              (2, 1, 0, 5, 4, 3, 8, 7, 6), (6, 7, 8, 3, 4, 5, 0, 1, 2),
+              (0, 3, 6, 1, 4, 7, 2, 5, 8), (8, 5, 2, 7, 4, 1, 6, 3, 0))
+# Cell states relative to the side to move: empty, own mark, opponent mark.
+EMPTY, OWN, OTHER = 0, 1, 2
+SWAP = (EMPTY, OTHER, OWN)
+
+# Game values for the side to move, 1 for a win, 0 for a draw and -1 for a
+# loss, by the smallest base-3 code among the symmetries of the board. It
+# is filled on first use and holds the whole game tree after one search
+# from the empty board.
+_values = {}
+# Best move by the base-3 code of the board itself.
+_moves = {}
+
+
+def encode(cells):
+    code = 0
+    for cell in reversed(cells):
+        code = code * 3 + cell
+    return code
+
+
+def canonical(cells):
+    """Code shared by every rotation and reflection of `cells`."""
+    return min(encode([cells[i] for i in symmetry]) for symmetry in SYMMETRIES)
+
+
+def winner(cells):
+    for a, b, c in LINES:
+        if cells[a] != EMPTY and cells[a] == cells[b] == cells[c]:
+            return cells[a]
+    return EMPTY
+
+
+def move_values(cells):
+    """Value of each legal move of the side to move, by cell."""
+    values = {}
+    for i, cell in enumerate(cells):
+        if cell == EMPTY:
+            child = [SWAP[c] for c in cells]
+            child[i] = OTHER
+            values[i] = -solve(child)
+    return values
+
+
+def solve(cells):
+    """Value of `cells` with perfect play, for the side to move."""
+    key = canonical(cells)
+    value = _values.get(key)
+    if value is None:
+        line = winner(cells)
+        if line != EMPTY:
+            value = 1 if line == OWN else -1
+        elif EMPTY not in cells:
+            value = 0
+        else:
+            value = max(move_values(cells).values())
+        _values[key] = value
+    return value
+
+
+def best_move(cells):
+    """First cell of the best moves of the side to move, or `None` if the
+    board is full."""
+    code = encode(cells)
+    if code not in _moves:
+        values = move_values(cells)
+        _moves[code] = max(values, key=values.get) if values else None
+    return _moves[code]
+
+
 class Minimax:
+    """Perfect tic-tac-toe player reading the solved game tables."""
 
     def __init__(self, bot, opponent):
         self.bot = bot
@@ -26,75 +105,23 @@ class Minimax:
         self.bot = bot
         self.opponent = opponent
 
-    def evaluate(self, board):
-        for row in board:
-            if row[0] == row[1] == row[2]:
-                if row[0] == self.bot:
-                    return 10
-                elif row[0] == self.opponent:
-                    return -10
-
-        for col in range(3):
-            if board[0][col] == board[1][col] == board[2][col]:
-                if board[0][col] == self.bot:
-                    return 10
-                elif board[0][col] == self.opponent:
-                    return -10
-
-        if board[0][0] == board[1][1] == board[2][2]:
-            if board[0][0] == self.bot:
-                return 10
-            elif board[0][0] == self.opponent:
-                return -10
-
-        if board[0][2] == board[1][1] == board[2][0]:
-            if board[0][2] == self.bot:
-                return 10
-            elif board[0][2] == self.opponent:
-                return -10
-
-        return 0
-
-    def minimax(self, board, depth, is_max):
-        score = self.evaluate(board)
-
-        if score == 10 or score == -10:
-            return score
-
-        if not self.is_moves_left(board):
-            return 0
-
-        if is_max:
-            best = -1000
-            for i in range(3):
-                for j in range(3):
-                    if board[i][j] == '_':
-                        board[i][j] = self.bot
-                        best = max(best,
-                                   self.minimax(board, depth + 1, not is_max))
-                        board[i][j] = '_'
-            return best
-        else:
-            best = 1000
-            for i in range(3):
-                for j in range(3):
-                    if board[i][j] == '_':
-                        board[i][j] = self.opponent
-                        best = min(best,
-                                   self.minimax(board, depth + 1, not is_max))
-                        board[i][j] = '_'
-            return best
+    def cells(self, board, player):
+        """`board`, flat or in rows, relative to `player` moving next."""
+        if board and isinstance(board[0], list):
+            board = [cell for row in board for cell in row]
+        other = self.opponent if player == self.bot else self.bot
+        return [
+            OWN if cell == player else OTHER if cell == other else EMPTY
+            for cell in board
+        ]
+
+    def best_moves(self, board, player):
+        """Cells of every move of `player` keeping the best value."""
+        values = move_values(self.cells(board, player))
+        best = max(values.values(), default=None)
+        return [i for i, value in values.items() if value == best]
 
     def find_best_move(self, board):
-        best_val = -1000
-        best_move = (-1, -1)
-        for i in range(3):
-            for j in range(3):
-                if board[i][j] == '_':
-                    board[i][j] = self.bot
-                    move_val = self.minimax(board, 1, False)
-                    board[i][j] = '_'
-                    if move_val > best_val:
-                        best_move = (i, j)
-                        best_val = move_val
-        return self.generate_1d(best_move[0], best_move[1])
+        """Cell of the best move of the bot, the first one on a tie, or
+        `None` if the board is full."""
+        return best_move(self.cells(board, self.bot))
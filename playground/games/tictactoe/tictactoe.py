@@ -6,8 +6,10 @@ from PyQt5.QtGui import QFont, QPainter, QPixmap
 from PyQt5.QtWidgets import QMainWindow
 
 from playground.games import BaseGame, BaseGameLogic
+from playground.games.raster import RasterRenderer, widget_box
 from playground.games.tictactoe.AI import Minimax
 from playground.games.tictactoe.tictactoe_ui import Ui_MainWindow
+from playground.parsing import parse_move
 from playground.registry import GAME_REGISTRY
 from playground.state_code import GameStatus
 
@@ -117,16 +119,25 @@ class TicTacToeLogic(BaseGameLogic):
                 self.reset_board()
                 continue
             board_state = [positions[i:i + 3] for i in range(0, 9, 3)]
-            valid_movements = []
-            row_map = {0: 'A', 1: 'B', 2: 'C'}
-            col_map = {0: '1', 1: '2', 2: '3'}
-            for i, val in enumerate(positions):
-                if val == -1:
-                    r, c = divmod(i, 3)
-                    move_str = row_map[r] + col_map[c]
-                    valid_movements.append(move_str)
+            valid_movements = [
+                self.move_name(i) for i, val in enumerate(positions)
+                if val == -1
+            ]
             return board_state, valid_movements
 
+    @staticmethod
+    def move_name(index):
+        return f'{chr(65 + index // 3)}{index % 3 + 1}'
+
+    def get_optimal_movements(self):
+        """Moves of the side to move that keep the best outcome with perfect
+        play, from the solved game table. X is taken to move first."""
+        player = 'X' if self.board.count('X') == self.board.count('O') else 'O'
+        minimax = Minimax(self.bot, self.opponent)
+        return [
+            self.move_name(i) for i in minimax.best_moves(self.board, player)
+        ]
+
     def calculate_score(self):
         """Calculate score based on steps taken and game outcome."""
         player_steps = len(self.moves_history)
@@ -141,14 +152,8 @@ class TicTacToeLogic(BaseGameLogic):
 
     def parse_e2e(self, lmm_output):
         """Parse e2e output to a move."""
-        match = re.search(r'Movement:\s*([A-Ca-c][1-3]|[1-3][A-Ca-c])',
-                          lmm_output, re.IGNORECASE)
-        if match:
-            move = match.group(1).upper()
-            if move[0].isdigit():
-                move = move[1] + move[0]
-            return move
-        return GameStatus.INVALID_MOVE
+        return parse_move(lmm_output, 'tictactoe',
+                          e2e=True) or GameStatus.INVALID_MOVE
 
 
 class TicTacToeRenderer(QMainWindow):
@@ -181,6 +186,7 @@ class TicTacToeRenderer(QMainWindow):
                 button.setStyleSheet('')
 
     def get_screenshot(self):
+        self._update_ui()
         board_width = 500
         board_height = 600
         screenshot = QPixmap(board_width, board_height)
@@ -190,24 +196,56 @@ class TicTacToeRenderer(QMainWindow):
         return screenshot
 
 
+class TicTacToeRaster(RasterRenderer):
+    """Raster renderer for Tic Tac Toe, keyed by the player's mark."""
+
+    qt_renderer = TicTacToeRenderer
+    keys = ('X', 'O')
+    states = ('X', 'O')
+
+    def key(self, logic):
+        return logic.opponent
+
+    def cells(self, logic):
+        return [[
+            cell if cell in self.states else None
+            for cell in logic.board[i:i + 3]
+        ] for i in range(0, 9, 3)]
+
+    def set_probe(self, logic, key, state):
+        logic.opponent = key
+        logic.board = [state or i + 1 for i in range(9)]
+
+    def boxes(self, renderer):
+        return [[
+            widget_box(renderer, renderer.ui.buttons[i + j]) for j in range(3)
+        ] for i in range(0, 9, 3)]
+
+
 @GAME_REGISTRY.register('tictactoe')
 class TicTacToe(BaseGame):
     AI_component = True
+    renderer_class = TicTacToeRenderer
+    raster_renderer_class = TicTacToeRaster
 
     def __init__(self, game_cfg):
         super().__init__(game_cfg)
         self.logic = TicTacToeLogic(game_cfg)
         self.renderer = None
-        self.minimax = Minimax(
-            self.logic.bot,
-            self.logic.opponent) if game_cfg.player_first else None
-        if not game_cfg.player_first:
+        self.init_players()
+
+    def init_players(self):
+        self.minimax = Minimax(self.logic.bot, self.logic.opponent)
+        if not self.game_cfg.player_first:
             self.ai_move()
 
+    def reset_state(self, state=None):
+        super().reset_state(state)
+        self.init_players()
+
     def get_screenshot(self):
         if self.renderer is None:
-            self.renderer = TicTacToeRenderer(self.logic)
-        self.renderer._update_ui()
+            self.renderer = self.create_renderer()
         return self.renderer.get_screenshot()
 
     def input_move(self, move):
@@ -222,13 +260,16 @@ class TicTacToe(BaseGame):
     def get_rule_state(self):
         return self.logic.get_rule_state()
 
+    def get_optimal_movements(self):
+        return self.logic.get_optimal_movements()
+
     def ai_move(self):
         if not self.AI_component or self.logic.is_finish:
             return None
-        game_match = self.minimax.generate_2d(self.logic.board)
-        move_index = self.minimax.find_best_move(game_match)
-        if self.logic.make_move(move_index, self.logic.bot):
-            return f'{chr(65 + move_index // 3)}{move_index % 3 + 1}'
+        move_index = self.minimax.find_best_move(self.logic.board)
+        if move_index is not None and self.logic.make_move(
+                move_index, self.logic.bot):
+            return self.logic.move_name(move_index)
         return None
 
     def calculate_score(self):
@@ -0,0 +1,176 @@
+import json
+import re
+
+# Move notation of each game, shared by the rule task and the e2e games.
+MOVE_FORMATS = {
+    'tictactoe': r'([A-Ca-c][1-3]|[1-3][A-Ca-c])',
+    'sudoku': r'([A-Ia-i][1-9]\s[1-9])',
+    'chess':
+    r'([a-hA-H][1-8][a-hA-H][1-8]|[a-hA-H][1-8]|O-O|O-O-O|(?:N|B|R|Q|K)?[a-hA-H]?[1-8]?x?[a-hA-H][1-8](?:=[QRNB])?|(?:N|B|R|Q|K)[a-hA-H][1-8])',  # noqa
+    'gomoku': r'([A-Oa-o](?:[1-9]|1[0-5])|(?:[1-9]|1[0-5])[A-Oa-o])',
+    'minesweeper': r'([A-Ha-h][1-8]|[1-8][A-Ha-h])',
+    'reversi': r'([A-Ha-h][1-8]|[1-8][A-Ha-h])'
+}
+# Games whose moves may be written column first, e.g. `8H` for `H8`.
+SWAPPABLE_MOVES = ('tictactoe', 'gomoku', 'minesweeper', 'reversi')
+
+# In the rule task the `Movement:` prefix is optional, in e2e it is required.
+RULE_PATTERNS = {
+    game: re.compile(r'(?:Movement:\s*)?' + pattern, re.IGNORECASE)
+    for game, pattern in MOVE_FORMATS.items()
+}
+E2E_PATTERNS = {
+    game: re.compile(r'Movement:\s*' + pattern, re.IGNORECASE)
+    for game, pattern in MOVE_FORMATS.items()
+}
+
+# Answer formats of the QA task, in order of precedence.
+CHOICE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'(?:Final\s+Answer[:\s]*(?:\\boxed{)?\s*)([A-Da-d])(?:\s*})?',
+        r'Answer[:\s]+([A-Da-d])(?:\s*\d)?', r'\[([A-Da-d])\]',
+        r'([A-Da-d])(?:\s*\]|\.|$|\s)'
+    ]
+]
+
+# A Python nested list or a LaTeX `bmatrix`, found in a single scan.
+MATRIX_PATTERN = re.compile(
+    r'(\[\s*\[.*?\]\s*\])|(\\begin\{bmatrix\}.*?\\end\{bmatrix\})', re.DOTALL)
+MATRIX_CLEANUP = str.maketrans({
+    "'": None,
+    '"': None,
+    'X': '1',
+    'x': '1',
+    'O': '0',
+    'o': '0'
+})
+# Delimiters of a LaTeX matrix, dropped before `X` is read as 1.
+BMATRIX_DELIMITERS = re.compile(r'\\(?:begin|end)\{bmatrix\}')
+NUMBER = re.compile(r'-?\d+')
+GAME_STATE = 'Game State:'
+
+
+def find_matrices(text):
+    """Return all Python nested lists and LaTeX `bmatrix` blocks in
+    `text`."""
+    return [match.group(0) for match in MATRIX_PATTERN.finditer(text)]
+
+
+def matrix_numbers(matrix_str):
+    """Return the integers of a cleaned up matrix string, in order.
+
+    Nested lists of integers are decoded with `json`, which is much faster
+    than matching every number; anything else falls back to the regex.
+    """
+    if matrix_str.startswith('['):
+        try:
+            rows = json.loads(matrix_str)
+        except ValueError:
+            rows = None
+        if isinstance(rows, list) and all(
+                isinstance(row, list) and all(type(num) is int for num in row)
+                for row in rows):
+            return [num for row in rows for num in row]
+    return [int(num) for num in NUMBER.findall(matrix_str)]
+
+
+def extract_matrix(lmm_output):
+    """Return the string of the board matrix in `lmm_output` and `None`, or
+    `None` and the reason no matrix was found.
+
+    The last matrix after the last `Game State:` is preferred, falling back
+    to the whole output. Matrices that are code rather than data are
+    ignored.
+    """
+    target = lmm_output
+    if GAME_STATE in lmm_output:
+        target = lmm_output.rsplit(GAME_STATE, 1)[-1]
+    matches = find_matrices(target)
+    if not matches and target != lmm_output:
+        matches = find_matrices(lmm_output)
+    if not matches:
+        return None, 'No matrix pattern found'
+    for match in reversed(matches):
+        if 'int(' not in match and 'board[' not in match:
+            return match, None
+    return None, 'Only code logic found, no concrete data matrix'
+
+
+def parse_matrix(matrix_str, size, count, valid_range):
+    """Convert a matrix string to a `size` x `size` list of cell values.
+
+    `X` and `O` are read as 1 and 0. Returns the matrix and `None`, or
+    `None` and the reason it is invalid.
+    """
+    body = BMATRIX_DELIMITERS.sub(' ', matrix_str)
+    matrix_flat = matrix_numbers(body.translate(MATRIX_CLEANUP))
+    if len(matrix_flat) != count:
+        return None, (f'Number count mismatch: expected {count}, got '
+                      f'{len(matrix_flat)}. Parsed string: {matrix_str}')
+    valid_values = set(valid_range)
+    if not all(num in valid_values for num in matrix_flat):
+        return None, f'Numbers out of range {valid_range}'
+    return [matrix_flat[i:i + size] for i in range(0, count, size)], None
+
+
+def parse_move(lmm_output, game_name, e2e=False):
+    """Return the move of `game_name` in `lmm_output`, or `None`.
+
+    Moves are upper-cased and written row first, except chess moves in e2e,
+    which keep their case since it tells pieces from files in SAN.
+    """
+    patterns = E2E_PATTERNS if e2e else RULE_PATTERNS
+    match = patterns[game_name].search(lmm_output)
+    if not match:
+        return None
+    move = match.group(1)
+    if e2e and game_name == 'chess':
+        return move
+    move = move.upper()
+    if game_name in SWAPPABLE_MOVES and move[0].isdigit():
+        move = move[1:] + move[0]
+    return move
+
+
+def parse_choice(lmm_output):
+    """Return the QA answer letter in `lmm_output`, or `None`.
+
+    An earlier answer format wins over a later one wherever they appear.
+    """
+    for pattern in CHOICE_PATTERNS:
+        match = pattern.search(lmm_output)
+        if match:
+            return match.group(1).upper()
+    return None
+
+
+def parse_matrices(outputs, size, count, valid_range):
+    """Parse the board matrices of many outputs, as `(matrix, reason)`."""
+    results = []
+    for lmm_output in outputs:
+        if not lmm_output:
+            results.append((None, 'No output provided'))
+            continue
+        matrix_str, reason = extract_matrix(lmm_output)
+        if reason:
+            results.append((None, reason))
+        else:
+            results.append(parse_matrix(matrix_str, size, count, valid_range))
+    return results
+
+
+def parse_moves(outputs, game_name, e2e=False):
+    """Parse the moves of many outputs, with `None` for missing ones."""
+    return [
+        parse_move(lmm_output, game_name, e2e)
+        if lmm_output is not None else None for lmm_output in outputs
+    ]
+
+
+def parse_choices(outputs):
+    """Parse the QA answers of many outputs, with `None` for missing
+    ones."""
+    return [
+        parse_choice(lmm_output) if lmm_output is not None else None
+        for lmm_output in outputs
+    ]
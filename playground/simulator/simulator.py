@@ -4,6 +4,7 @@ import os.path as osp
 import imageio
 import torch
 
+from playground.agents.cache import CacheMissError
 from playground.registry import GAME_REGISTRY
 from playground.state_code import GameStatus
 
@@ -126,32 +127,20 @@ class GameSimulator:
             raise ValueError('No agent set. Call set_agent() to set an agent.')
         if self.game_instance is None:
             self.new_game()
-        
-        prompt = self.game_cfg.game_description[self.task]
-        test_image_path = batch['screenshot_path']
-        example_image_path = 'example_image/0000100.jpg'
+
+        example_image_path, test_image_path, prompt = self.build_query(batch)
         gt = batch['gt']
-        
-
-        # Check which path is missing
-        if not example_image_path:
-            raise ValueError('Failed to get example image path from batch.')
-        if not test_image_path:
-            raise ValueError('Failed to get test image path.')
-
-        if example_image_path and test_image_path:
-            try:
-                print("example_image_path:", example_image_path)
-                print("test_image_path:", test_image_path)
-                lmm_output = self.agent.get_decision(example_image_path, test_image_path, prompt)
-            except Exception as e:
-                lmm_output = None
-                self.log(f'Failed to get decision from LMM: {e}')
-            self.log(f'LMM Output: {lmm_output}')
-            self.log(f'Ground truth: {gt}')
-            return dict(raw=lmm_output)
-        else:
-            raise ValueError('Failed to get example or test image paths.')   
+
+        try:
+            lmm_output = self.agent.get_decision(example_image_path, test_image_path, prompt)
+        except CacheMissError:
+            raise
+        except Exception as e:
+            lmm_output = None
+            self.log(f'Failed to get decision from LMM: {e}')
+        self.log(f'LMM Output: {lmm_output}')
+        self.log(f'Ground truth: {gt}')
+        return dict(raw=lmm_output)
 
     def rule(self, batch):
         """Run the game simulation in rule mode"""
@@ -162,12 +151,13 @@ class GameSimulator:
             self.new_game()
 
         rule_state = batch['gt']['rule_state']
-        screenshot_path = batch['screenshot_path']
         valid_movements = batch['gt']['valid_movements']
 
-        prompt = self.game_cfg.game_description[self.task]
+        screenshot_path, prompt = self.build_query(batch)
         try:
             lmm_output = self.agent.get_decision(screenshot_path, prompt)
+        except CacheMissError:
+            raise
         except Exception as e:
             lmm_output = None
             self.log(f'Failed to get decision from LMM: {e}')
@@ -185,25 +175,67 @@ class GameSimulator:
         if self.game_instance is None:
             self.new_game()
 
-        question, gt = batch['gt']['question'], batch['gt']['answer']
-        question = f'Question: {question}'
-        QA = batch['game_cfg'].qa(batch['game_cfg'].game_description['qa'])
-        prompt = QA.general_prompt.format(question=question)
+        gt = batch['gt']['answer']
+        screenshot_path, prompt = self.build_query(batch)
+
+        try:
+            lmm_output = self.agent.get_decision(screenshot_path, prompt)
+        except CacheMissError:
+            raise
+        except Exception as e:
+            lmm_output = None
+            self.log(f'Failed to get decision from LMM: {e}')
+
+        self.log(f'Prompt:\n {prompt}')
+        self.log(f'LMM Output: {lmm_output}')
+        self.log(f'Ground truth: {gt}')
+        return dict(raw=lmm_output)
+
+    def build_query(self, batch):
+        """Build the `get_decision` arguments for an offline sample."""
         screenshot_path = batch['screenshot_path']
+        if not screenshot_path:
+            raise ValueError('Failed to get screenshot.')
+
+        if self.task == 'perceive':
+            example_image_path = 'example_image/0000100.jpg'
+            prompt = self.game_cfg.game_description[self.task]
+            return example_image_path, screenshot_path, prompt
+        elif self.task == 'rule':
+            prompt = self.game_cfg.game_description[self.task]
+            return screenshot_path, prompt
+        elif self.task == 'qa':
+            question = f"Question: {batch['gt']['question']}"
+            QA = batch['game_cfg'].qa(
+                batch['game_cfg'].game_description['qa'])
+            prompt = QA.general_prompt.format(question=question)
+            return screenshot_path, prompt
+        raise ValueError(f'Invalid offline task type: {self.task}')
+
+    def offline_batch(self, batches):
+        """Run several offline samples with one batched agent call."""
+        if not self.agent:
+            raise ValueError('No agent set. Call set_agent() to set an agent.')
+
+        if self.game_instance is None:
+            self.new_game()
 
-        if screenshot_path:
-            try:
-                lmm_output = self.agent.get_decision(screenshot_path, prompt)
-            except Exception as e:
-                lmm_output = None
-                self.log(f'Failed to get decision from LMM: {e}')
+        queries = [self.build_query(batch) for batch in batches]
+        try:
+            lmm_outputs = self.agent.get_decisions(queries)
+        except CacheMissError:
+            raise
+        except Exception as e:
+            lmm_outputs = [None] * len(batches)
+            self.log(f'Failed to get decisions from LMM: {e}')
 
-            self.log(f'Prompt:\n {prompt}')
+        results = []
+        for batch, lmm_output in zip(batches, lmm_outputs):
+            self.log(f'Screenshot: {batch["screenshot_path"]}')
             self.log(f'LMM Output: {lmm_output}')
-            self.log(f'Ground truth: {gt}')
-            return dict(raw=lmm_output)
-        else:
-            raise ValueError('Failed to get screenshot.')
+            self.log(f'Ground truth: {batch["gt"]}')
+            results.append(dict(raw=lmm_output))
+        return results
 
     def new_game(self, step_counter=0):
         """Initialize a new game instance."""
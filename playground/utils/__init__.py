@@ -1,3 +1,10 @@
-from .utils import encode_image, set_random_seed
+from .record import RecordStore, load_record
+from .shard import ImageShard, ImageShardWriter, PackedImage
+from .utils import (encode_image, open_image, read_image_bytes,
+                    set_random_seed)
 
-__all__ = ['set_random_seed', 'encode_image']
+__all__ = [
+    'set_random_seed', 'encode_image', 'open_image', 'read_image_bytes',
+    'RecordStore', 'load_record', 'ImageShard', 'ImageShardWriter',
+    'PackedImage'
+]
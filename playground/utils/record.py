@@ -0,0 +1,87 @@
+import json
+import os
+import os.path as osp
+
+from playground.state_code import GameStatusEncoder
+
+
+class RecordStore:
+    """Experiment record kept as a JSON snapshot plus an append-only journal.
+
+    Finished rounds are appended to ``<record>.journal.jsonl`` one line at a
+    time, so a checkpoint costs O(1) regardless of the record size.
+    `compact` folds the journal into the snapshot, which keeps the layout
+    read by `evaluate.py`: ``{task: {game: [result or None, ...]}}``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = self.journal_path_of(path)
+        self.journal = None
+
+    @staticmethod
+    def journal_path_of(path):
+        return osp.splitext(path)[0] + '.journal.jsonl'
+
+    @classmethod
+    def load(cls, path):
+        """Read the snapshot at `path` and replay its journal on top of it.
+
+        A partially written trailing line, left by a crash mid-write, is
+        ignored.
+        """
+        record = {}
+        if osp.exists(path):
+            with open(path, 'r') as f:
+                record = json.load(f)
+        journal_path = cls.journal_path_of(path)
+        if not osp.exists(journal_path):
+            return record
+        with open(journal_path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                results = record.setdefault(entry['task'],
+                                            {}).setdefault(entry['game'], [])
+                round_idx = entry['round']
+                if round_idx >= len(results):
+                    results.extend([None] * (round_idx + 1 - len(results)))
+                results[round_idx] = entry['result']
+        return record
+
+    def append(self, task, game, round_idx, result):
+        """Journal the result of a single round."""
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'a')
+        line = json.dumps(dict(task=task,
+                               game=game,
+                               round=round_idx,
+                               result=result),
+                          cls=GameStatusEncoder)
+        self.journal.write(line + '\n')
+        self.journal.flush()
+
+    def compact(self, record):
+        """Atomically rewrite the snapshot from `record` and drop the
+        journal."""
+        self.close()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(record, f, indent=4, cls=GameStatusEncoder)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        if osp.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+
+def load_record(path):
+    """Load an experiment record, including rounds not yet compacted."""
+    return RecordStore.load(path)
@@ -0,0 +1,120 @@
+import json
+import mmap
+import os
+import os.path as osp
+import threading
+from io import BytesIO
+
+from PIL import Image
+
+SHARD_VERSION = 1
+RAW = 'raw'
+
+_shards = {}
+_shards_lock = threading.Lock()
+
+
+def size_key(size):
+    return f'{size[0]}x{size[1]}'
+
+
+class PackedImage(bytes):
+    """Image payload read from an `ImageShard`.
+
+    `size` is set when the payload is a PNG already resized to that size, so
+    `encode_image` can send it without decoding it again.
+    """
+
+    def __new__(cls, data, name=None, size=None):
+        image = super().__new__(cls, data)
+        image.name = name
+        image.size = tuple(size) if size else None
+        return image
+
+    def __str__(self):
+        return self.name or super().__str__()
+
+
+class ImageShardWriter:
+    """Pack the images of a benchmark split into one blob plus an index.
+
+    Every image is stored as is under the ``raw`` variant and, for each of
+    `sizes`, as a PNG resized to that size.
+    """
+
+    def __init__(self, path, sizes=()):
+        self.path = path
+        self.sizes = [tuple(size) for size in sizes]
+        self.index = {RAW: {}}
+        for size in self.sizes:
+            self.index[size_key(size)] = {}
+        self.offset = 0
+        self.blob = open(path + '.bin.tmp', 'wb')
+
+    def _write(self, variant, name, data):
+        self.blob.write(data)
+        self.index[variant][name] = [self.offset, len(data)]
+        self.offset += len(data)
+
+    def add(self, name, data):
+        self._write(RAW, name, data)
+        if not self.sizes:
+            return
+        image = Image.open(BytesIO(data))
+        for size in self.sizes:
+            buffered = BytesIO()
+            image.resize(size, Image.Resampling.LANCZOS).save(buffered,
+                                                              format='PNG')
+            self._write(size_key(size), name, buffered.getvalue())
+
+    def close(self):
+        """Move the blob and then the index into place; a shard without an
+        index is ignored by readers."""
+        self.blob.close()
+        os.replace(self.path + '.bin.tmp', self.path + '.bin')
+        with open(self.path + '.json.tmp', 'w') as f:
+            json.dump(dict(version=SHARD_VERSION, variants=self.index), f)
+        os.replace(self.path + '.json.tmp', self.path + '.json')
+
+
+class ImageShard:
+    """Memory-mapped reader of a shard written by `ImageShardWriter`."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path + '.json', 'r') as f:
+            meta = json.load(f)
+        self.variants = meta['variants']
+        with open(path + '.bin', 'rb') as f:
+            self.blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+                if os.fstat(f.fileno()).st_size else b''
+
+    @staticmethod
+    def exists(path):
+        return osp.exists(path + '.json')
+
+    @classmethod
+    def open(cls, path):
+        """Return the shard at `path`, shared by every caller in the
+        process."""
+        with _shards_lock:
+            if path not in _shards:
+                _shards[path] = cls(path)
+            return _shards[path]
+
+    def __contains__(self, name):
+        return name in self.variants[RAW]
+
+    def __len__(self):
+        return len(self.variants[RAW])
+
+    def get(self, name, size=None):
+        """Return image `name`, pre-resized to `size` if the shard has that
+        variant."""
+        variant = size_key(size) if size else RAW
+        if variant not in self.variants:
+            variant, size = RAW, None
+        offset, length = self.variants[variant][name]
+        return PackedImage(self.blob[offset:offset + length],
+                           name=osp.join(osp.dirname(self.path), name),
+                           size=size)
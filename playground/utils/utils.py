@@ -7,9 +7,11 @@ import torch
 from PIL import Image
 
 
-def set_random_seed():
-    """Set the random seed for reproducibility."""
-    seed = random.randint(0, 2**32 - 1)
+def set_random_seed(seed=None):
+    """Set the random seed for reproducibility. A random seed is drawn when
+    `seed` is not given."""
+    if seed is None:
+        seed = random.randint(0, 2**32 - 1)
     random.seed(seed)
     np.random.seed(seed)
     torch.manual_seed(seed)
@@ -20,16 +22,35 @@ def set_random_seed():
     return seed
 
 
-def encode_image(image_path, size=None):
-    """Encode an image to a base64 string. Optionally resize the image before
-    encoding.
+def read_image_bytes(image):
+    """Return the encoded bytes of an image given as a path or as bytes."""
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    with open(image, 'rb') as image_file:
+        return image_file.read()
+
+
+def open_image(image):
+    """Open an image given as a path or as bytes with PIL."""
+    if isinstance(image, (bytes, bytearray)):
+        return Image.open(BytesIO(image))
+    return Image.open(image)
+
+
+def encode_image(image, size=None):
+    """Encode an image, given as a path or as bytes, to a base64 string.
+    Optionally resize the image before encoding.
+
+    Images read from a shard that are already PNGs of the requested size are
+    encoded as is.
     """
-    with open(image_path, 'rb') as image_file:
-        image = Image.open(image_file)
+    if size and tuple(getattr(image, 'size', None) or ()) == tuple(size):
+        return base64.b64encode(image).decode('utf-8')
+    image = open_image(image)
 
-        if size:
-            image = image.resize(size, Image.Resampling.LANCZOS)
+    if size:
+        image = image.resize(size, Image.Resampling.LANCZOS)
 
-        buffered = BytesIO()
-        image.save(buffered, format='PNG')
-        return base64.b64encode(buffered.getvalue()).decode('utf-8')
+    buffered = BytesIO()
+    image.save(buffered, format='PNG')
+    return base64.b64encode(buffered.getvalue()).decode('utf-8')
@@ -20,6 +20,16 @@ def parse_args():
                         type=str,
                         help='Path to the agent config.',
                         default='configs/agents/internvl/internvl2-1b.py')
+    parser.add_argument('--concurrency',
+                        type=int,
+                        help='Number of offline samples to keep in flight at '
+                        'once. Overrides `concurrency` in the recipe.',
+                        default=None)
+    parser.add_argument('--batch-size',
+                        type=int,
+                        help='Number of offline samples grouped into one '
+                        'agent call. Overrides `batch_size` in the recipe.',
+                        default=None)
     return parser.parse_args()
 
 